@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Compare the initial guess methods by solver effort.
+
+Solves a grid of baseline and final-angle scenarios with each
+``guess.initial_guess`` method and reports, per method, how many solves
+converged to a positive final time and the mean ``solve_bvp`` iterations,
+final mesh size (a proxy for the number of mesh refinements), right hand side
+evaluations and wall time.  The ``neighbour`` method walks the grid in order
+with a fresh ``SolutionCache``, so every solve is seeded from the closest
+scenario solved before it.
+
+Usage:
+  python scripts/bench_guess.py --heights 6 8 10 12 --velocities 0 1 2 --nu 0
+"""
+
+import argparse
+import itertools
+from pathlib import Path
+import sys
+import warnings
+
+import numpy as np
+
+# Ensure local src/ is importable without installation
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from moonlander_optimal_control import SolutionCache  # noqa: E402
+from moonlander_optimal_control.guess import METHODS  # noqa: E402
+from moonlander_optimal_control.solver import (  # noqa: E402
+    solve_baseline,
+    solve_with_final_angle,
+)
+
+SOLVERS = {"baseline": solve_baseline, "final_angle": solve_with_final_angle}
+
+
+def run(model, method, scenarios, weights):
+    """Solve every scenario; returns one row of summary statistics"""
+    solve = SOLVERS[model]
+    cache = SolutionCache() if method in ("auto", "neighbour") else False
+    extra = {"analytic": False} if model == "baseline" else {}
+
+    records = []
+    for pos, vx0, nu in scenarios:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            sol = solve(pos, vx0, guess=method, nu=nu, cache=cache, **extra, **weights)
+        records.append(
+            (
+                sol.success and sol.tf > 0,
+                sol.niter,
+                sol.n_nodes,
+                sol.n_rhs,
+                sol.wall_time,
+            )
+        )
+
+    converged, niter, nodes, n_rhs, wall = np.array(records, dtype=float).T
+    return converged.sum(), niter.mean(), nodes.mean(), n_rhs.mean(), wall.sum()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--heights", type=float, nargs="+", default=[6, 8, 10, 12])
+    parser.add_argument("--velocities", type=float, nargs="+", default=[0, 1, 2])
+    parser.add_argument("--nu", type=float, nargs="+", default=[0])
+    parser.add_argument("--models", nargs="+", default=list(SOLVERS))
+    parser.add_argument("--alpha", type=float, default=1.0)
+    parser.add_argument("--beta", type=float, default=400.0)
+    parser.add_argument("--rho", type=float, default=0.5)
+    args = parser.parse_args()
+
+    scenarios = [
+        ((5.0, height), vx0, nu)
+        for nu, height, vx0 in itertools.product(args.nu, args.heights, args.velocities)
+    ]
+
+    print(f"{len(scenarios)} scenarios per model, alpha={args.alpha}, beta={args.beta}")
+    print(
+        f"{'model':<12} {'guess':<10} {'converged':>10} {'niter':>7} "
+        f"{'nodes':>8} {'n_rhs':>7} {'wall s':>8}"
+    )
+    for model in args.models:
+        weights = {"alpha": args.alpha, "beta": args.beta}
+        if model == "final_angle":
+            weights["rho"] = args.rho
+        for method in METHODS:
+            converged, niter, nodes, n_rhs, wall = run(
+                model, method, scenarios, weights
+            )
+            print(
+                f"{model:<12} {method:<10} {int(converged):>4}/{len(scenarios):<5} "
+                f"{niter:>7.2f} {nodes:>8.1f} {n_rhs:>7.1f} {wall:>8.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Benchmark the cold import time of the package against a budget.
+
+Each sample imports ``moonlander_optimal_control`` in a fresh interpreter and
+records the cumulative import time reported by ``python -X importtime``.  The
+median is compared with ``--budget`` (exit status 1 when over budget), and the
+slowest imported modules are listed so regressions are easy to track down.
+Heavy optional dependencies (matplotlib, pandas, scipy.ndimage) and the
+optional solver backends (batch, direct, shooting) must not be imported at all.
+
+Usage:
+  python scripts/bench_import.py --budget 1.2 --samples 5
+"""
+
+import argparse
+import os
+from pathlib import Path
+import statistics
+import subprocess
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+
+PACKAGE = "moonlander_optimal_control"
+
+# Modules that must only be loaded on first use of plotting/animation/DataFrames
+# or of the optional solver backends
+LAZY_MODULES = (
+    "matplotlib",
+    "pandas",
+    "scipy.ndimage",
+    f"{PACKAGE}.batch",
+    f"{PACKAGE}.direct",
+    f"{PACKAGE}.shooting",
+)
+
+
+def sample():
+    """Import the package in a fresh interpreter.
+
+    Returns: total import time (seconds), {module imported by the package: cumulative
+             seconds}, loaded lazy modules
+    """
+    code = (
+        f"import sys; import {PACKAGE}; "
+        f"print(*[m for m in {LAZY_MODULES!r} if m in sys.modules])"
+    )
+    env = {**os.environ, "PYTHONPATH": str(SRC)}
+    out = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+
+    # Lines look like "import time:  self [us] | cumulative | imported package",
+    # with the name indented two spaces per nesting level; a module's children
+    # are listed before it
+    children, total = {}, None
+    for line in out.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cum, name = line[len("import time:") :].split("|")
+        level = (len(name) - len(name.lstrip()) - 1) // 2
+        if level == 0 and name.strip() == PACKAGE:
+            total = int(cum) / 1e6
+            break
+        if level == 1:
+            children[name.strip()] = int(cum) / 1e6
+        elif level == 0:
+            children.clear()
+
+    loaded = out.stdout.split()
+    return total, children, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--budget", type=float, default=1.2, help="seconds")
+    parser.add_argument("--samples", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    results = [sample() for _ in range(args.samples)]
+    median = statistics.median(total for total, _, _ in results)
+    _, cumulative, loaded = results[-1]
+
+    print(f"import {PACKAGE}: median {median:.3f}s over {args.samples} samples")
+    print("slowest imports made by the package (last sample):")
+    for name, seconds in sorted(cumulative.items(), key=lambda kv: -kv[1])[: args.top]:
+        print(f"  {seconds:7.3f}s  {name}")
+
+    failed = False
+    if loaded:
+        print(f"FAIL: optional modules loaded at import: {', '.join(loaded)}")
+        failed = True
+    if median > args.budget:
+        print(f"FAIL: median {median:.3f}s exceeds the {args.budget:.3f}s budget")
+        failed = True
+    if not failed:
+        print(f"OK: within the {args.budget:.3f}s budget")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Microbenchmark the in-place ODE right hand sides against the stacked versions.
+
+For each mesh size, times one call of the baseline and final-angle ``ode``
+closures and measures the bytes they allocate (with ``tracemalloc``), next to
+the previous implementation that stacked eight temporary rows with
+``np.array`` on every call.
+
+Usage:
+  python scripts/bench_rhs.py --sizes 100 1000 10000 30000 --repeat 200
+"""
+
+import argparse
+from pathlib import Path
+import sys
+import timeit
+import tracemalloc
+
+import numpy as np
+
+# Ensure local src/ is importable without installation
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path.insert(0, str(SRC))
+
+from moonlander_optimal_control.solver import (  # noqa: E402
+    _baseline_system,
+    _final_angle_system,
+)
+
+
+def stacked_baseline(alpha=10.0, nu=0.0, G=2.0):
+    """The baseline ``ode`` as it was written before the in-place rewrite"""
+
+    def ode(t, y, p):
+        tf = p[0]
+        return tf * np.array(
+            [
+                y[2],
+                y[3],
+                y[6] / (2 * alpha),
+                y[7] / (2 * alpha) - G,
+                np.zeros_like(y[0]),
+                nu * (1 - np.heaviside(y[1], 0)),
+                -y[4],
+                -y[5],
+            ]
+        )
+
+    return ode
+
+
+def stacked_final_angle(alpha=10.0, nu=0.0, G=2.0, rho=0.01, final_angle_on=True):
+    """The final-angle ``ode`` as it was written before the in-place rewrite"""
+
+    def ode(t, y, p):
+        tf = p[0]
+        return tf * np.array(
+            [
+                y[2],
+                y[3],
+                y[6] / (2 * alpha),
+                y[7] / (2 * alpha) - G,
+                np.zeros_like(y[0]),
+                nu * (1 - np.heaviside(y[1], 0))
+                + (
+                    final_angle_on * 2 * ((y[6] / (2 * alpha)) ** 2) / (y[1] + rho) ** 3
+                ),
+                -y[4],
+                -y[5],
+            ]
+        )
+
+    return ode
+
+
+def allocated_bytes(ode, y, p):
+    """Peak bytes allocated by one call, after a warm-up call"""
+    ode(0.0, y, p)
+    tracemalloc.start()
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    ode(0.0, y, p)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak - start
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--sizes", type=int, nargs="+", default=[100, 1000, 10000, 30000]
+    )
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    pos, vx0 = (5.0, 10.0), 1.0
+    cases = {
+        "baseline": (
+            stacked_baseline(nu=5.0),
+            _baseline_system(pos, vx0, nu=5.0)[0],
+        ),
+        "final_angle": (
+            stacked_final_angle(nu=5.0),
+            _final_angle_system(pos, vx0, nu=5.0)[0],
+        ),
+    }
+
+    rng = np.random.default_rng(0)
+    p = np.array([6.0])
+
+    print(
+        f"{'model':<12} {'m':>6} {'stacked us':>11} {'in-place us':>12} "
+        f"{'speedup':>8} {'stacked KiB':>12} {'in-place KiB':>13}"
+    )
+    for name, (stacked, in_place) in cases.items():
+        for m in args.sizes:
+            y = rng.normal(size=(8, m)) + 1.0
+            assert np.allclose(stacked(0.0, y, p), in_place(0.0, y, p))
+
+            times = [
+                min(timeit.repeat(lambda: ode(0.0, y, p), number=args.repeat, repeat=3))
+                / args.repeat
+                for ode in (stacked, in_place)
+            ]
+            sizes = [allocated_bytes(ode, y, p) for ode in (stacked, in_place)]
+
+            print(
+                f"{name:<12} {m:>6} {1e6 * times[0]:>11.1f} {1e6 * times[1]:>12.1f} "
+                f"{times[0] / times[1]:>7.2f}x {sizes[0] / 1024:>12.1f} "
+                f"{sizes[1] / 1024:>13.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,493 @@
+#!/usr/bin/env python3
+"""Benchmark suite: record solve and rendering costs to JSON and flag regressions.
+
+``run`` times every case (the best of ``--repeat`` runs), then measures its
+peak traced memory (``tracemalloc``) and the number of right hand side calls
+(from the solve instrumentation) in one more run, and writes the results to
+JSON.  ``compare`` checks a new result file against a stored baseline and exits
+with status 1 when a metric grew by more than its threshold.
+
+Cases cover the baseline solver at several mesh sizes, the final-angle solver
+across ``rho``, the multi-obstacle problem with 1, 3 and 10 moving obstacles
+(solve and animation), ``LunarLander.find_path``, plot rendering, the right
+hand side call of ``bench_rhs.py`` and the cold import time of
+``bench_import.py``.  Everything runs offline on the Agg backend, writing
+figures and animations to a temporary directory.
+
+Usage:
+  python scripts/benchmark.py run --output benchmarks/latest.json
+  python scripts/benchmark.py run --cases "baseline*" "final_angle*" --repeat 5
+  python scripts/benchmark.py compare benchmarks/baseline.json benchmarks/latest.json
+"""
+
+import argparse
+import datetime
+import fnmatch
+import json
+from pathlib import Path
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+# Ensure local src/ (and the root-level scripts like multi_obstacle.py) are
+# importable without installation
+ROOT = Path(__file__).resolve().parents[1]
+SRC = ROOT / "src"
+sys.path[:0] = [str(SRC), str(ROOT), str(Path(__file__).resolve().parent)]
+
+import matplotlib  # noqa: E402
+
+matplotlib.use("Agg")
+
+from moonlander_optimal_control import instrument  # noqa: E402
+
+BASELINE = ROOT / "benchmarks" / "baseline.json"
+
+# Metrics compared between runs, with their default relative tolerance
+THRESHOLDS = {"wall_time": 0.25, "solve_time": 0.25, "peak_memory": 0.25, "n_rhs": 0.0}
+
+# Differences below these are noise, whatever the ratio
+NOISE = {"wall_time": 0.02, "solve_time": 0.02, "peak_memory": 256 * 1024, "n_rhs": 0}
+
+# Well-posed problem (the defaults converge to a negative final time)
+PROBLEM = dict(pos=(5.0, 10.0), vx0=1.0, alpha=1.0, beta=400.0)
+
+
+def obstacle_scene(n):
+    """``n`` thin obstacles between x = 1 and x = 5, alternately moving up and down.
+
+    Returns: radii (n, 2), motions (``motion.Periodic`` sawtooths of period 6)
+    """
+    from moonlander_optimal_control.motion import Periodic
+
+    motions = [
+        Periodic((cx, 0.0), (0.0, 3.0 if i % 2 == 0 else -3.0), 6.0, 3.0 * (i % 2))
+        for i, cx in enumerate(np.linspace(1, 5, n))
+    ]
+    return np.tile([0.025, 0.25], (n, 1)), motions
+
+
+def _close_figures():
+    import matplotlib.pyplot as plt
+
+    plt.close("all")
+
+
+def baseline_case(t_steps):
+    from moonlander_optimal_control import solve_baseline
+
+    def run(tmp):
+        solve_baseline(t_steps=t_steps, analytic=False, cache=False, **PROBLEM)
+
+    return run
+
+
+def closed_form_case():
+    from moonlander_optimal_control import solve_baseline
+
+    def run(tmp):
+        solve_baseline(analytic=True, cache=False, **PROBLEM)
+
+    return run
+
+
+def final_angle_case(rho):
+    from moonlander_optimal_control import solve_with_final_angle
+
+    def run(tmp):
+        solve_with_final_angle(rho=rho, cache=False, **PROBLEM)
+
+    return run
+
+
+def multi_obstacle_case(n):
+    from multi_obstacle import avoid_many_moving_obstacle
+
+    r, c = obstacle_scene(n)
+
+    def run(tmp):
+        avoid_many_moving_obstacle(r, c, ani_name=str(tmp / f"obstacles_{n}.mp4"))
+        _close_figures()
+
+    return run
+
+
+def moving_obstacles_case(n):
+    """Headless solve only (the multi_obstacle cases also render and plot)"""
+    from moonlander_optimal_control.obstacles import ObstacleSet, solve_moving_obstacles
+
+    r, c = obstacle_scene(n)
+
+    def run(tmp):
+        solve_moving_obstacles(ObstacleSet(r, c, 500.0, tol=1e-10))
+
+    return run
+
+
+def animate_moving_obstacles_case(n):
+    from moonlander_optimal_control.obstacles import ObstacleSet, solve_moving_obstacles
+    from moonlander_optimal_control.plotting import animate_moving_obstacles
+
+    r, c = obstacle_scene(n)
+    obstacles = ObstacleSet(r, c, 500.0, tol=1e-10)
+    sol = solve_moving_obstacles(obstacles)
+
+    def run(tmp):
+        animate_moving_obstacles(sol, obstacles, str(tmp / f"moving_{n}.mp4"))
+        _close_figures()
+
+    return run
+
+
+def find_path_case():
+    from moonlander_optimal_control import LunarLander
+
+    def run(tmp):
+        LunarLander(list(PROBLEM["pos"]), PROBLEM["vx0"]).find_path(cache=False)
+
+    return run
+
+
+def plot_summary_case():
+    import matplotlib.pyplot as plt
+
+    from moonlander_optimal_control import plot_summary, solve_baseline
+
+    sol = solve_baseline(cache=False, **PROBLEM)
+
+    def run(tmp):
+        plot_summary(*sol)
+        plt.savefig(tmp / "summary.png")
+        _close_figures()
+
+    return run
+
+
+def render_many_case(n):
+    """Summary figures of ``n`` solutions, one reused Agg template (versus ``plot_summary``)"""
+    from moonlander_optimal_control import render_many, solve_baseline
+
+    sol = solve_baseline(cache=False, **PROBLEM)
+
+    def run(tmp):
+        render_many([sol] * n, str(tmp / "summary_{index}.png"))
+
+    return run
+
+
+def plot_trajectory_case():
+    from moonlander_optimal_control import plot_trajectory, solve_baseline
+
+    sol = solve_baseline(cache=False, **PROBLEM)
+
+    def run(tmp):
+        plot_trajectory(sol.x, sol.y, save_file=tmp / "trajectory.png")
+        _close_figures()
+
+    return run
+
+
+def plot_state_controls_case():
+    from moonlander_optimal_control import LunarLander
+
+    lander = LunarLander(list(PROBLEM["pos"]), PROBLEM["vx0"])
+    lander.find_path(cache=False)
+
+    def run(tmp):
+        lander.plot_state_controls(save_file=tmp / "state_controls.png", show=False)
+        _close_figures()
+
+    return run
+
+
+def animate_landing_case():
+    from moonlander_optimal_control import LunarLander
+
+    lander = LunarLander(list(PROBLEM["pos"]), PROBLEM["vx0"])
+    lander.find_path(cache=False)
+
+    def run(tmp):
+        lander.animate_landing(tmp / "landing.mp4", dpi=100)
+        _close_figures()
+
+    return run
+
+
+def sprites_case(resolution):
+    """Lander sprites for every mesh node of a landing: rotated each time, or cached"""
+    from scipy.ndimage import rotate
+
+    from moonlander_optimal_control import LunarLander
+    from moonlander_optimal_control.sprites import SpriteCache, load_sprite, tilt_angle
+
+    lander = LunarLander(list(PROBLEM["pos"]), PROBLEM["vx0"])
+    lander.find_path(cache=False)
+    angles = tilt_angle(lander.path.states[2], lander.path.states[3])
+    image = load_sprite()
+
+    def run(tmp):
+        if resolution is None:
+            for angle in angles:
+                np.clip(rotate(image, angle, reshape=False), 0, 1)
+        else:
+            sprites = SpriteCache(image, resolution)
+            for angle in angles:
+                sprites(angle)
+
+    return run
+
+
+def rhs_case(m):
+    from moonlander_optimal_control.solver import _baseline_system
+
+    ode = _baseline_system(PROBLEM["pos"], PROBLEM["vx0"], nu=5.0)[0]
+    y = np.random.default_rng(0).normal(size=(8, m)) + 1.0
+    p = np.array([6.0])
+
+    def run(tmp):
+        for _ in range(100):
+            ode(0.0, y, p)
+
+    return run
+
+
+def obstacle_set_case(n, tol):
+    """One cost and gradient evaluation of ``n`` scattered obstacles on a 629-node path"""
+    from moonlander_optimal_control.motion import Periodic, Static
+    from moonlander_optimal_control.obstacles import ObstacleSet
+
+    rng = np.random.default_rng(0)
+    points = np.c_[rng.uniform(0, 6, n), rng.uniform(0, 3, n)]
+    motions = [
+        Periodic(p, (0.0, 0.5), 2.0) if i % 3 == 0 else Static(p)
+        for i, p in enumerate(points)
+    ]
+    r = rng.uniform(0.005, 0.05, (n, 2))
+    obstacles = ObstacleSet(r, motions, 500.0, tol=tol)
+    s = np.linspace(0, 1, 629)
+    x, y = 6 * (1 - s), 1.5 + np.sin(3 * np.pi * s)
+
+    def run(tmp):
+        for _ in range(10):
+            obstacles.evaluate(s, x, y)
+
+    return run
+
+
+def import_case():
+    from bench_import import sample
+
+    def run(tmp):
+        total, _, loaded = sample()
+        if loaded:
+            raise RuntimeError(f"optional modules loaded at import: {loaded}")
+
+    return run
+
+
+# name: factory of a ``run(tmp_dir)`` callable (setup is done by the factory)
+CASES = {
+    **{f"baseline[t_steps={m}]": (baseline_case, m) for m in (50, 200, 800)},
+    "baseline[closed_form]": (closed_form_case,),
+    **{f"final_angle[rho={rho}]": (final_angle_case, rho) for rho in (1.0, 0.5, 0.1)},
+    **{f"multi_obstacle[n={n}]": (multi_obstacle_case, n) for n in (1, 3, 10)},
+    **{f"moving_obstacles[n={n}]": (moving_obstacles_case, n) for n in (1, 3, 10, 50)},
+    **{
+        f"animate_moving_obstacles[n={n}]": (animate_moving_obstacles_case, n)
+        for n in (3, 50)
+    },
+    "find_path": (find_path_case,),
+    "plot_summary": (plot_summary_case,),
+    "render_many[summary,n=10]": (render_many_case, 10),
+    "plot_trajectory": (plot_trajectory_case,),
+    "plot_state_controls": (plot_state_controls_case,),
+    "animate_landing": (animate_landing_case,),
+    "sprites[rotate]": (sprites_case, None),
+    "sprites[cached,1deg]": (sprites_case, 1.0),
+    "rhs[m=10000,x100]": (rhs_case, 10000),
+    **{
+        f"obstacle_set[n={n},{name},x10]": (obstacle_set_case, n, tol)
+        for n in (50, 300)
+        for name, tol in (("dense", None), ("culled", 1e-10))
+    },
+    "import": (import_case,),
+}
+
+
+def measure(run, repeat, tmp, max_time=10.0):
+    """Best wall time of up to ``repeat`` runs, then peak memory and solve trace of one more run.
+
+    Repeats stop early once they have taken ``max_time`` seconds, so slow
+    cases (the animations) run once.
+    """
+    times = []
+    while len(times) < repeat and sum(times) < max_time:
+        start = time.perf_counter()
+        run(tmp)
+        times.append(time.perf_counter() - start)
+
+    sink = instrument.enable_instrumentation()
+    tracemalloc.start()
+    try:
+        run(tmp)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+        instrument.disable_instrumentation()
+
+    records = sink.records
+    return {
+        "wall_time": min(times),
+        "wall_time_median": statistics.median(times),
+        "peak_memory": peak,
+        "n_solves": len(records),
+        "n_rhs": sum(record.get("n_rhs", 0) for record in records),
+        "solve_time": sum(record.get("wall_time", 0.0) for record in records),
+        "n_nodes": [record.get("n_nodes") for record in records],
+    }
+
+
+def metadata():
+    import scipy
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            cwd=ROOT,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = ""
+    return {
+        "date": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "scipy": scipy.__version__,
+        "matplotlib": matplotlib.__version__,
+        "machine": platform.platform(),
+    }
+
+
+def run_suite(patterns, repeat, max_time=10.0):
+    """Run the cases whose name matches any of ``patterns``"""
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for name, (factory, *args) in CASES.items():
+            if not any(fnmatch.fnmatchcase(name, pattern) for pattern in patterns):
+                continue
+            try:
+                results[name] = measure(factory(*args), repeat, Path(tmp), max_time)
+            except Exception as error:
+                results[name] = {"error": f"{type(error).__name__}: {error}"}
+                print(f"{name:<32} ERROR {results[name]['error']}")
+                continue
+
+            result = results[name]
+            print(
+                f"{name:<32} {result['wall_time']:9.3f}s "
+                f"{result['peak_memory'] / 2**20:9.1f} MiB "
+                f"{result['n_rhs']:7d} rhs calls"
+            )
+    return results
+
+
+def compare(baseline, latest, thresholds):
+    """Regressions of ``latest`` against ``baseline``, as (case, metric, old, new) tuples.
+
+    A metric regresses when it grew by more than its relative threshold and by
+    more than its ``NOISE`` floor.  A case that ran in the baseline but errored
+    in ``latest`` regresses with metric ``"error"``; cases missing from either
+    file are skipped.
+    """
+    regressions = []
+    for name, old in baseline.items():
+        new = latest.get(name)
+        if new is None or "error" in old:
+            continue
+        if "error" in new:
+            regressions.append((name, "error", None, new["error"]))
+            continue
+        for metric, threshold in thresholds.items():
+            if metric not in old or metric not in new:
+                continue
+            limit = old[metric] * (1 + threshold)
+            if new[metric] > limit and new[metric] - old[metric] > NOISE[metric]:
+                regressions.append((name, metric, old[metric], new[metric]))
+    return regressions
+
+
+def _run(args):
+    results = run_suite(args.cases, args.repeat, args.max_time)
+    output = {"meta": metadata(), "cases": results}
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(json.dumps(output, indent=2) + "\n")
+    print(f"wrote {args.output}")
+
+
+def _compare(args):
+    baseline = json.loads(args.baseline.read_text())["cases"]
+    latest = json.loads(args.latest.read_text())["cases"]
+    thresholds = dict(THRESHOLDS)
+    if args.threshold is not None:
+        thresholds.update(wall_time=args.threshold, solve_time=args.threshold)
+
+    for name in sorted(set(baseline) & set(latest)):
+        old, new = baseline[name], latest[name]
+        if "wall_time" in old and "wall_time" in new:
+            ratio = new["wall_time"] / max(old["wall_time"], 1e-12)
+            print(
+                f"{name:<32} {old['wall_time']:9.3f}s -> {new['wall_time']:9.3f}s "
+                f"({ratio:5.2f}x)"
+            )
+
+    regressions = compare(baseline, latest, thresholds)
+    for name, metric, old, new in regressions:
+        print(f"REGRESSION {name}: {metric} {old} -> {new}")
+    if not regressions:
+        print("OK: no regressions")
+    sys.exit(1 if regressions else 0)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run = commands.add_parser("run", help="run the suite and write the results")
+    run.add_argument("--output", type=Path, default=ROOT / "benchmarks/latest.json")
+    run.add_argument(
+        "--cases", nargs="+", default=["*"], help="glob patterns of case names"
+    )
+    run.add_argument("--repeat", type=int, default=3)
+    run.add_argument(
+        "--max-time", type=float, default=10.0, help="seconds of repeats per case"
+    )
+    run.set_defaults(handler=_run)
+
+    check = commands.add_parser("compare", help="flag regressions against a baseline")
+    check.add_argument("baseline", type=Path, nargs="?", default=BASELINE)
+    check.add_argument(
+        "latest", type=Path, nargs="?", default=ROOT / "benchmarks/latest.json"
+    )
+    check.add_argument(
+        "--threshold",
+        type=float,
+        default=None,
+        help="relative wall time tolerance (default 0.25)",
+    )
+    check.set_defaults(handler=_compare)
+
+    args = parser.parse_args()
+    args.handler(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,78 @@
 # Expose a friendly API
 from .solver import solve_baseline, solve_with_final_angle
-from .plotting import plot_summary, plot_controls, plot_trajectory
-from .lunar_lander import LunarLander
+from .analytic import solve_baseline_analytic
+from .result import Solution
+from .sweep import iter_sweep, scenario_grid, sweep
+from .cache import SolutionCache, disable_cache, enable_cache
+from .continuation import continuation, iter_continuation, parameter_path
+from .robust import certify, solve_robust
+from .obstacles import ObstacleSet, solve_moving_obstacles
+from .instrument import (
+    JsonLinesSink,
+    RingBuffer,
+    disable_instrumentation,
+    enable_instrumentation,
+)
 
 __all__ = [
     "solve_baseline",
     "solve_with_final_angle",
+    "solve_baseline_analytic",
+    "Solution",
+    "solve_batch",
+    "solve_direct",
+    "solve_shooting",
+    "sweep",
+    "iter_sweep",
+    "scenario_grid",
+    "SolutionCache",
+    "enable_cache",
+    "disable_cache",
+    "continuation",
+    "iter_continuation",
+    "parameter_path",
+    "solve_robust",
+    "certify",
+    "ObstacleSet",
+    "solve_moving_obstacles",
+    "enable_instrumentation",
+    "disable_instrumentation",
+    "RingBuffer",
+    "JsonLinesSink",
     "plot_summary",
     "plot_controls",
     "plot_trajectory",
+    "animate_moving_obstacles",
+    "render_many",
     "LunarLander",
 ]
+
+# Plotting and the class-based API pull in matplotlib (and pandas on use), and
+# the batch, direct and shooting backends pull in scipy.optimize and
+# scipy.sparse.linalg, so they are imported on first access instead of with the
+# package
+_LAZY = {
+    "solve_batch": ".batch",
+    "solve_direct": ".direct",
+    "solve_shooting": ".shooting",
+    "plot_summary": ".plotting",
+    "plot_controls": ".plotting",
+    "plot_trajectory": ".plotting",
+    "animate_moving_obstacles": ".plotting",
+    "render_many": ".plotting",
+    "LunarLander": ".lunar_lander",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY:
+        import importlib
+
+        value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY))
@@ -0,0 +1,173 @@
+from typing import Optional, Tuple
+
+import numpy as np
+from scipy.optimize import brentq
+
+
+def _landing_coefficients(tf, y_init, vx0, alpha, beta, G):
+    """Costate coefficients of the unconstrained (``nu == 0``) baseline problem.
+
+    With ``nu == 0`` the costates are ``p1 = 0``, ``p2 = c``, ``p3 = a`` and
+    ``p4 = d - c t``.  For a fixed final time ``tf``, ``a`` follows from the
+    free final ``x`` condition and ``(c, d)`` from the landing condition
+    ``y(tf) = 0`` and the final ``y`` velocity condition (a 2x2 linear solve).
+
+    Returns: a, c, d (scalars or arrays shaped like ``tf``)
+    """
+    k = 1 / (2 * alpha)
+
+    a = 2 * alpha * beta * vx0 / (alpha - beta * tf)
+
+    # Rows: y(tf) = 0 and p4(tf) = 2 * beta * yp(tf), unknowns (d, c)
+    a11 = k * tf**2 / 2
+    a12 = -k * tf**3 / 6
+    b1 = G * tf**2 / 2 - y_init
+    a21 = 1 - 2 * beta * k * tf
+    a22 = -tf + beta * k * tf**2
+    b2 = -2 * beta * G * tf
+
+    det = a11 * a22 - a12 * a21
+    d = (b1 * a22 - a12 * b2) / det
+    c = (a11 * b2 - a21 * b1) / det
+
+    return a, c, d
+
+
+def _hamiltonian_residual(tf, y_init, vx0, alpha, beta, gamma, G):
+    """Final-time Hamiltonian of the unconstrained baseline problem, as a function of ``tf``"""
+    k = 1 / (2 * alpha)
+    a, c, d = _landing_coefficients(tf, y_init, vx0, alpha, beta, G)
+
+    ypf = k * (d * tf - c * tf**2 / 2) - G * tf
+    p4f = d - c * tf
+
+    return c * ypf + k * (a**2 + p4f**2) / 2 - G * p4f - gamma
+
+
+def find_final_time(
+    pos: Tuple[float, float],
+    vx0: float,
+    tf_guess: float = 20.0,
+    alpha: float = 10.0,
+    beta: float = 25.0,
+    gamma: float = 3.0,
+    G: float = 2.0,
+    grid_size: int = 4096,
+) -> Optional[float]:
+    """Find the optimal final time of the unconstrained baseline problem.
+
+    The Hamiltonian condition at ``tf`` is scanned on a geometric grid for sign
+    changes, each bracket is refined with ``brentq``, and brackets that only
+    straddle a pole are discarded.  When several admissible roots exist, the
+    one closest to ``tf_guess`` is returned (mirroring what ``solve_bvp`` would
+    converge to from that guess).
+
+    Returns: tf, or None if no admissible root was found
+    """
+    _, y_init = pos
+    args = (y_init, vx0, alpha, beta, gamma, G)
+
+    tf_grid = np.geomspace(1e-3, max(10 * tf_guess, 100.0), grid_size)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        h = _hamiltonian_residual(tf_grid, *args)
+
+    finite = np.isfinite(h[:-1]) & np.isfinite(h[1:])
+    brackets = np.flatnonzero(finite & (np.sign(h[:-1]) != np.sign(h[1:])))
+
+    roots = []
+    for i in brackets:
+        root = brentq(_hamiltonian_residual, tf_grid[i], tf_grid[i + 1], args=args)
+        if abs(_hamiltonian_residual(root, *args)) < 1e-6 * max(1.0, abs(gamma)):
+            roots.append(root)
+
+    if not roots:
+        return None
+
+    return min(roots, key=lambda root: abs(root - tf_guess))
+
+
+def closed_form_solution(
+    pos: Tuple[float, float],
+    vx0: float,
+    tf: float,
+    t_steps: int = 200,
+    alpha: float = 10.0,
+    beta: float = 25.0,
+    G: float = 2.0,
+):
+    """Evaluate the unconstrained baseline solution for a known final time.
+
+    Returns: t, x, y, xp, yp, ux, uy, tf
+    """
+    s, sol = closed_form_trajectory(pos, vx0, tf, t_steps, alpha, beta, G)
+
+    x = sol[0]
+    y = sol[1]
+    xp = sol[2]
+    yp = sol[3]
+    ux = sol[6] / (2 * alpha)
+    uy = sol[7] / (2 * alpha)
+    t_vals = s * tf
+
+    return t_vals, x, y, xp, yp, ux, uy - G, tf
+
+
+def closed_form_trajectory(
+    pos: Tuple[float, float],
+    vx0: float,
+    tf: float,
+    t_steps: int = 200,
+    alpha: float = 10.0,
+    beta: float = 25.0,
+    G: float = 2.0,
+):
+    """Full state/costate of the unconstrained baseline solution on a normalized mesh.
+
+    The result is laid out like ``solve_bvp`` input (rows x, y, xp, yp, p1..p4
+    over ``s = t / tf`` in [0, 1]), so it can seed a collocation solve.
+
+    Returns: s, y (shape (8, t_steps))
+    """
+    x_init, y_init = pos
+    k = 1 / (2 * alpha)
+    a, c, d = _landing_coefficients(tf, y_init, vx0, alpha, beta, G)
+
+    s = np.linspace(0, 1, t_steps)
+    t_vals = s * tf
+
+    y = np.zeros((8, t_steps))
+    y[0] = x_init + vx0 * t_vals + a * k * t_vals**2 / 2
+    y[1] = y_init + k * (d * t_vals**2 / 2 - c * t_vals**3 / 6) - G * t_vals**2 / 2
+    y[2] = vx0 + a * k * t_vals
+    y[3] = k * (d * t_vals - c * t_vals**2 / 2) - G * t_vals
+    y[5] = c
+    y[6] = a
+    y[7] = d - c * t_vals
+
+    return s, y
+
+
+def solve_baseline_analytic(
+    pos: Tuple[float, float],
+    vx0: float,
+    t_steps: int = 200,
+    tf_guess: float = 20.0,
+    alpha: float = 10.0,
+    beta: float = 25.0,
+    gamma: float = 3.0,
+    G: float = 2.0,
+):
+    """Solve the baseline lunar lander problem with ``nu == 0`` in closed form.
+
+    Without the ground penalty the costate equations are linear, so the states
+    are polynomials in time and the whole BVP reduces to one scalar equation in
+    ``tf``, which is solved with a bracketing root-finder instead of
+    ``solve_bvp``.
+
+    Returns: t, x, y, xp, yp, ux, uy, tf
+    """
+    tf = find_final_time(pos, vx0, tf_guess, alpha, beta, gamma, G)
+    if tf is None:
+        raise RuntimeError("No admissible final time found for the baseline problem")
+
+    return closed_form_solution(pos, vx0, tf, t_steps, alpha, beta, G)
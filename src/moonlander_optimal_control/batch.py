@@ -0,0 +1,404 @@
+from typing import Optional, Union
+
+import numpy as np
+
+from .guess import initial_guess, resample_guess
+
+# Number of states + costates, and of boundary conditions (one extra for tf)
+N_VARS = 8
+N_BCS = 9
+
+
+def _broadcast_params(n, **params):
+    """Turn scalar or per-lander parameters into (n, 1) columns"""
+    return {
+        name: np.broadcast_to(np.asarray(value, dtype=float), (n,)).reshape(n, 1)
+        for name, value in params.items()
+    }
+
+
+def _rhs(y, prm, final_angle):
+    """Batched ODE right hand side, per unit of tf.
+
+    The Jacobian of the right hand side is the constant linear part of
+    ``_linear_jacobian`` plus, for the final-angle model, the two entries
+    d(f5)/d(y1) and d(f5)/d(y6), which are returned separately so the Newton
+    blocks can be assembled without dense 8x8 products.
+
+    :param y:       State/costate values, shape (n, 8, m)
+    :param prm:     Parameters as (n, 1) columns (see ``_broadcast_params``)
+    :return:        g (n, 8, m), and the final-angle partials e1, e6 (n, m)
+                    (None for the baseline model)
+    """
+    half_inv_alpha = 0.5 / prm["alpha"]
+
+    g = np.empty_like(y)
+    g[:, 0] = y[:, 2]
+    g[:, 1] = y[:, 3]
+    g[:, 2] = y[:, 6] * half_inv_alpha
+    g[:, 3] = y[:, 7] * half_inv_alpha - prm["G"]
+    g[:, 4] = 0
+    g[:, 5] = prm["nu"] * (y[:, 1] <= 0)
+    g[:, 6] = -y[:, 4]
+    g[:, 7] = -y[:, 5]
+
+    if not final_angle:
+        return g, None, None
+
+    on = prm["final_angle_on"]
+    inv = 1 / (y[:, 1] + prm["rho"])
+    ux = y[:, 6] * half_inv_alpha
+    g[:, 5] += on * 2 * ux**2 * inv**3
+    e1 = on * -6 * ux**2 * inv**4
+    e6 = on * 4 * ux * half_inv_alpha * inv**3
+    return g, e1, e6
+
+
+def _linear_jacobian(half_inv_alpha):
+    """Constant part of d(g)/dy per lander, shape (n, 1, 8, 8)"""
+    n = half_inv_alpha.shape[0]
+    jac = np.zeros((n, 1, N_VARS, N_VARS))
+    jac[:, 0, 0, 2] = 1
+    jac[:, 0, 1, 3] = 1
+    jac[:, 0, 2, 6] = half_inv_alpha[:, 0]
+    jac[:, 0, 3, 7] = half_inv_alpha[:, 0]
+    jac[:, 0, 6, 4] = -1
+    jac[:, 0, 7, 5] = -1
+    return jac
+
+
+def _apply_jacobian(v, half_inv_alpha, e1, e6):
+    """d(g)/dy applied to vectors v of shape (n, 8, m)"""
+    out = np.zeros_like(v)
+    out[:, 0] = v[:, 2]
+    out[:, 1] = v[:, 3]
+    out[:, 2] = v[:, 6] * half_inv_alpha
+    out[:, 3] = v[:, 7] * half_inv_alpha
+    out[:, 6] = -v[:, 4]
+    out[:, 7] = -v[:, 5]
+    if e1 is not None:
+        out[:, 5] = e1 * v[:, 1] + e6 * v[:, 6]
+    return out
+
+
+def _bc(ya, yb, prm, final_angle):
+    """Batched boundary conditions and their Jacobians.
+
+    :return:    bc (n, 9), dbc_dya (n, 9, 8), dbc_dyb (n, 9, 8)
+    """
+    n = ya.shape[0]
+    col = {name: value[:, 0] for name, value in prm.items()}
+    alpha, beta, G, nu = col["alpha"], col["beta"], col["G"], col["nu"]
+
+    uxf = yb[:, 6] / (2 * alpha)
+    uyf = yb[:, 7] / (2 * alpha)
+
+    res = np.empty((n, N_BCS))
+    res[:, 0] = ya[:, 0] - col["x_init"]
+    res[:, 1] = ya[:, 1] - col["y_init"]
+    res[:, 2] = ya[:, 2] - col["vx0"]
+    res[:, 3] = ya[:, 3]
+    res[:, 4] = yb[:, 1]
+    res[:, 5] = yb[:, 4]
+    res[:, 6] = yb[:, 6] - 2 * beta * yb[:, 2]
+    res[:, 7] = yb[:, 7] - 2 * beta * yb[:, 3]
+    res[:, 8] = (
+        yb[:, 4] * yb[:, 2]
+        + yb[:, 5] * yb[:, 3]
+        + yb[:, 6] * uxf
+        + yb[:, 7] * (uyf - G)
+        - alpha * (uxf**2 + uyf**2)
+        - col["gamma"]
+        + nu * np.minimum(0, yb[:, 1])
+    )
+
+    dya = np.zeros((n, N_BCS, N_VARS))
+    dya[:, [0, 1, 2, 3], [0, 1, 2, 3]] = 1
+
+    dyb = np.zeros((n, N_BCS, N_VARS))
+    dyb[:, 4, 1] = 1
+    dyb[:, 5, 4] = 1
+    dyb[:, 6, 2] = -2 * beta
+    dyb[:, 6, 6] = 1
+    dyb[:, 7, 3] = -2 * beta
+    dyb[:, 7, 7] = 1
+    dyb[:, 8, 1] = nu * (yb[:, 1] < 0)
+    dyb[:, 8, 2] = yb[:, 4]
+    dyb[:, 8, 3] = yb[:, 5]
+    dyb[:, 8, 4] = yb[:, 2]
+    dyb[:, 8, 5] = yb[:, 3]
+    dyb[:, 8, 6] = uxf
+    dyb[:, 8, 7] = uyf - G
+
+    if final_angle:
+        on = col["final_angle_on"]
+        inv = 1 / (yb[:, 1] + col["rho"])
+        res[:, 8] -= on * (uxf * inv) ** 2
+        dyb[:, 8, 1] += on * 2 * uxf**2 * inv**3
+        dyb[:, 8, 6] -= on * uxf * inv**2 / alpha
+
+    return res, dya, dyb
+
+
+def _residuals(y, tf, s, prm, final_angle, jac=False):
+    """Hermite-Simpson collocation residuals on a shared mesh.
+
+    Returns the collocation residuals (n, m - 1, 8) and boundary residuals
+    (n, 9) and, with ``jac``, the blocks needed for the Newton step: d/dy_i,
+    d/dy_i+1 and d/dtf per interval and the boundary condition Jacobians.
+    """
+    h = np.diff(s)[None, None, :]
+    scale = tf[:, None, None]
+    g, e1, e6 = _rhs(y, prm, final_angle)
+    f = scale * g
+
+    y_mid = 0.5 * (y[:, :, 1:] + y[:, :, :-1]) - 0.125 * h * (
+        f[:, :, 1:] - f[:, :, :-1]
+    )
+    g_mid, e1_mid, e6_mid = _rhs(y_mid, prm, final_angle)
+
+    col = (
+        y[:, :, 1:]
+        - y[:, :, :-1]
+        - h / 6 * (f[:, :, :-1] + 4 * scale * g_mid + f[:, :, 1:])
+    )
+    bc, dya, dyb = _bc(y[:, :, 0], y[:, :, -1], prm, final_angle)
+
+    col = col.transpose(0, 2, 1)
+    if not jac:
+        return col, bc
+
+    # With J = tf * (K + E), where E only has the final-angle entries (5, 1) and
+    # (5, 6), the interval blocks are
+    #   d/dy_i   = -I - h/6 J_i - h/3 J_mid - h^2/12 J_mid J_i
+    #   d/dy_i+1 =  I - h/6 J_i+1 - h/3 J_mid + h^2/12 J_mid J_i+1
+    # and J_mid J = tf^2 (K K + K E + E_mid K) is sparse apart from K K.
+    half_inv_alpha = 0.5 / prm["alpha"]
+    k = _linear_jacobian(half_inv_alpha)
+    th = (tf[:, None] * h[0])[:, :, None, None]
+    eye = np.eye(N_VARS)
+
+    left = -eye - th / 2 * k - th**2 / 12 * (k @ k)
+    right = eye - th / 2 * k + th**2 / 12 * (k @ k)
+
+    if final_angle:
+        th, th2 = th[..., 0, 0], th[..., 0, 0] ** 2 / 12
+        for j, (e, e_mid) in ((1, (e1, e1_mid)), (6, (e6, e6_mid))):
+            left[:, :, 5, j] -= th / 6 * e[:, :-1] + th / 3 * e_mid
+            right[:, :, 5, j] -= th / 6 * e[:, 1:] + th / 3 * e_mid
+            # K E: K[7, 5] = -1 moves row 5 of E into row 7
+            left[:, :, 7, j] += th2 * e[:, :-1]
+            right[:, :, 7, j] -= th2 * e[:, 1:]
+        # E_mid K: K[1, 3] = 1 and K[6, 4] = -1
+        left[:, :, 5, 3] -= th2 * e1_mid
+        left[:, :, 5, 4] += th2 * e6_mid
+        right[:, :, 5, 3] += th2 * e1_mid
+        right[:, :, 5, 4] -= th2 * e6_mid
+
+    # d/dtf, with d(y_mid)/dtf = -h/8 (g_i+1 - g_i)
+    dmid_dp = -0.125 * h * (g[:, :, 1:] - g[:, :, :-1])
+    j_dmid = scale * _apply_jacobian(dmid_dp, half_inv_alpha, e1_mid, e6_mid)
+    param = -h / 6 * (g[:, :, :-1] + 4 * (g_mid + j_dmid) + g[:, :, 1:])
+
+    return col, bc, (left, right, param.transpose(0, 2, 1), dya, dyb)
+
+
+def _newton_step(col, bc, blocks):
+    """Solve the stacked block-diagonal Newton system by batched condensing.
+
+    Each interval equation ``L_i dy_i + R_i dy_i+1 + P_i dtf = -r_i`` is solved
+    for ``dy_i+1``, so every node's step is an affine function of the unknowns
+    ``z = (dy_0, dtf)``.  The boundary conditions then give one dense 9x9
+    system per lander, and the node steps follow from ``z``.  All operations
+    are vectorized across landers, which avoids the fill-in a general sparse LU
+    produces on the two-point boundary structure.
+
+    :return:    dy (n, 8, m), dtf (n,)
+    """
+    left, right, param, dya, dyb = blocks
+    n, intervals = col.shape[:2]
+
+    # dy_i+1 = A_i dy_i + B_i dtf + C_i, from one batched solve
+    rhs = np.concatenate([left, param[..., None], col[..., None]], axis=3)
+    transfer = -np.linalg.solve(right, rhs)
+
+    # W_i maps (z, 1) to dy_i
+    w = np.zeros((n, intervals + 1, N_VARS, N_VARS + 2))
+    w[:, 0, :, :N_VARS] = np.eye(N_VARS)
+    for i in range(intervals):
+        w[:, i + 1] = transfer[:, i, :, :N_VARS] @ w[:, i]
+        w[:, i + 1, :, N_VARS:] += transfer[:, i, :, N_VARS:]
+
+    lhs = dyb @ w[:, -1]
+    lhs[:, :, :N_VARS] += dya
+    rhs = (-bc - lhs[:, :, -1])[..., None]
+    try:
+        z = np.linalg.solve(lhs[:, :, :-1], rhs)[..., 0]
+    except np.linalg.LinAlgError:
+        z = (np.linalg.pinv(lhs[:, :, :-1]) @ rhs)[..., 0]
+
+    dy = w[..., :-1] @ z[:, None, :, None] + w[..., -1:]
+    return dy[..., 0].transpose(0, 2, 1), z[:, -1]
+
+
+def _max_residual(col, bc):
+    return np.maximum(np.max(np.abs(col), axis=(1, 2)), np.max(np.abs(bc), axis=1))
+
+
+def solve_batch(
+    pos,
+    vx0,
+    model: str = "baseline",
+    t_steps: int = 100,
+    tf_guess=20.0,
+    y0_guess: float = 1.0,
+    guess: Optional[Union[str, np.ndarray]] = "auto",
+    tol: float = 1e-8,
+    max_iter: int = 50,
+    chunk_size: int = 256,
+    **params,
+):
+    """Solve many baseline or final-angle landers at once on a shared mesh.
+
+    All problems are stacked into one block-diagonal Newton system per
+    iteration (solved by batched condensing, see ``_newton_step``), the ODE is
+    evaluated for every lander in a single vectorized call, and landers that
+    have converged are masked out of later iterations.
+    The collocation is the same 4th order Hermite-Simpson scheme ``solve_bvp``
+    uses, but on a fixed uniform mesh of ``t_steps`` nodes (no mesh refinement).
+
+    :param pos:         Initial positions, shape (n, 2)
+    :param vx0:         Initial x velocities, scalar or shape (n,)
+    :param model:       ``"baseline"`` or ``"final_angle"``
+    :param tf_guess:    Final time guess, scalar or shape (n,)
+    :param guess:       ``guess.initial_guess`` method applied to every lander (which
+                        then also sets ``tf_guess``), a state/costate guess of shape
+                        (n, 8, t_steps), or None for the straight-line guess
+    :param tol:         Convergence tolerance on the max abs residual
+    :param chunk_size:  Number of landers per stacked system (bounds memory)
+    :param params:      Model weights (``alpha``, ``beta``, ``gamma``, ``nu``, ``G``
+                        and, for the final-angle model, ``rho`` and
+                        ``final_angle_on``), scalars or shape (n,)
+    :return:            ``(t, x, y, xp, yp, ux, uy, tf), info`` where every array
+                        has a leading lander axis and ``info`` holds ``success``,
+                        ``niter`` and ``residual`` arrays
+    """
+    if model not in ("baseline", "final_angle"):
+        raise ValueError(f"Unknown model {model!r}")
+    final_angle = model == "final_angle"
+
+    pos = np.atleast_2d(np.asarray(pos, dtype=float))
+    n = pos.shape[0]
+    weights = {"alpha": 10.0, "beta": 25.0, "gamma": 3.0, "nu": 0.0, "G": 2.0}
+    if final_angle:
+        weights.update(rho=0.01, final_angle_on=1.0)
+    weights.update(params)
+    prm = _broadcast_params(n, x_init=pos[:, 0], y_init=pos[:, 1], vx0=vx0, **weights)
+
+    s = np.linspace(0, 1, t_steps)
+    tf = np.broadcast_to(np.asarray(tf_guess, dtype=float), (n,)).copy()
+    if guess is None:
+        y = y0_guess * np.ones((n, N_VARS, t_steps))
+        y[:, 0] = prm["x_init"]
+        y[:, 1] = np.linspace(prm["y_init"][:, 0], 0, t_steps).T
+        y[:, 2] = np.linspace(prm["vx0"][:, 0], 0, t_steps).T
+    elif isinstance(guess, str):
+        y = np.empty((n, N_VARS, t_steps))
+        for i in range(n):
+            lander = {name: prm[name][i, 0] for name in weights}
+            start = initial_guess(
+                tuple(pos[i]),
+                prm["vx0"][i, 0],
+                t_steps,
+                tf[i],
+                y0_guess,
+                guess,
+                model,
+                **lander,
+            )
+            _, y[i], tf[i] = resample_guess(start, t_steps)
+    else:
+        y = np.array(guess, dtype=float)
+
+    success = np.zeros(n, dtype=bool)
+    niter = np.zeros(n, dtype=int)
+    residual = np.full(n, np.inf)
+
+    for start in range(0, n, chunk_size):
+        chunk = slice(start, min(start + chunk_size, n))
+        _newton(
+            y[chunk],
+            tf[chunk],
+            s,
+            {name: value[chunk] for name, value in prm.items()},
+            final_angle,
+            tol,
+            max_iter,
+            success[chunk],
+            niter[chunk],
+            residual[chunk],
+        )
+
+    alpha, G = prm["alpha"], prm["G"]
+    t_vals = s[None, :] * tf[:, None]
+    solution = (
+        t_vals,
+        y[:, 0],
+        y[:, 1],
+        y[:, 2],
+        y[:, 3],
+        y[:, 6] / (2 * alpha),
+        y[:, 7] / (2 * alpha) - G,
+        tf,
+    )
+    return solution, {"success": success, "niter": niter, "residual": residual}
+
+
+def _newton(y, tf, s, prm, final_angle, tol, max_iter, success, niter, residual):
+    """Damped Newton iteration on a chunk of landers, updating the arrays in place"""
+    active = np.arange(y.shape[0])
+
+    for _ in range(max_iter):
+        sub = {name: value[active] for name, value in prm.items()}
+        col, bc, blocks = _residuals(y[active], tf[active], s, sub, final_angle, True)
+        norm = _max_residual(col, bc)
+        residual[active] = norm
+
+        done = norm < tol
+        success[active[done]] = True
+        if np.all(done):
+            return
+
+        # Mask out the converged landers
+        keep = ~done
+        active, col, bc = active[keep], col[keep], bc[keep]
+        blocks = tuple(block[keep] for block in blocks)
+        sub = {name: value[keep] for name, value in sub.items()}
+        niter[active] += 1
+
+        dy, dtf = _newton_step(col, bc, blocks)
+
+        # Backtracking on the residual norm, per lander
+        cost = np.sum(col**2, axis=(1, 2)) + np.sum(bc**2, axis=1)
+        damping = np.ones(len(active))
+        pending = np.ones(len(active), dtype=bool)
+        y_act, tf_act = y[active], tf[active]
+        while pending.any():
+            trial_y = y_act + damping[:, None, None] * dy
+            trial_tf = tf_act + damping * dtf
+            trial_col, trial_bc = _residuals(trial_y, trial_tf, s, sub, final_angle)
+            trial_cost = np.sum(trial_col**2, axis=(1, 2)) + np.sum(trial_bc**2, axis=1)
+
+            accept = pending & (
+                (trial_cost < (1 - 0.2 * damping) * cost) | (damping < 0.1)
+            )
+            y[active[accept]] = trial_y[accept]
+            tf[active[accept]] = trial_tf[accept]
+            pending &= ~accept
+            damping[pending] *= 0.5
+
+    sub = {name: value[active] for name, value in prm.items()}
+    residual[active] = _max_residual(
+        *_residuals(y[active], tf[active], s, sub, final_angle)
+    )
+    success[active] = residual[active] < tol
@@ -0,0 +1,356 @@
+# Memoization of solver results: the solvers' ``cache`` argument is a
+# ``SolutionCache``, None for the default cache set with ``enable_cache``, or
+# False to bypass caching.  Only converged solves are stored
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+# Bump whenever a change to the solvers changes their output; entries stored
+# under another version are never returned and are removed by ``invalidate``
+SOLVER_VERSION = "4"
+
+SOLUTION_FIELDS = ("t", "x", "y", "xp", "yp", "ux", "uy", "tf")
+
+_default_cache = None
+
+
+def _canonical(value):
+    """Convert parameters to a JSON-serializable form that hashes identically for equal values"""
+    if isinstance(value, dict):
+        return {str(key): _canonical(value[key]) for key in sorted(value)}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if isinstance(value, (int, float, np.integer, np.floating)):
+        # Treat 10 and 10.0 as the same parameter value
+        return repr(float(value))
+    return value
+
+
+class SolutionCache:
+    """
+    Two-level memoizing cache for solver results
+
+    Results are dicts of arrays stored under a canonical hash of the model name,
+    its parameters and the solver version.  The first level is an in-memory LRU
+    bounded by total array bytes; the optional second level is a directory of
+    compressed ``.npz`` files, also bounded by total bytes (least recently used
+    files are removed first, with sizes tracked rather than re-read on every
+    write).  The parameters of the problems stored through ``cached_call`` are
+    indexed by model, so that solvers can look up the nearest solved problem
+    (see ``guess.neighbour_guess``); on disk, each entry keeps them in a
+    ``.json`` file next to its arrays, so the index survives restarts.
+    """
+
+    def __init__(
+        self,
+        directory: Optional[Union[str, Path]] = None,
+        max_bytes: int = 256 * 2**20,
+        max_disk_bytes: Optional[int] = None,
+        version: str = SOLVER_VERSION,
+    ):
+        """
+        :param directory (path):        Directory for the on-disk level (None for memory only)
+        :param max_bytes (int):         Bound on the total array bytes held in memory
+        :param max_disk_bytes (int):    Bound on the total size of the on-disk files (None for no bound)
+        :param version (str):           Solver version the entries belong to
+        """
+        self.directory = Path(directory) if directory is not None else None
+        self.max_bytes = max_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self.version = str(version)
+
+        self._entries = OrderedDict()
+        self._solved = {}
+        self._bytes = 0
+        # Size of each on-disk entry, least recently used first
+        self._disk = OrderedDict()
+        self._disk_bytes = 0
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0}
+
+        if self.directory is not None:
+            self._version_dir.mkdir(parents=True, exist_ok=True)
+            self._scan_disk()
+
+    def _scan_disk(self):
+        """Rebuild the disk sizes and the index of solved problems from the files"""
+        files = []
+        for path in self._version_dir.glob("*.npz"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, path.stem, stat.st_size))
+        files.sort()
+
+        with self._lock:
+            self._disk = OrderedDict((key, size) for _, key, size in files)
+            self._disk_bytes = sum(self._disk.values())
+            for key in self._disk:
+                try:
+                    with open(self._version_dir / f"{key}.json") as f:
+                        problem = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                self._solved[key] = (problem["model"], problem["params"])
+
+    @property
+    def _version_dir(self):
+        return self.directory / f"v{self.version}"
+
+    def key(self, model: str, **params) -> str:
+        """Canonical hash of a model name and its parameters"""
+        payload = json.dumps(
+            {"model": model, "version": self.version, "params": _canonical(params)},
+            sort_keys=True,
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, np.ndarray]]:
+        """Look up an entry, promoting on-disk hits into memory"""
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self._stats["hits"] += 1
+                return self._entries[key]
+
+        arrays = self._load(key)
+
+        with self._lock:
+            if arrays is None:
+                self._stats["misses"] += 1
+                return None
+            self._stats["disk_hits"] += 1
+            self._insert(key, arrays)
+        return arrays
+
+    def index(self, key: str, model: str, params: dict):
+        """Record that ``key`` holds the solution of ``model`` with ``params``"""
+        with self._lock:
+            if key in self._solved:
+                return
+            self._solved[key] = (model, dict(params))
+            on_disk = key in self._disk
+        if on_disk:
+            self._store_problem(key, model, params)
+
+    def _store_problem(self, key, model, params):
+        try:
+            text = json.dumps({"model": model, "params": params}, default=_plain)
+        except TypeError:
+            return  # Indexed in memory only
+        fd, tmp = tempfile.mkstemp(dir=self._version_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.replace(tmp, self._version_dir / f"{key}.json")
+
+    def solved(self, model: str) -> List[Tuple[str, dict]]:
+        """Keys and parameters of the indexed solutions of ``model``"""
+        with self._lock:
+            return [
+                (key, params)
+                for key, (name, params) in self._solved.items()
+                if name == model
+            ]
+
+    def put(self, key: str, arrays: Dict[str, np.ndarray]):
+        """Store an entry in memory and, if configured, on disk"""
+        arrays = {name: np.array(value) for name, value in arrays.items()}
+        for value in arrays.values():
+            value.setflags(write=False)
+
+        with self._lock:
+            self._insert(key, arrays)
+        self._store(key, arrays)
+
+    def _insert(self, key, arrays):
+        if key in self._entries:
+            self._bytes -= _nbytes(self._entries.pop(key))
+        self._entries[key] = arrays
+        self._bytes += _nbytes(arrays)
+
+        while self._bytes > self.max_bytes and len(self._entries) > 1:
+            evicted_key, evicted = self._entries.popitem(last=False)
+            self._bytes -= _nbytes(evicted)
+            if evicted_key not in self._disk:
+                self._solved.pop(evicted_key, None)
+            self._stats["evictions"] += 1
+
+    def _load(self, key):
+        if self.directory is None:
+            return None
+
+        path = self._version_dir / f"{key}.npz"
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                arrays = {name: data[name] for name in data.files}
+        except (OSError, ValueError):
+            return None
+
+        os.utime(path)  # Mark as recently used for disk eviction
+        with self._lock:
+            if key in self._disk:
+                self._disk.move_to_end(key)
+        for value in arrays.values():
+            value.setflags(write=False)
+        return arrays
+
+    def _store(self, key, arrays):
+        if self.directory is None:
+            return
+
+        # Write to a temporary file first so concurrent readers never see partial files
+        fd, tmp = tempfile.mkstemp(dir=self._version_dir, suffix=".npz")
+        with os.fdopen(fd, "wb") as f:
+            np.savez_compressed(f, **arrays)
+        path = self._version_dir / f"{key}.npz"
+        os.replace(tmp, path)
+        size = path.stat().st_size
+
+        with self._lock:
+            self._disk_bytes += size - self._disk.pop(key, 0)
+            self._disk[key] = size
+            over = (
+                self.max_disk_bytes is not None
+                and self._disk_bytes > self.max_disk_bytes
+            )
+        if over:
+            self._trim_disk()
+
+    def _trim_disk(self):
+        """Remove the least recently used files until the disk bound holds"""
+        evicted = []
+        with self._lock:
+            while self._disk_bytes > self.max_disk_bytes and len(self._disk) > 1:
+                key, size = self._disk.popitem(last=False)
+                self._disk_bytes -= size
+                self._stats["evictions"] += 1
+                if key not in self._entries:
+                    self._solved.pop(key, None)
+                evicted.append(key)
+        for key in evicted:
+            for suffix in (".npz", ".json"):
+                (self._version_dir / f"{key}{suffix}").unlink(missing_ok=True)
+
+    @property
+    def stats(self) -> dict:
+        """Hit/miss/eviction counters and the current memory footprint"""
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries), "bytes": self._bytes}
+
+    def clear(self, disk: bool = True):
+        """Remove every entry of the current version (and reset the counters)"""
+        with self._lock:
+            self._entries.clear()
+            self._solved.clear()
+            self._bytes = 0
+            self._disk.clear()
+            self._disk_bytes = 0
+            self._stats = dict.fromkeys(self._stats, 0)
+
+        if self.directory is not None:
+            if disk:
+                shutil.rmtree(self._version_dir, ignore_errors=True)
+            self._version_dir.mkdir(parents=True, exist_ok=True)
+            self._scan_disk()
+
+    def invalidate(self, version: Optional[str] = None):
+        """Switch to a new solver version and drop entries stored under any other version"""
+        if version is not None:
+            self.version = str(version)
+        self.clear(disk=False)
+
+        if self.directory is not None:
+            for path in self.directory.glob("v*"):
+                if path.is_dir() and path != self._version_dir:
+                    shutil.rmtree(path, ignore_errors=True)
+            self._version_dir.mkdir(parents=True, exist_ok=True)
+
+
+def _plain(value):
+    """JSON form of the NumPy values in problem parameters"""
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"{type(value).__name__} is not JSON serializable")
+
+
+def _nbytes(arrays):
+    return sum(value.nbytes for value in arrays.values())
+
+
+def enable_cache(directory=None, **kwargs) -> SolutionCache:
+    """Create a ``SolutionCache`` and make it the default for every solver entry point"""
+    global _default_cache
+    _default_cache = SolutionCache(directory, **kwargs)
+    return _default_cache
+
+
+def disable_cache():
+    """Stop caching by default (caches passed explicitly still work)"""
+    global _default_cache
+    _default_cache = None
+
+
+def get_cache() -> Optional[SolutionCache]:
+    """The default cache, or None if caching is disabled"""
+    return _default_cache
+
+
+def cached_call(
+    model: str,
+    params: dict,
+    compute: Callable[[], Tuple],
+    cache=None,
+    fields: Tuple[str, ...] = SOLUTION_FIELDS,
+    result_type=None,
+    converged: Optional[Callable[[Tuple], bool]] = None,
+):
+    """Memoize a solver call whose result is a tuple of arrays named by ``fields``.
+
+    ``cache`` is a ``SolutionCache``, None for the default cache, or False to
+    bypass caching for this call.  If ``result_type`` is given (e.g.
+    ``result.Solution``), the result is stored with its ``to_arrays`` method
+    and rebuilt with ``result_type.from_arrays`` instead.  Only converged
+    results are stored, so a failed solve is retried next time instead of
+    being served (and used as a neighbour guess) forever: ``converged``
+    tells them apart, and defaults to the ``success`` attribute of the result
+    (every result without one is stored).
+    """
+    if cache is None:
+        cache = _default_cache
+    if not cache:
+        return compute()
+
+    key = cache.key(model, **params)
+    arrays = cache.get(key)
+    if arrays is not None:
+        cache.index(key, model, params)
+        if result_type is not None:
+            return result_type.from_arrays(arrays)
+        return tuple(arrays[name][()] for name in fields)
+
+    result = compute()
+    if converged is None:
+        ok = getattr(result, "success", True)
+    else:
+        ok = converged(result)
+    if not ok:
+        return result
+    if result_type is not None:
+        cache.put(key, result.to_arrays())
+    else:
+        cache.put(key, dict(zip(fields, result)))
+    cache.index(key, model, params)
+    return result
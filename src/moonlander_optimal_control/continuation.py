@@ -0,0 +1,143 @@
+from typing import Iterable, Iterator, List, Tuple
+
+import numpy as np
+
+from .guess import initial_guess
+from .solver import MODELS, _solve_system, _unpack
+
+# Defaults shared by both models, used when a parameter is not on the path
+_DEFAULTS = {"alpha": 10.0, "beta": 25.0, "gamma": 3.0, "G": 2.0}
+
+
+def parameter_path(param: str, values: Iterable[float]) -> List[dict]:
+    """Continuation path that varies a single weight, e.g. ``parameter_path("nu", [0, 10, 50])``"""
+    return [{param: value} for value in values]
+
+
+def _converged(sol):
+    return sol.success and sol.p[0] > 0
+
+
+def _cold_start(
+    system, model, pos, vx0, t_steps, tf_guess, y0_guess, jacobian, guess, params
+):
+    """Solve the first point from a ``guess.initial_guess`` seed"""
+    start = initial_guess(pos, vx0, t_steps, tf_guess, y0_guess, guess, model, **params)
+    return _solve_system(
+        system, pos, vx0, t_steps, tf_guess, y0_guess, jacobian, guess=start
+    )
+
+
+def iter_continuation(
+    pos: Tuple[float, float],
+    vx0: float,
+    path: List[dict],
+    model: str = "baseline",
+    t_steps: int = 200,
+    tf_guess: float = 20.0,
+    y0_guess: float = 1.0,
+    jacobian: bool = True,
+    guess: str = "auto",
+    min_step: float = 1 / 64,
+    grow: float = 2.0,
+    shrink: float = 0.5,
+    **params,
+) -> Iterator[Tuple[dict, object]]:
+    """Solve a chain of problems along a parameter path, warm-starting each solve.
+
+    Every solve is seeded with the mesh, ``sol.y`` and ``tf`` of the last
+    converged solution.  Between two consecutive path points the parameters are
+    interpolated linearly; the step (as a fraction of that segment) starts at
+    the whole segment, is multiplied by ``shrink`` whenever ``solve_bvp`` fails
+    and by ``grow`` after each success.
+
+    :param path:        List of parameter dicts, e.g. ``parameter_path("nu", ...)``
+    :param model:       ``"baseline"`` or ``"final_angle"``
+    :param guess:       ``guess.initial_guess`` method seeding the first solve
+    :param min_step:    Smallest segment fraction tried before giving up
+    :param params:      Fixed model keyword arguments (``alpha``, ``rho``, ...)
+    :return:            ``(parameters, sol)`` for every path point, where ``sol`` is
+                        the ``solve_bvp`` result
+    :raises RuntimeError: if a path point cannot be reached
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown model {model!r}, expected one of {list(MODELS)}")
+    build = MODELS[model]
+
+    current = {**params, **path[0]}
+    sol = _cold_start(
+        build(pos, vx0, **current),
+        model,
+        pos,
+        vx0,
+        t_steps,
+        tf_guess,
+        y0_guess,
+        jacobian,
+        guess,
+        current,
+    )
+    if not _converged(sol):
+        raise RuntimeError(f"Continuation failed at the starting point {path[0]}")
+    yield current, sol
+
+    step = 1.0
+    for target in path[1:]:
+        start = current
+        target = {**start, **target}
+        done = 0.0
+
+        while done < 1.0:
+            trial = min(1.0, done + step)
+            trial_params = {
+                key: (
+                    start[key] + trial * (value - start[key])
+                    if key in start
+                    and isinstance(value, (int, float, np.floating))
+                    and not isinstance(value, bool)
+                    else value
+                )
+                for key, value in target.items()
+            }
+
+            trial_sol = _solve_system(
+                build(pos, vx0, **trial_params),
+                pos,
+                vx0,
+                t_steps,
+                tf_guess,
+                y0_guess,
+                jacobian,
+                guess=(sol.x, sol.y, sol.p[0]),
+            )
+
+            if _converged(trial_sol):
+                sol, current, done = trial_sol, trial_params, trial
+                step = min(1.0, step * grow)
+            else:
+                step *= shrink
+                if step < min_step:
+                    raise RuntimeError(
+                        f"Continuation stalled between {start} and {target} "
+                        f"(reached {current})"
+                    )
+
+        yield target, sol
+
+
+def continuation(
+    pos: Tuple[float, float],
+    vx0: float,
+    path: List[dict],
+    model: str = "baseline",
+    **kwargs,
+):
+    """Solve along a parameter path with warm starts (see ``iter_continuation``).
+
+    Returns: list of (t, x, y, xp, yp, ux, uy, tf), one per path point
+    """
+    results = []
+    for point, sol in iter_continuation(pos, vx0, path, model, **kwargs):
+        weights = {**_DEFAULTS, **point}
+        results.append(_unpack(sol, weights["alpha"], weights["G"]))
+    return results
@@ -0,0 +1,415 @@
+import time
+from typing import Tuple
+
+import numpy as np
+from scipy.optimize import LinearConstraint, NonlinearConstraint, minimize
+from scipy.sparse import bmat, coo_matrix, csr_matrix, vstack
+from scipy.sparse.linalg import lsqr, spsolve
+
+from .guess import initial_guess, resample_guess
+from .result import Solution
+
+# Order of the blocks in the decision vector; each block has one entry per node
+_BLOCKS = ("x", "y", "xp", "yp", "ux", "uy")
+
+# Row of each dynamics equation and the variable its right hand side depends on
+_DYNAMICS = (("x", "xp"), ("y", "yp"), ("xp", "ux"), ("yp", "uy"))
+
+
+class _Transcription:
+    """
+    Trapezoidal transcription of the baseline landing problem
+
+    The decision vector is ``(x, y, xp, yp, ux, uy, tf)`` with the states and
+    controls sampled on ``n`` nodes of the normalized time ``s = t / tf``, where
+    ``uy`` is the vertical thrust (the acceleration is ``uy - G``).  The cost is
+
+        tf * integral of (gamma + alpha (ux^2 + uy^2) + nu max(0, -y)) ds
+            + beta (xp(tf)^2 + yp(tf)^2)
+
+    and every function below returns exact (sparse) derivatives.
+    """
+
+    def __init__(self, pos, vx0, n, alpha, beta, gamma, nu, G):
+        self.pos = pos
+        self.vx0 = vx0
+        self.n = n
+        self.alpha = alpha
+        self.beta = beta
+        self.gamma = gamma
+        self.nu = nu
+        self.G = G
+
+        self.h = 1 / (n - 1)
+        self.weights = np.full(n, self.h)
+        self.weights[[0, -1]] *= 0.5
+        self.size = len(_BLOCKS) * n + 1
+        self.tf = self.size - 1
+
+        self._defect_pattern()
+
+    def index(self, block):
+        """Slice of a variable block in the decision vector"""
+        start = _BLOCKS.index(block) * self.n
+        return slice(start, start + self.n)
+
+    def unpack(self, z):
+        return {block: z[self.index(block)] for block in _BLOCKS}, z[self.tf]
+
+    def objective(self, z):
+        v, tf = self.unpack(z)
+        running = (
+            self.gamma
+            + self.alpha * (v["ux"] ** 2 + v["uy"] ** 2)
+            + self.nu * np.maximum(0, -v["y"])
+        )
+        return tf * self.weights @ running + self.beta * (
+            v["xp"][-1] ** 2 + v["yp"][-1] ** 2
+        )
+
+    def gradient(self, z):
+        v, tf = self.unpack(z)
+        grad = np.zeros(self.size)
+        grad[self.index("ux")] = 2 * self.alpha * tf * self.weights * v["ux"]
+        grad[self.index("uy")] = 2 * self.alpha * tf * self.weights * v["uy"]
+        grad[self.index("y")] = -self.nu * tf * self.weights * (v["y"] < 0)
+        grad[self.index("xp").stop - 1] += 2 * self.beta * v["xp"][-1]
+        grad[self.index("yp").stop - 1] += 2 * self.beta * v["yp"][-1]
+        grad[self.tf] = self.weights @ (
+            self.gamma
+            + self.alpha * (v["ux"] ** 2 + v["uy"] ** 2)
+            + self.nu * np.maximum(0, -v["y"])
+        )
+        return grad
+
+    def hessian(self, z):
+        v, tf = self.unpack(z)
+        diag = np.zeros(self.size)
+        for block in ("ux", "uy"):
+            diag[self.index(block)] = 2 * self.alpha * tf * self.weights
+        diag[self.index("xp").stop - 1] = 2 * self.beta
+        diag[self.index("yp").stop - 1] = 2 * self.beta
+
+        cross = np.zeros(self.size)
+        for block in ("ux", "uy"):
+            cross[self.index(block)] = 2 * self.alpha * self.weights * v[block]
+        cross[self.index("y")] = -self.nu * self.weights * (v["y"] < 0)
+
+        return self._with_tf_column(diag, cross)
+
+    def _with_tf_column(self, diag, cross):
+        """Sparse symmetric matrix with a diagonal and a dense tf row/column"""
+        nodes = np.arange(self.size - 1)
+        rows = np.concatenate(
+            [np.arange(self.size), nodes, np.full(self.size - 1, self.tf)]
+        )
+        cols = np.concatenate(
+            [np.arange(self.size), np.full(self.size - 1, self.tf), nodes]
+        )
+        values = np.concatenate([diag, cross[:-1], cross[:-1]])
+        return coo_matrix((values, (rows, cols)), shape=(self.size, self.size)).tocsr()
+
+    def _defect_pattern(self):
+        """Sparsity of the defect Jacobian, fixed for the whole solve"""
+        k = np.arange(self.n - 1)
+        rows, cols = [], []
+        for j, (state, rate) in enumerate(_DYNAMICS):
+            row = j * (self.n - 1) + k
+            state_cols = self.index(state).start + k
+            rate_cols = self.index(rate).start + k
+            rows += [row, row, row, row, row]
+            cols += [
+                state_cols + 1,
+                state_cols,
+                rate_cols,
+                rate_cols + 1,
+                np.full(self.n - 1, self.tf),
+            ]
+        self._rows = np.concatenate(rows)
+        self._cols = np.concatenate(cols)
+
+    def _rates(self, v):
+        """Right hand side of each dynamics equation, per unit of tf"""
+        return {
+            "xp": v["xp"],
+            "yp": v["yp"],
+            "ux": v["ux"],
+            "uy": v["uy"] - self.G,
+        }
+
+    def defects(self, z):
+        """Trapezoidal defects X_k+1 - X_k - h tf / 2 (f_k + f_k+1), one block per state"""
+        v, tf = self.unpack(z)
+        rates = self._rates(v)
+        return np.concatenate(
+            [
+                np.diff(v[state])
+                - 0.5 * self.h * tf * (rates[rate][:-1] + rates[rate][1:])
+                for state, rate in _DYNAMICS
+            ]
+        )
+
+    def defects_jacobian(self, z):
+        v, tf = self.unpack(z)
+        rates = self._rates(v)
+        ones = np.ones(self.n - 1)
+        values = []
+        for _, rate in _DYNAMICS:
+            values += [
+                ones,
+                -ones,
+                -0.5 * self.h * tf * ones,
+                -0.5 * self.h * tf * ones,
+                -0.5 * self.h * (rates[rate][:-1] + rates[rate][1:]),
+            ]
+        return csr_matrix(
+            (np.concatenate(values), (self._rows, self._cols)),
+            shape=(4 * (self.n - 1), self.size),
+        )
+
+    def defects_hessian(self, z, multipliers):
+        """Hessian of multipliers . defects; only the tf/rate cross terms are nonzero"""
+        cross = np.zeros(self.size)
+        for j, (_, rate) in enumerate(_DYNAMICS):
+            lam = multipliers[j * (self.n - 1) : (j + 1) * (self.n - 1)]
+            block = self.index(rate)
+            cross[block.start : block.stop - 1] -= 0.5 * self.h * lam
+            cross[block.start + 1 : block.stop] -= 0.5 * self.h * lam
+        return self._with_tf_column(np.zeros(self.size), cross)
+
+    def boundary_constraint(self):
+        """Fixed initial state and landing on the ground, as a linear constraint"""
+        x_init, y_init = self.pos
+        rows = [
+            (self.index("x").start, x_init),
+            (self.index("y").start, y_init),
+            (self.index("xp").start, self.vx0),
+            (self.index("yp").start, 0.0),
+            (self.index("y").stop - 1, 0.0),
+        ]
+        matrix = np.zeros((len(rows), self.size))
+        for i, (col, _) in enumerate(rows):
+            matrix[i, col] = 1
+        values = np.array([value for _, value in rows])
+        return LinearConstraint(csr_matrix(matrix), values, values)
+
+    def initial_guess(self, tf_guess):
+        """Straight-line descent with hover thrust, as in ``solve_baseline``"""
+        x_init, y_init = self.pos
+        z = np.zeros(self.size)
+        z[self.index("x")] = x_init
+        z[self.index("y")] = np.linspace(y_init, 0, self.n)
+        z[self.index("xp")] = np.linspace(self.vx0, 0, self.n)
+        z[self.index("yp")] = -y_init / tf_guess
+        z[self.index("uy")] = self.G
+        z[self.tf] = tf_guess
+        return z
+
+    def guess_from_states(self, guess):
+        """Decision vector from a ``(mesh, y, tf)`` state/costate guess (see ``guess.initial_guess``)"""
+        mesh, y, tf = resample_guess(guess, self.n)
+        z = np.empty(self.size)
+        for block, row in zip(("x", "y", "xp", "yp"), y[:4]):
+            z[self.index(block)] = row
+        z[self.index("ux")] = y[6] / (2 * self.alpha)
+        z[self.index("uy")] = y[7] / (2 * self.alpha)
+        z[self.tf] = tf
+        return z
+
+
+def _solve_kkt(problem, z, tol, max_iter):
+    """Damped Newton method on the first-order optimality (KKT) conditions
+
+    Finds a stationary point of the cost subject to the defects and the
+    boundary conditions, whether or not it is a minimum.
+
+    Returns: decision vector, status (0 converged, 1 ``max_iter`` reached, 2 line
+             search failed), number of iterations
+    """
+    boundary = problem.boundary_constraint()
+    n_defects = 4 * (problem.n - 1)
+
+    def constraints_jacobian(z):
+        return vstack([problem.defects_jacobian(z), boundary.A]).tocsr()
+
+    def residual(z, lam):
+        jac = constraints_jacobian(z)
+        values = np.concatenate([problem.defects(z), boundary.A @ z - boundary.lb])
+        return np.concatenate([problem.gradient(z) + jac.T @ lam, values])
+
+    # Least-squares multipliers of the starting point
+    lam = lsqr(constraints_jacobian(z).T, -problem.gradient(z), atol=tol, btol=tol)[0]
+    res = residual(z, lam)
+    for niter in range(max_iter + 1):
+        if np.max(np.abs(res)) < tol:
+            return z, 0, niter
+        if niter == max_iter:
+            return z, 1, niter
+
+        jac = constraints_jacobian(z)
+        hess = problem.hessian(z) + problem.defects_hessian(z, lam[:n_defects])
+        step = spsolve(bmat([[hess, jac.T], [jac, None]]).tocsc(), -res)
+
+        # Backtrack until the KKT residual decreases
+        damping = 1.0
+        while damping > 1e-4:
+            trial_z = z + damping * step[: problem.size]
+            trial_lam = lam + damping * step[problem.size :]
+            trial_res = residual(trial_z, trial_lam)
+            if np.linalg.norm(trial_res) < np.linalg.norm(res):
+                break
+            damping /= 2
+        else:
+            return z, 2, niter
+
+        z, lam, res = trial_z, trial_lam, trial_res
+
+
+def solve_direct(
+    pos: Tuple[float, float],
+    vx0: float,
+    t_steps: int = 100,
+    tf_guess: float = 20.0,
+    alpha: float = 10.0,
+    beta: float = 25.0,
+    gamma: float = 3.0,
+    nu: float = 0.0,
+    G: float = 2.0,
+    method: str = "newton",
+    guess: str = "auto",
+    tol: float = 1e-8,
+    max_iter: int = 1000,
+):
+    """Solve the baseline landing problem by direct (trapezoidal) transcription.
+
+    The cost is discretized over the sampled states, controls and ``tf``,
+    subject to the collocation defects, with exact sparse derivatives.  The
+    arguments mean what they do for ``solve_baseline`` (the final velocity
+    term satisfies its transversality condition ``p(tf) = 2 beta v``), so the
+    same scenario gives the same solution.  Only the ground penalty ``nu`` is
+    transcribed: obstacle problems are not supported.
+
+    For ``beta > 0`` that solution is a saddle point of the cost, which
+    rewards the final speed, so it is found by Newton's method on the
+    optimality conditions.  The minimizers only apply when it is a minimum
+    (e.g. ``beta <= 0``).
+
+    :param method:  ``"newton"``, ``"trust-constr"`` (sparse) or ``"SLSQP"`` (dense,
+                    small meshes)
+    :param guess:   ``guess.initial_guess`` method for the starting point
+
+    Returns: Solution (unpacks as t, x, y, xp, yp, ux, uy, tf), with a nonzero
+    ``status`` if the solve failed
+    """
+    if method not in ("newton", "trust-constr", "SLSQP"):
+        raise ValueError(f"Unknown method {method!r}")
+    # Minimizing beta |v(tf)|^2 would give p(tf) = -2 beta v
+    problem = _Transcription(pos, vx0, t_steps, alpha, -beta, gamma, nu, G)
+
+    if guess == "straight":
+        z0 = problem.initial_guess(tf_guess)
+    else:
+        z0 = problem.guess_from_states(
+            initial_guess(
+                pos,
+                vx0,
+                t_steps,
+                tf_guess,
+                method=guess,
+                alpha=alpha,
+                beta=beta,
+                gamma=gamma,
+                G=G,
+                nu=nu,
+            )
+        )
+
+    start = time.perf_counter()
+    if method == "newton":
+        z, status, niter = _solve_kkt(problem, z0, tol, max_iter)
+        n_evals = niter
+    else:
+        res = _minimize(problem, z0, method, tol, max_iter)
+        z, niter, n_evals = res.x, res.nit, res.nfev
+        # ``minimize`` status codes differ between methods (trust-constr reports
+        # success as 1 or 2), so keep the solve_bvp convention of 0 on success
+        status = 0 if res.success else max(int(res.status), 1)
+    wall_time = time.perf_counter() - start
+
+    v, tf = problem.unpack(z)
+    if status == 0 and not tf > 0:
+        status = 1
+    s = np.linspace(0, 1, t_steps)
+    # The control costates follow from the controls (u = p / (2 alpha)) and the
+    # position costates from p3' = -tf p1, p4' = -tf p2
+    p3 = 2 * alpha * v["ux"]
+    p4 = 2 * alpha * v["uy"]
+    states = np.array(
+        [
+            v["x"],
+            v["y"],
+            v["xp"],
+            v["yp"],
+            -np.gradient(p3, s) / tf,
+            -np.gradient(p4, s) / tf,
+            p3,
+            p4,
+        ]
+    )
+    return Solution(
+        s,
+        states,
+        tf,
+        alpha,
+        G,
+        status=status,
+        niter=niter,
+        n_rhs=n_evals,
+        wall_time=wall_time,
+    )
+
+
+def _minimize(problem, z0, method, tol, max_iter):
+    """Minimize the transcribed cost with ``scipy.optimize.minimize``"""
+    n_defects = 4 * (problem.n - 1)
+    if method == "trust-constr":
+        constraints = [
+            NonlinearConstraint(
+                problem.defects,
+                np.zeros(n_defects),
+                np.zeros(n_defects),
+                jac=problem.defects_jacobian,
+                hess=problem.defects_hessian,
+            ),
+            problem.boundary_constraint(),
+        ]
+        options = {"gtol": tol, "xtol": tol, "maxiter": max_iter}
+        hess = problem.hessian
+    else:
+        boundary = problem.boundary_constraint()
+        constraints = [
+            {
+                "type": "eq",
+                "fun": problem.defects,
+                "jac": lambda z: problem.defects_jacobian(z).toarray(),
+            },
+            {
+                "type": "eq",
+                "fun": lambda z: boundary.A @ z - boundary.lb,
+                "jac": lambda z: boundary.A.toarray(),
+            },
+        ]
+        options = {"ftol": tol, "maxiter": max_iter}
+        hess = None
+
+    bounds = [(None, None)] * (problem.size - 1) + [(1e-6, None)]
+    return minimize(
+        problem.objective,
+        z0,
+        jac=problem.gradient,
+        hess=hess,
+        constraints=constraints,
+        bounds=bounds,
+        method=method,
+        options=options,
+    )
@@ -0,0 +1,287 @@
+# Starting guesses for the collocation solvers: ``initial_guess`` seeds
+# ``solve_bvp`` with the ``guess`` method the solvers are given ("auto",
+# "neighbour", "analytic", "ballistic" or "straight") instead of a
+# straight line
+from typing import Tuple
+
+import numpy as np
+
+from .analytic import closed_form_trajectory, find_final_time
+from .cache import get_cache
+
+METHODS = ("auto", "neighbour", "analytic", "ballistic", "straight")
+
+# Solver settings, as opposed to problem parameters, ignored when comparing
+# a problem with the cached ones
+SETTINGS = frozenset(
+    (
+        "t_steps",
+        "tf_guess",
+        "y0_guess",
+        "guess",
+        "analytic",
+        "jacobian",
+        "robust",
+        "max_nodes",
+    )
+)
+
+
+def straight_guess(
+    pos: Tuple[float, float],
+    vx0: float,
+    t_steps: int = 200,
+    tf_guess: float = 20.0,
+    y0_guess: float = 1.0,
+):
+    """Straight-line descent at constant horizontal position, with every costate set to ``y0_guess``
+
+    Returns: s, y (shape (8, t_steps)), tf
+    """
+    x_init, y_init = pos
+
+    s = np.linspace(0, 1, t_steps)
+    y = y0_guess * np.ones((8, t_steps))
+    y[0] = x_init
+    y[1] = np.linspace(y_init, 0, t_steps)
+    y[2] = np.linspace(vx0, 0, t_steps)
+
+    return s, y, tf_guess
+
+
+def ballistic_final_time(
+    pos: Tuple[float, float],
+    vx0: float,
+    alpha: float = 10.0,
+    gamma: float = 3.0,
+    G: float = 2.0,
+) -> float:
+    """Final time minimizing the cost of the cubic descent of ``ballistic_guess``.
+
+    Along that descent ``alpha * int(ux**2 + uy**2) + gamma * tf`` equals
+    ``alpha * (12 y0**2 / tf**3 + vx0**2 / tf + G**2 tf) + gamma tf``, whose
+    stationary point solves a quadratic in ``tf**2``.
+    """
+    _, y_init = pos
+    a = alpha * G**2 + gamma
+    b = alpha * vx0**2
+    tf2 = (b + np.sqrt(b**2 + 144 * alpha * a * y_init**2)) / (2 * a)
+    return float(max(np.sqrt(tf2), 1e-3))
+
+
+def ballistic_guess(
+    pos: Tuple[float, float],
+    vx0: float,
+    t_steps: int = 200,
+    alpha: float = 10.0,
+    gamma: float = 3.0,
+    G: float = 2.0,
+):
+    """Smooth powered descent: a cubic in ``y`` that starts and lands at rest, and constant
+    horizontal braking, with the costates that produce those controls.
+
+    Returns: s, y (shape (8, t_steps)), tf
+    """
+    x_init, y_init = pos
+    tf = ballistic_final_time(pos, vx0, alpha, gamma, G)
+
+    s = np.linspace(0, 1, t_steps)
+    y = np.zeros((8, t_steps))
+    y[0] = x_init + vx0 * tf * (s - s**2 / 2)
+    y[1] = y_init * (1 - 3 * s**2 + 2 * s**3)
+    y[2] = vx0 * (1 - s)
+    y[3] = 6 * y_init * (s**2 - s) / tf
+
+    # Controls are p / (2 alpha) (plus gravity for uy), and p4' = -p2
+    y[5] = -24 * alpha * y_init / tf**3
+    y[6] = -2 * alpha * vx0 / tf
+    y[7] = 2 * alpha * (y_init * (12 * s - 6) / tf**2 + G)
+
+    return s, y, tf
+
+
+def analytic_guess(
+    pos: Tuple[float, float],
+    vx0: float,
+    t_steps: int = 200,
+    tf_guess: float = 20.0,
+    alpha: float = 10.0,
+    beta: float = 25.0,
+    gamma: float = 3.0,
+    G: float = 2.0,
+):
+    """Unconstrained (``nu == 0``) baseline solution, see ``analytic.closed_form_trajectory``
+
+    Returns: s, y, tf, or None if no admissible final time exists
+    """
+    tf = find_final_time(pos, vx0, tf_guess, alpha, beta, gamma, G)
+    if tf is None:
+        return None
+
+    return (*closed_form_trajectory(pos, vx0, tf, t_steps, alpha, beta, G), tf)
+
+
+def _distance(params, other):
+    """Relative distance between two sets of problem parameters (None if not comparable)"""
+    params = {k: v for k, v in params.items() if k not in SETTINGS}
+    other = {k: v for k, v in other.items() if k not in SETTINGS}
+    if params.keys() != other.keys():
+        return None
+
+    total = 0.0
+    for key, value in params.items():
+        if isinstance(value, (bool, np.bool_, str)) or value is None:
+            if value != other[key]:
+                return None
+            continue
+        a = np.asarray(value, dtype=float)
+        b = np.asarray(other[key], dtype=float)
+        if a.shape != b.shape:
+            return None
+        total += np.sum(((a - b) / np.maximum(1.0, np.maximum(abs(a), abs(b)))) ** 2)
+
+    return np.sqrt(total)
+
+
+def _usable(arrays):
+    """Whether a cached solution converged (entries without a status are trusted)"""
+    if "status" not in arrays:
+        return True
+    tf = arrays["tf"] if "tf" in arrays else arrays["p"][0]
+    return arrays["status"] == 0 and tf > 0
+
+
+def neighbour_guess(
+    model: str,
+    params: dict,
+    cache=None,
+    max_distance: float = 0.5,
+):
+    """Solution of the closest problem solved through ``cache``, shifted to start at ``pos``.
+
+    :param params:          Problem parameters, as passed to the solver (``pos``, ``vx0``,
+                            ``alpha``, ...); solver settings are ignored
+    :param cache:           ``cache.SolutionCache`` (None for the default cache)
+    :param max_distance:    Largest relative parameter distance of a usable neighbour
+
+    Returns: s, y, tf, or None if no cached problem is close enough
+    """
+    if cache is None:
+        cache = get_cache()
+    if not cache:
+        return None
+
+    best, best_distance = None, max_distance
+    for key, other in cache.solved(model):
+        distance = _distance(params, other)
+        if distance is not None and distance <= best_distance:
+            arrays = cache.get(key)
+            if arrays is not None and _usable(arrays):
+                best, best_distance = (arrays, other), distance
+    if best is None:
+        return None
+
+    arrays, other = best
+    if "states" in arrays:
+        s, y, tf = arrays["s"], np.array(arrays["states"]), float(arrays["tf"])
+    else:
+        s, y, tf = arrays["x"], np.array(arrays["y"]), float(arrays["p"][0])
+
+    # Move the start to the new initial conditions, keeping the landing
+    if "pos" in params and "vx0" in params:
+        y[0] += params["pos"][0] - other["pos"][0]
+        y[1] += (params["pos"][1] - other["pos"][1]) * (1 - s)
+        y[2] += (params["vx0"] - other["vx0"]) * (1 - s)
+
+    return s, y, tf
+
+
+def initial_guess(
+    pos: Tuple[float, float],
+    vx0: float,
+    t_steps: int = 200,
+    tf_guess: float = 20.0,
+    y0_guess: float = 1.0,
+    method: str = "auto",
+    model: str = "baseline",
+    cache=None,
+    alpha: float = 10.0,
+    beta: float = 25.0,
+    gamma: float = 3.0,
+    G: float = 2.0,
+    **params,
+):
+    """Build a state, costate and final time guess for a lunar lander BVP from a cheap surrogate.
+
+    ``method`` is one of
+
+    - ``"neighbour"``: the solution of the nearest problem in ``cache``
+      (see ``neighbour_guess``)
+    - ``"analytic"``: the unconstrained baseline solution (``analytic_guess``)
+    - ``"ballistic"``: a smooth powered descent with a cost-balanced final
+      time (``ballistic_guess``)
+    - ``"straight"``: the straight-line guess with constant costates
+      ``y0_guess`` (``straight_guess``)
+    - ``"auto"``: the first of neighbour, analytic and ballistic that exists
+      (analytic first for the unconstrained baseline problem, where it is
+      exact); with the ground penalty ``nu`` active, the neighbour or else
+      the straight guess, since the unpenalized surrogates drive
+      ``solve_bvp`` to its node limit
+
+    A neighbour or analytic guess that does not exist falls back to the
+    ballistic one.
+
+    :param model:   Model name the problem is cached under (for neighbours)
+    :param params:  Further model parameters (``nu``, ``rho``, ...), only used to
+                    find neighbours
+
+    Returns: s, y (shape (8, m)), tf
+    """
+    if method not in METHODS:
+        raise ValueError(f"Unknown guess {method!r}, expected one of {list(METHODS)}")
+
+    if method == "straight":
+        return straight_guess(pos, vx0, t_steps, tf_guess, y0_guess)
+
+    # The analytic solution is exact for the unconstrained baseline problem,
+    # so it takes precedence over any neighbour there
+    penalized = bool(params.get("nu", 0.0))
+    exact = model == "baseline" and not penalized
+    if exact:
+        auto = ("analytic", "neighbour")
+    elif penalized:
+        auto = ("neighbour",)
+    else:
+        auto = ("neighbour", "analytic")
+    order = {
+        "auto": auto,
+        "neighbour": ("neighbour",),
+        "analytic": ("analytic",),
+        "ballistic": (),
+    }[method]
+
+    guess = None
+    for surrogate in order:
+        if surrogate == "neighbour":
+            problem = dict(pos=pos, vx0=vx0, alpha=alpha, beta=beta, gamma=gamma, G=G)
+            guess = neighbour_guess(model, {**problem, **params}, cache)
+        else:
+            guess = analytic_guess(pos, vx0, t_steps, tf_guess, alpha, beta, gamma, G)
+        if guess is not None:
+            break
+    if guess is None and method == "auto" and penalized:
+        guess = straight_guess(pos, vx0, t_steps, tf_guess, y0_guess)
+    if guess is None:
+        guess = ballistic_guess(pos, vx0, t_steps, alpha, gamma, G)
+
+    return guess
+
+
+def resample_guess(guess, t_steps: int):
+    """Interpolate a ``(s, y, tf)`` guess onto a uniform mesh of ``t_steps`` nodes"""
+    s, y, tf = guess
+    if len(s) == t_steps and np.allclose(s, np.linspace(0, 1, t_steps)):
+        return s, y, tf
+
+    mesh = np.linspace(0, 1, t_steps)
+    return mesh, np.array([np.interp(mesh, s, row) for row in y]), tf
@@ -0,0 +1,202 @@
+import json
+import threading
+import time
+from collections import deque
+from pathlib import Path
+from typing import Callable, List, Optional, Union
+
+import numpy as np
+from scipy.integrate import solve_bvp as _solve_bvp
+
+# Callables receiving one trace record (a JSON-serializable dict) per solve
+_sinks: List[Callable[[dict], None]] = []
+
+
+class RingBuffer:
+    """
+    In-memory sink keeping the most recent ``maxlen`` trace records
+    """
+
+    def __init__(self, maxlen: int = 1024):
+        self._records = deque(maxlen=maxlen)
+
+    def __call__(self, record: dict):
+        self._records.append(record)
+
+    @property
+    def records(self) -> List[dict]:
+        return list(self._records)
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def clear(self):
+        self._records.clear()
+
+
+class JsonLinesSink:
+    """
+    Sink appending one JSON object per line to a file
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def __call__(self, record: dict):
+        line = json.dumps(record) + "\n"
+        with self._lock, open(self.path, "a") as f:
+            f.write(line)
+
+
+def enable_instrumentation(*sinks: Callable[[dict], None]):
+    """Send a trace record of every solve to ``sinks`` (a new ``RingBuffer`` if none given).
+
+    A sink is any callable taking the record dict, e.g. a ``RingBuffer``, a
+    ``JsonLinesSink`` or ``list.append``.
+
+    Returns: the first sink
+    """
+    if not sinks:
+        sinks = (RingBuffer(),)
+    _sinks[:] = sinks
+    return sinks[0]
+
+
+def disable_instrumentation():
+    """Stop recording solves"""
+    _sinks.clear()
+
+
+def enabled() -> bool:
+    return bool(_sinks)
+
+
+def emit(record: dict):
+    """Send a record (made JSON-serializable) to every enabled sink"""
+    record = _jsonable({**record, "timestamp": time.time()})
+    for sink in _sinks:
+        sink(record)
+
+
+def _jsonable(value):
+    if isinstance(value, dict):
+        return {str(key): _jsonable(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [_jsonable(item) for item in value]
+    if isinstance(value, np.generic):
+        return value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return repr(value)
+
+
+class _Probe:
+    """
+    Call counters and timers of the callbacks of one ``solve_bvp`` run
+
+    The mesh history is read off the right hand side calls that span the whole
+    interval (the collocation residual and Jacobian estimates), as opposed to
+    the calls on the midpoints.
+    """
+
+    def __init__(self, a, b):
+        self.a = a
+        self.b = b
+        self.calls = dict.fromkeys(("rhs", "bc", "jac", "bc_jac"), 0)
+        self.times = dict.fromkeys(("rhs", "bc", "jac", "bc_jac"), 0.0)
+        self.mesh_history = []
+
+    def wrap(self, fun, kind):
+        if fun is None:
+            return None
+        calls, times = self.calls, self.times
+        clock = time.perf_counter
+
+        def wrapped(*args):
+            start = clock()
+            result = fun(*args)
+            times[kind] += clock() - start
+            calls[kind] += 1
+            return result
+
+        if kind != "rhs":
+            return wrapped
+
+        def rhs(x, y, *args):
+            if x.size and x[0] == self.a and x[-1] == self.b:
+                if not self.mesh_history or self.mesh_history[-1] != x.size:
+                    self.mesh_history.append(int(x.size))
+            return wrapped(x, y, *args)
+
+        return rhs
+
+
+def solve_bvp(
+    fun,
+    bc,
+    x,
+    y,
+    p=None,
+    fun_jac=None,
+    bc_jac=None,
+    model: Optional[str] = None,
+    params: Optional[dict] = None,
+    **kwargs,
+):
+    """``scipy.integrate.solve_bvp`` that emits a trace record when instrumentation is enabled.
+
+    The record holds the ``model`` name and ``params``, the status, final
+    time (``p[0]``), iterations, call counts and cumulative times of the right
+    hand side, boundary conditions and their Jacobians, the time left for the
+    linear algebra and mesh refinement (``linalg_time``), the mesh size
+    history, and the final collocation and boundary condition residuals.
+    When disabled this is a plain call to ``solve_bvp``.
+    """
+    if not _sinks:
+        return _solve_bvp(fun, bc, x, y, p, fun_jac=fun_jac, bc_jac=bc_jac, **kwargs)
+
+    probe = _Probe(x[0], x[-1])
+    start = time.perf_counter()
+    sol = _solve_bvp(
+        probe.wrap(fun, "rhs"),
+        probe.wrap(bc, "bc"),
+        x,
+        y,
+        p,
+        fun_jac=probe.wrap(fun_jac, "jac"),
+        bc_jac=probe.wrap(bc_jac, "bc_jac"),
+        **kwargs,
+    )
+    wall_time = time.perf_counter() - start
+
+    args = (sol.y[:, 0], sol.y[:, -1]) + ((sol.p,) if sol.p is not None else ())
+    with np.errstate(all="ignore"):
+        bc_residual = float(np.max(np.abs(bc(*args))))
+
+    emit(
+        {
+            "model": model,
+            "solver": "solve_bvp",
+            "params": params or {},
+            "status": int(sol.status),
+            "success": bool(sol.success),
+            "message": sol.message,
+            "tf": float(sol.p[0]) if sol.p is not None else None,
+            "niter": int(sol.niter),
+            "n_rhs": probe.calls["rhs"],
+            "n_bc": probe.calls["bc"],
+            "n_jac": probe.calls["jac"],
+            "n_bc_jac": probe.calls["bc_jac"],
+            "rhs_time": probe.times["rhs"],
+            "bc_time": probe.times["bc"],
+            "jac_time": probe.times["jac"] + probe.times["bc_jac"],
+            "linalg_time": wall_time - sum(probe.times.values()),
+            "wall_time": wall_time,
+            "mesh_history": probe.mesh_history,
+            "n_nodes": int(sol.x.size),
+            "max_rms_residual": float(np.max(sol.rms_residuals)),
+            "bc_residual": bc_residual,
+        }
+    )
+    return sol
@@ -1,13 +1,151 @@
 import numpy as np
-import pandas as pd
-import matplotlib.image as mpimg
-import matplotlib.pyplot as plt
-from scipy.integrate import solve_bvp
-from scipy.ndimage import rotate
-from matplotlib.animation import FuncAnimation
-from matplotlib import animation
 
-animation.writer = animation.writers["ffmpeg"]
+from .cache import cached_call
+from .guess import initial_guess, neighbour_guess
+from .instrument import solve_bvp
+from .render import Scene
+
+
+class LanderPath:
+    """
+    NumPy-backed solution of ``LunarLander.find_path``
+
+    The raw arrays (``t``, ``states``, ``costates`` and the controls) are
+    available for hot paths; the ``state_sol``, ``costate_sol`` and
+    ``controls`` DataFrames (indexed by time) are only built, and pandas only
+    imported, on first access.  Unpacks and indexes like the tuple
+    ``(state_sol, costate_sol, controls)``.
+    """
+
+    __slots__ = ("_frames", "alpha", "costates", "states", "t")
+
+    def __init__(self, sol_x, sol_y, sol_p, alpha):
+        """
+        :param sol_x (ndarray):     Normalized mesh of the solution
+        :param sol_y (ndarray):     State/costate values on the mesh, shape (8, m)
+        :param sol_p (ndarray):     Parameters of the solution (the final time)
+        :param alpha (float):       Control weight, so that the controls are ``p / (2 alpha)``
+        """
+        self.t = sol_x * sol_p[0]
+        self.states = sol_y[:4]
+        self.costates = sol_y[4:]
+        self.alpha = alpha
+        self._frames = {}
+
+    @property
+    def ux(self):
+        return self.costates[2] / (2 * self.alpha)
+
+    @property
+    def uy(self):
+        return self.costates[3] / (2 * self.alpha)
+
+    @property
+    def tau(self):
+        """Magnitude of the thrust"""
+        return np.hypot(self.ux, self.uy)
+
+    @property
+    def theta(self):
+        """Angle of the thrust"""
+        return np.arctan(self.uy / self.ux)
+
+    def _frame(self, name, columns, values):
+        if name not in self._frames:
+            import pandas as pd
+
+            index = pd.Index(self.t, name="t")
+            self._frames[name] = pd.DataFrame(values(), index=index, columns=columns)
+        return self._frames[name]
+
+    @property
+    def state_sol(self):
+        return self._frame("state", ["x", "y", "xp", "yp"], lambda: self.states.T)
+
+    @property
+    def costate_sol(self):
+        return self._frame("costate", ["p1", "p2", "p3", "p4"], lambda: self.costates.T)
+
+    @property
+    def controls(self):
+        return self._frame(
+            "controls",
+            ["ux", "uy", "tau", "theta"],
+            lambda: np.column_stack([self.ux, self.uy, self.tau, self.theta]),
+        )
+
+    def _tuple(self):
+        return self.state_sol, self.costate_sol, self.controls
+
+    def __iter__(self):
+        return iter(self._tuple())
+
+    def __getitem__(self, index):
+        return self._tuple()[index]
+
+    def __len__(self):
+        return 3
+
+
+class LandingScene(Scene):
+    """
+    Frames of ``LunarLander.animate_landing``: the path so far and the tilted lander sprite
+
+    Positions and tilts are interpolated at evenly spaced times up front, so
+    each frame only moves the line and the sprite.
+    """
+
+    figsize = (10, 10)
+    PATH_COLOR = "#8dd3c7"
+    LANDER_SIZE = 0.3
+
+    def __init__(self, path: LanderPath, interval: float, sprites):
+        """
+        :param path (LanderPath):       Solved path
+        :param interval (float):        Flight time between frames, in milliseconds
+        :param sprites (SpriteCache):   Rotations of the lander sprite
+        """
+        from .sprites import tilt_angle
+
+        t = path.t
+        frame_t = np.linspace(
+            t[0], t[-1], max(2, int(np.ceil(t[-1] * 1000 / interval)))
+        )
+        self.x, self.y, xp, yp = (np.interp(frame_t, t, row) for row in path.states)
+        self.angles = tilt_angle(xp, yp)
+        self.sprites = sprites
+
+    def __len__(self):
+        return len(self.x)
+
+    def _extent(self, frame):
+        size = self.LANDER_SIZE
+        x, y = self.x[frame], self.y[frame]
+        return [x - size, x + size, y - size, y + size]
+
+    def setup(self, fig):
+        margin = 2 * self.LANDER_SIZE
+        ax = fig.add_subplot()
+        ax.set_title("Lunar Lander Trajectory")
+        ax.set_xlim(self.x.min() - margin, self.x.max() + margin)
+        ax.set_ylim(min(self.y.min(), 0) - margin, self.y.max() + margin)
+        ax.set_xlabel("$x$")
+        ax.set_ylabel("$y$")
+
+        (self.line,) = ax.plot([], [], "--", linewidth=1, color=self.PATH_COLOR)
+        self.lander = ax.imshow(
+            self.sprites(self.angles[0]),
+            extent=self._extent(0),
+            aspect="equal",
+            zorder=2,
+        )
+        return [self.line, self.lander]
+
+    def update(self, frame):
+        # Trajectory so far, then the lander's position and tilt
+        self.line.set_data(self.x[: frame + 1], self.y[: frame + 1])
+        self.lander.set_data(self.sprites(self.angles[frame]))
+        self.lander.set_extent(self._extent(frame))
 
 
 class LunarLander:
@@ -44,10 +182,8 @@ class LunarLander:
         self.y0 = initial_y
         self.v0 = initial_velocity
 
-        # Initialize solutions as None
-        self.state_sol = None
-        self.costate_sol = None
-        self.controls = None
+        # Initialize the solution as None
+        self.path = None
 
         # Save weights and solution parameters
         self.alpha = alpha
@@ -69,18 +205,19 @@ class LunarLander:
 
         def ode(t, y, p):
             tf = p[0]
-            return tf * np.array(
-                [
-                    y[2],
-                    y[3],
-                    y[6] / (2 * self.alpha),
-                    y[7] / (2 * self.alpha) - self.grav,
-                    np.zeros_like(y[0]),
-                    np.zeros_like(y[0]),
-                    y[4],
-                    y[5],
-                ]
-            )
+            scale = tf / (2 * self.alpha)
+
+            # Write each row in place instead of stacking eight temporaries
+            out = np.empty_like(y)
+            np.multiply(y[2], tf, out=out[0])
+            np.multiply(y[3], tf, out=out[1])
+            np.multiply(y[6], scale, out=out[2])
+            np.multiply(y[7], scale, out=out[3])
+            out[3] -= tf * self.grav
+            out[4:6] = 0
+            np.multiply(y[4], tf, out=out[6])
+            np.multiply(y[5], tf, out=out[7])
+            return out
 
         self.evolution_ode = ode
 
@@ -126,60 +263,114 @@ class LunarLander:
 
         self.boundary_condition = bc
 
-    def find_path(self, tf_guess=20, max_nodes=30000):
+    def _problem(self):
+        """Initial conditions and weights of the problem, keyed as for the solvers"""
+        return dict(
+            pos=(self.x0, self.y0),
+            vx0=self.v0,
+            alpha=self.alpha,
+            beta=self.beta,
+            gamma=self.gamma,
+            grav=self.grav,
+        )
+
+    def _initial_guess(self, tf_guess, guess, cache):
         """
-        Uses the state and costate evolution along with the boundary condition to find the optimal path
+        Builds the state/costate guess (see guess.initial_guess)
 
-        :param tf_guess (float):    Initial guess for the time to take to land
-        :param max_nodes (int):     Parameter to be passed to solve_bvp to increase resolution in solving
-        :return:                    Solved state, costate, and control values (Dataframes)
+        :return:    Mesh, state/costate values, and final time guess
+        """
+        if guess in ("auto", "neighbour"):
+            found = neighbour_guess("lunar_lander", self._problem(), cache)
+            if found is not None:
+                return found
+
+        s, y, tf = initial_guess(
+            (self.x0, self.y0),
+            self.v0,
+            self.t_steps,
+            tf_guess,
+            method="ballistic" if guess == "neighbour" else guess,
+            cache=False,
+            alpha=self.alpha,
+            beta=self.beta,
+            gamma=self.gamma,
+            G=self.grav,
+        )
+        if guess != "straight":
+            # The surrogates follow the solvers' convention p3' = -p1, p4' = -p2,
+            # while here p3' = p1 and p4' = p2
+            y[4:6] *= -1
+        return s, y, tf
 
-        Written by Tiara
+    def _solve(self, tf_guess, max_nodes, guess="auto", cache=None):
         """
-        tf_guess = np.asarray([tf_guess])
-        t_eval = np.linspace(0, 1, self.t_steps)
+        Runs solve_bvp from the initial guess built by the given guess method
 
-        # Initial guess for the state and costate
-        init_guess = np.ones((8, self.t_steps))
-        init_guess[0] *= self.x0
-        init_guess[1] = np.linspace(self.y0, 0, self.t_steps)
-        init_guess[2] = np.linspace(self.v0, 0, self.t_steps)
+        :return:    Mesh, state/costate values, parameters and status of the solution
+        """
+        t_eval, init_guess, tf_guess = self._initial_guess(tf_guess, guess, cache)
 
         sol = solve_bvp(
             self.evolution_ode,
             self.boundary_condition,
             t_eval,
             init_guess,
-            p=tf_guess,
+            p=np.asarray([tf_guess]),
             max_nodes=max_nodes,
+            model="lunar_lander",
+            params=self._problem(),
         )
 
-        # Convert solution into dataframe
-        state_vals = pd.DataFrame(sol.y[:4, :].T, columns=["x", "y", "xp", "yp"])
-        costate_vals = pd.DataFrame(sol.y[4:, :].T, columns=["p1", "p2", "p3", "p4"])
+        return sol.x, sol.y, sol.p, sol.status
 
-        # Calculate controls
-        controls = pd.DataFrame()
-        controls["ux"] = costate_vals["p3"] / (2 * self.alpha)
-        controls["uy"] = costate_vals["p4"] / (2 * self.alpha)
-        controls["tau"] = (controls["ux"] ** 2 + controls["uy"] ** 2) ** 0.5
-        controls["theta"] = np.arctan(controls["uy"] / controls["ux"])
+    def find_path(self, tf_guess=20, max_nodes=30000, cache=None, guess="auto"):
+        """
+        Uses the state and costate evolution along with the boundary condition to find the optimal path
 
-        # Set index as the time
-        state_vals["t"] = sol.x * sol.p[0]
-        costate_vals["t"] = sol.x * sol.p[0]
-        controls["t"] = sol.x * sol.p[0]
+        :param tf_guess (float):    Initial guess for the time to take to land
+        :param max_nodes (int):     Parameter to be passed to solve_bvp to increase resolution in solving
+        :param cache:               SolutionCache to memoize the solve in (None for the default cache, False to bypass)
+        :param guess (str):         Initial guess method: "auto", "neighbour", "analytic", "ballistic" or "straight"
+        :return:                    Solved path (LanderPath), which unpacks as the state,
+                                    costate, and control values (Dataframes, built lazily)
 
-        state_vals = state_vals.set_index("t")
-        costate_vals = costate_vals.set_index("t")
-        controls = controls.set_index("t")
+        Written by Tiara
+        """
+        params = dict(
+            **self._problem(),
+            t_steps=self.t_steps,
+            tf_guess=tf_guess,
+            max_nodes=max_nodes,
+            guess=guess,
+        )
+        sol_x, sol_y, sol_p, _ = cached_call(
+            "lunar_lander",
+            params,
+            lambda: self._solve(tf_guess, max_nodes, guess, cache),
+            cache,
+            fields=("x", "y", "p", "status"),
+            converged=lambda result: result[3] == 0,
+        )
 
-        # Save solutions as attributes
-        self.state_sol = state_vals
-        self.costate_sol = costate_vals
-        self.controls = controls
+        self.path = LanderPath(sol_x, sol_y, sol_p, self.alpha)
 
-        return self.state_sol, self.costate_sol, self.controls
+        return self.path
+
+    @property
+    def state_sol(self):
+        """Solved state values (DataFrame indexed by time), or None before ``find_path``"""
+        return None if self.path is None else self.path.state_sol
+
+    @property
+    def costate_sol(self):
+        """Solved costate values (DataFrame indexed by time), or None before ``find_path``"""
+        return None if self.path is None else self.path.costate_sol
+
+    @property
+    def controls(self):
+        """Solved controls ``ux``, ``uy``, ``tau``, ``theta`` (DataFrame), or None before ``find_path``"""
+        return None if self.path is None else self.path.controls
 
     def plot_state_controls(self, save_file=None, show=True):
         """
@@ -187,9 +378,11 @@ class LunarLander:
 
         Written by Tiara
         """
+        import matplotlib.pyplot as plt
+
         rows = 4
         cols = 3
-        if self.state_sol is None or self.controls is None:
+        if self.path is None:
             self.find_path()
 
         plt.rcParams["figure.figsize"] = [10, 10]
@@ -232,20 +425,20 @@ class LunarLander:
 
         plt.subplot(rows, cols, 10)
         self.controls["tau"].plot()
-        plt.title(r"Magnitude of Acceleration ($\\sqrt{u_x^2 + u_y^2}$)")
+        plt.title(r"Magnitude of Acceleration ($\sqrt{u_x^2 + u_y^2}$)")
 
         plt.subplot(rows, cols, 11)
         unit = 0.25
         y_tick = np.arange(-0.5, 0.5 + unit, unit)
         y_label = [
-            r"$-\\frac{\\pi}{2}$",
-            r"$-\\frac{\\pi}{4}$",
+            r"$-\frac{\pi}{2}$",
+            r"$-\frac{\pi}{4}$",
             r"$0$",
-            r"$\\frac{\\pi}{4}$",
-            r"$\\frac{\\pi}{2}$",
+            r"$\frac{\pi}{4}$",
+            r"$\frac{\pi}{2}$",
         ]
         self.controls["theta"].plot()
-        plt.title(r"Angle of Acceleration ($\\arctan(u_y / u_x)$)")
+        plt.title(r"Angle of Acceleration ($\arctan(u_y / u_x)$)")
         plt.yticks(y_tick * np.pi, y_label)
 
         plt.tight_layout()
@@ -256,72 +449,41 @@ class LunarLander:
         if show:
             plt.show()
 
-    def animate_landing(self, anim_file):
+    def animate_landing(
+        self,
+        anim_file,
+        interval=60,
+        resolution=1.0,
+        sprites=None,
+        dpi=300,
+        processes=None,
+    ):
         """
         Function to animate the landing of the Lunar Lander
 
-        Written by TJ
-        """
-        if self.state_sol is None or self.controls is None:
-            self.find_path()
-
-        plt.clf()
-        PATH_COLOR = "#ffffff"
-        plt.title("Lunar Lander Trajectory")
-        plt.gcf().set_size_inches(10, 10)
-        xlims = (0, 3)
-        ylims = (-1, 11)
-        plt.xlim(*xlims)
-        plt.ylim(*ylims)
-        plt.xlabel("$t$")
-        plt.ylabel("$y$")
-
-        LANDER_SIZE = 0.3
-        img = mpimg.imread("./lander.png")
-
-        (line,) = plt.gca().plot([], [], "--", linewidth=1, color=PATH_COLOR)
-
-        lander = plt.imshow(
-            img,
-            extent=[
-                self.state_sol["t"].iloc[0] - LANDER_SIZE,
-                self.state_sol["y"].iloc[0] - LANDER_SIZE,
-                self.state_sol["y"].iloc[0] + LANDER_SIZE,
-            ],
-            aspect="equal",
-            zorder=2,
-        )
-
-        def rotate_lander(vel_x, vel_y):
-            angle = np.degrees(-np.arctan(vel_x / vel_y))
-            rotated_img = rotate(img, angle, reshape=False)
-            rotated_img = np.clip(rotated_img, 0, 1)
-            return rotated_img
+        The lander sprite is tilted along the velocity; its rotations come
+        from a ``sprites.SpriteCache`` (nearest angle at ``resolution``
+        degrees).  Frames are spaced ``interval`` ms of flight time apart and
+        encoded with ``render.export_animation``.
 
-        def update(frame):
-            # Update trajectory
-            line.set_data(
-                self.state_sol["t"].iloc[:frame], self.state_sol["t"].iloc[:frame]
-            )
+        :param anim_file (str):         File the animation is saved to
+        :param interval (float):        Time between frames, in milliseconds
+        :param resolution (float):      Angular step of the cached rotations, in degrees
+        :param sprites (SpriteCache):   Rotation cache to reuse across animations
+        :param dpi (int):               Resolution of the saved frames
+        :param processes (int):         Worker processes (see ``render.map_chunks``)
 
-            vel_x = self.state_sol["xp"].iloc[frame]
-            vel_y = self.state_sol["yp"].iloc[frame]
-            lander.set_data(rotate_lander(vel_x, vel_y))
+        Written by TJ
+        """
+        from .render import export_animation
+        from .sprites import SpriteCache
 
-            lander.set_extent(
-                [
-                    self.state_sol["t"].iloc[frame] - LANDER_SIZE,
-                    self.state_sol["t"].iloc[frame] + LANDER_SIZE,
-                    self.state_sol["y"].iloc[frame] - LANDER_SIZE,
-                    self.state_sol["x"].iloc[frame] + LANDER_SIZE,
-                ]
-            )
+        if self.path is None:
+            self.find_path()
+        if sprites is None:
+            sprites = SpriteCache(resolution=resolution)
 
-        ani = FuncAnimation(
-            plt.gcf(),
-            update,
-            frames=np.arange(0, len(self.state_sol["t"]), 60),
-            interval=60,
-            repeat=False,
+        scene = LandingScene(self.path, interval, sprites)
+        export_animation(
+            scene, anim_file, fps=1000 / interval, dpi=dpi, processes=processes
         )
-        ani.save(anim_file, dpi=300)
@@ -0,0 +1,264 @@
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Sequence, Tuple
+
+import numpy as np
+
+WAVEFORMS = ("sawtooth", "triangle", "sine")
+
+
+class Motion(ABC):
+    """
+    Declarative path of an obstacle centre, evaluated on whole time arrays
+
+    Subclasses describe their parameters as arrays (``pack``) and evaluate any
+    number of motions of the same kind in one broadcast NumPy call
+    (``evaluate``), so the centres of every obstacle in an ``ObstacleSet`` are
+    computed with one call per kind of motion.  ``motion[0]`` and ``motion[1]``
+    are the ``cx(t)`` and ``cy(t)`` callables, so a motion can stand in for the
+    pair of callables that ``multi_obstacle.py`` expects.
+    """
+
+    def positions(self, t):
+        """Centre at time ``t`` (a scalar or an array), shape (2, *t.shape)"""
+        t = np.asarray(t, dtype=float)
+        return type(self).evaluate(type(self).pack([self]), t)[0]
+
+    def __call__(self, t):
+        return self.positions(t)
+
+    def __getitem__(self, axis: int) -> Callable:
+        if axis not in (0, 1):
+            raise IndexError(axis)
+        return lambda t: self.positions(t)[axis]
+
+    def __iter__(self):
+        return iter((self[0], self[1]))
+
+    def __len__(self) -> int:
+        return 2
+
+    @classmethod
+    def pack(cls, motions: Sequence["Motion"]):
+        """Parameters of ``motions`` stacked for ``evaluate``"""
+        return list(motions)
+
+    @classmethod
+    @abstractmethod
+    def evaluate(cls, packed, t):
+        """Centres of the packed motions at ``t``, shape (k, 2, *t.shape)"""
+
+    def __repr__(self):
+        fields = ", ".join(f"{k}={v!r}" for k, v in vars(self).items())
+        return f"{type(self).__name__}({fields})"
+
+
+def _column(values, t):
+    """Per-motion values of shape (k, ...) broadcast against ``t`` after the (k, 2) axes"""
+    return values.reshape(values.shape + (1,) * t.ndim)
+
+
+class Static(Motion):
+    """Fixed centre"""
+
+    def __init__(self, center: Tuple[float, float]):
+        self.center = tuple(float(v) for v in center)
+
+    @classmethod
+    def pack(cls, motions):
+        return np.array([m.center for m in motions], dtype=float).reshape(-1, 2)
+
+    @classmethod
+    def evaluate(cls, packed, t):
+        return np.broadcast_to(_column(packed, t), packed.shape + t.shape)
+
+
+class Linear(Motion):
+    """Constant velocity: ``start + velocity * (t - t0)``"""
+
+    def __init__(
+        self,
+        start: Tuple[float, float],
+        velocity: Tuple[float, float],
+        t0: float = 0.0,
+    ):
+        self.start = tuple(float(v) for v in start)
+        self.velocity = tuple(float(v) for v in velocity)
+        self.t0 = float(t0)
+
+    @classmethod
+    def pack(cls, motions):
+        start = np.array([m.start for m in motions], dtype=float).reshape(-1, 2)
+        velocity = np.array([m.velocity for m in motions], dtype=float).reshape(-1, 2)
+        t0 = np.array([m.t0 for m in motions], dtype=float)
+        return start, velocity, t0
+
+    @classmethod
+    def evaluate(cls, packed, t):
+        start, velocity, t0 = packed
+        elapsed = t - t0.reshape((-1,) + (1,) * t.ndim)
+        return _column(start, t) + _column(velocity, t) * elapsed[:, None]
+
+
+class Periodic(Motion):
+    """Periodic oscillation about ``center``: ``center + amplitude * w((t + phase) / period)``
+
+    The unit waveform ``w`` on the fraction ``tau`` of the period is
+
+    - ``"sawtooth"``: ``2 tau - 1``, so ``Periodic((x, 0), (0, 2.5), 5)`` is the
+      notebook's ``(x, t % 5 - 2.5)``
+    - ``"triangle"``: ``1 - 4 |tau - 1/2|``, back and forth between the extremes
+    - ``"sine"``: ``sin(2 pi tau)``
+    """
+
+    def __init__(
+        self,
+        center: Tuple[float, float],
+        amplitude: Tuple[float, float],
+        period: float,
+        phase: float = 0.0,
+        waveform: str = "sawtooth",
+    ):
+        if waveform not in WAVEFORMS:
+            raise ValueError(
+                f"Unknown waveform {waveform!r}, expected one of {list(WAVEFORMS)}"
+            )
+        if not period > 0:
+            raise ValueError(f"period must be positive, got {period}")
+        self.center = tuple(float(v) for v in center)
+        self.amplitude = tuple(float(v) for v in amplitude)
+        self.period = float(period)
+        self.phase = float(phase)
+        self.waveform = waveform
+
+    @classmethod
+    def pack(cls, motions):
+        center = np.array([m.center for m in motions], dtype=float).reshape(-1, 2)
+        amplitude = np.array([m.amplitude for m in motions], dtype=float).reshape(-1, 2)
+        period = np.array([m.period for m in motions], dtype=float)
+        phase = np.array([m.phase for m in motions], dtype=float)
+        kind = np.array([WAVEFORMS.index(m.waveform) for m in motions])
+        return center, amplitude, period, phase, kind
+
+    @classmethod
+    def evaluate(cls, packed, t):
+        center, amplitude, period, phase, kind = packed
+        period = period.reshape((-1,) + (1,) * t.ndim)
+        tau = np.mod(t + phase.reshape(period.shape), period) / period
+
+        wave = np.empty_like(tau)
+        for index, name in enumerate(WAVEFORMS):
+            rows = kind == index
+            if not rows.any():
+                continue
+            if name == "sawtooth":
+                wave[rows] = 2 * tau[rows] - 1
+            elif name == "triangle":
+                wave[rows] = 1 - 4 * np.abs(tau[rows] - 0.5)
+            else:
+                wave[rows] = np.sin(2 * np.pi * tau[rows])
+        return _column(center, t) + _column(amplitude, t) * wave[:, None]
+
+
+class Waypoints(Motion):
+    """Piecewise-linear path through ``points`` at increasing ``times``, held at the ends"""
+
+    def __init__(self, times: Sequence[float], points: Sequence[Tuple[float, float]]):
+        times = np.asarray(times, dtype=float)
+        points = np.asarray(points, dtype=float).reshape(-1, 2)
+        if times.ndim != 1 or len(times) != len(points) or len(times) < 1:
+            raise ValueError("Expected one time per waypoint")
+        if np.any(np.diff(times) <= 0):
+            raise ValueError("Waypoint times must be increasing")
+        self.times = times
+        self.points = points
+
+    @classmethod
+    def evaluate(cls, packed, t):
+        out = np.empty((len(packed), 2) + t.shape)
+        for i, m in enumerate(packed):
+            out[i, 0] = np.interp(t, m.times, m.points[:, 0])
+            out[i, 1] = np.interp(t, m.times, m.points[:, 1])
+        return out
+
+
+class Function(Motion):
+    """Centre given by a pair of Python callables ``(cx(t), cy(t))``, evaluated one by one"""
+
+    def __init__(self, cx: Callable, cy: Callable):
+        self.cx = cx
+        self.cy = cy
+
+    @classmethod
+    def evaluate(cls, packed, t):
+        out = np.empty((len(packed), 2) + t.shape)
+        for i, m in enumerate(packed):
+            out[i, 0] = m.cx(t)
+            out[i, 1] = m.cy(t)
+        return out
+
+
+def as_motion(center) -> Motion:
+    """A ``Motion`` from a motion, a ``(cx(t), cy(t))`` pair of callables or a fixed point"""
+    if isinstance(center, Motion):
+        return center
+    if callable(center[0]) or callable(center[1]):
+        cx, cy = (c if callable(c) else (lambda t, c=float(c): c) for c in center)
+        return Function(cx, cy)
+    return Static(center)
+
+
+class MotionGroup:
+    """
+    Motions of many obstacles, evaluated with one call per kind of motion
+
+    Centres are cached per time array (compared by value, least recently
+    used first out), so the repeated right hand side evaluations of
+    ``solve_bvp`` on the same mesh (the finite-difference Jacobian and the
+    Newton iterations) reuse them.  Motions must therefore be pure functions of
+    time.
+    """
+
+    def __init__(self, motions: Sequence, cache_size: int = 8):
+        self.motions = [as_motion(m) for m in motions]
+        groups: Dict[type, List[int]] = {}
+        for i, motion in enumerate(self.motions):
+            groups.setdefault(type(motion), []).append(i)
+        self._groups = [
+            (kind, np.array(rows), kind.pack([self.motions[i] for i in rows]))
+            for kind, rows in groups.items()
+        ]
+        self.cache_size = cache_size
+        self._cache = {}
+
+    def __len__(self) -> int:
+        return len(self.motions)
+
+    @property
+    def static(self) -> bool:
+        """Whether every obstacle is fixed"""
+        return all(kind is Static for kind, _, _ in self._groups)
+
+    def positions(self, t):
+        """Centres at ``t`` (a scalar or an array)
+
+        Returns: cx, cy, each of shape (n, *t.shape), read-only
+        """
+        t = np.asarray(t, dtype=float)
+        key = (t.shape, t.tobytes())
+        cached = self._cache.pop(key, None)
+        if cached is not None:
+            self._cache[key] = cached
+            return cached
+
+        out = np.empty((len(self), 2) + t.shape)
+        for kind, rows, packed in self._groups:
+            out[rows] = kind.evaluate(packed, t)
+        out.flags.writeable = False
+
+        if len(self._cache) >= self.cache_size:
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[key] = out[:, 0], out[:, 1]
+        return self._cache[key]
+
+    def clear_cache(self):
+        self._cache.clear()
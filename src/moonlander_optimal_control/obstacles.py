@@ -1,21 +1,526 @@
-# Thin obstacle API wrappers around multi_obstacle.py
+# Obstacle costs for the obstacle-avoidance problems, the headless
+# moving-obstacle solver, and thin wrappers around the scalar helpers of
+# multi_obstacle.py
+import time
+from typing import TYPE_CHECKING, Callable, Optional, Sequence, Tuple, Union
 
-# Re-export core helpers for convenience
-try:
+import numpy as np
+
+from . import instrument
+from .motion import Motion, MotionGroup
+from .result import Solution
+
+# Centre of each obstacle: a fixed (n, 2) array, or one motion per obstacle
+# (a ``motion.Motion``, a (cx(t), cy(t)) pair of callables or a fixed point)
+Centers = Union[np.ndarray, Sequence[Union[Motion, Tuple[Callable, Callable]]]]
+
+
+def _power(z, n: int, work):
+    """``z**n`` for an integer ``n >= 0`` by repeated squaring, without a ``pow`` call.
+
+    The squares of ``z`` are kept in the scratch array ``work``.
+    """
+    result, base = None, z
+    while n:
+        if n & 1:
+            if result is None:
+                result = base.copy()
+            else:
+                result *= base
+        n >>= 1
+        if n:
+            base = np.multiply(base, base, out=work)
+    return np.ones_like(z) if result is None else result
+
+
+def barrier(q, lam=20, gradient: bool = True):
+    """Barrier ``1 / (q**lam + 1)`` and its derivative in ``q``, finite for every ``q >= 0``.
+
+    Both are evaluated through ``z = min(q, 1/q)``, so every power lies in
+    [0, 1].  Outside the ellipse (``q > 1``) the barrier is
+    ``z**lam / (1 + z**lam)`` and its derivative ``-lam z**(lam + 1) / (1 + z**lam)**2``,
+    which underflow to 0 far from the obstacle, where ``q**lam`` and
+    ``(q**lam + 1)**2`` would overflow to inf and give NaN gradients.  The
+    value and the derivative share the power ``z**(lam - 1)``, computed by
+    repeated squaring when ``lam`` is an integer.
+
+    :param q:           Ellipse metric (scalar or array, ``>= 0``)
+    :param lam:         Exponent, an integer or an array broadcasting against ``q``
+    :param gradient:    Whether to return the derivative too
+
+    Returns: value, derivative (or the value only)
+    """
+    q = np.asarray(q, dtype=float)
+    outside = q > 1
+    with np.errstate(divide="ignore"):
+        z = np.reciprocal(q)
+    np.minimum(z, q, out=z)
+
+    # Few large temporaries: the scratch array of the power holds z**lam,
+    # then the value
+    work = np.empty_like(z)
+    if isinstance(lam, (int, np.integer)) and lam >= 1:
+        z_lam1 = _power(z, int(lam) - 1, work)
+    else:
+        lam = np.asarray(lam, dtype=float)
+        z_lam1 = z ** (lam - 1)
+    z_lam = np.multiply(z_lam1, z, out=work)
+    s = z_lam + 1
+    np.reciprocal(s, out=s)
+
+    # The value is s inside and z**lam s outside
+    value = z_lam
+    np.copyto(value, 1.0, where=~outside)
+    value *= s
+    if not gradient:
+        return value
+
+    # The derivative is -lam z**(lam - 1) s**2 inside and -lam z**(lam + 1) s**2 outside
+    s *= s
+    slope = z_lam1
+    slope *= s
+    z *= z
+    np.multiply(slope, z, out=slope, where=outside)
+    slope *= -lam
+    return value, slope
+
+
+def cutoff(r, weights, lam, tol: float):
+    """Smallest ellipse metric ``q`` beyond which an obstacle's cost and gradient are below ``tol``.
+
+    For ``q >= 1`` the cost ``W / (q**lam + 1)`` is at most ``W q**-lam``, and
+    since ``|x - cx| / r_x <= sqrt(q / r_x)``, each gradient component
+    ``W lam q**(lam - 1) / (q**lam + 1)**2 * 2 |x - cx| / r_x`` is at most
+    ``2 W lam q**(-lam - 1/2) / sqrt(r_x)``.  Both bounds decrease with ``q``,
+    so every point with ``q`` above the returned value changes the total cost
+    and each gradient component by at most ``tol`` per obstacle, and by at most
+    ``n_obstacles * tol`` overall.
+
+    :param r:           Squared semi-axes in x and y, shape (n, 2)
+    :param weights:     Cost weights, shape (n,)
+    :param lam:         Exponents, shape (n,)
+
+    Returns: cutoff per obstacle, shape (n,)
+    """
+    r = np.asarray(r, dtype=float).reshape(-1, 2)
+    weights = np.abs(np.asarray(weights, dtype=float))
+    lam = np.asarray(lam, dtype=float)
+    value = (weights / tol) ** (1 / lam)
+    slope = (2 * weights * lam / (tol * np.sqrt(r.min(axis=1)))) ** (1 / (lam + 0.5))
+    return np.maximum(1.0, np.maximum(value, slope))
+
+
+class ObstacleSet:
+    """
+    Elliptical barrier costs ``W / (q**lam + 1)`` of many obstacles, evaluated in one broadcast pass
+
+    For obstacle ``i`` centred at ``(cx, cy)``, ``q = (x - cx)**2 / r[i, 0] + (y - cy)**2 / r[i, 1]``
+    (so ``r`` holds the squared semi-axes), as in ``multi_obstacle.moving_obstacle``.
+    Radii, weights and exponents are stored as contiguous arrays, and the cost
+    and its gradient are computed for all obstacles against all points at once
+    as ``(n_obstacles, *x.shape)`` arrays before summing over the obstacles.
+    Values and gradients come from ``barrier``, so they stay finite however far
+    a point is from the obstacles.
+
+    With a tolerance ``tol``, obstacle-point pairs whose contribution is
+    provably below ``tol`` are culled instead (see ``cutoff``): only the pairs
+    inside each obstacle's bounding box, swept over windows of consecutive
+    points for moving obstacles, are evaluated, so the cost scales with the
+    local obstacle density rather than the number of obstacles.
+    """
+
+    def __init__(
+        self,
+        r,
+        centers: Centers,
+        weights=1.0,
+        lam=20,
+        tol: Optional[float] = None,
+        window: int = 32,
+    ):
+        """
+        :param r:           Squared semi-axes in x and y, shape (n, 2)
+        :param centers:     Fixed centres, shape (n, 2), or a motion per obstacle: a
+                            ``motion.Motion`` (``Static``, ``Linear``, ``Periodic``,
+                            ``Waypoints``), a (cx(t), cy(t)) pair of callables or a point
+        :param weights:     Cost weight ``W`` of each obstacle (scalar or shape (n,))
+        :param lam:         Exponent of each barrier (scalar or shape (n,))
+        :param tol:         Largest cost and gradient component of a culled obstacle-point
+                            pair (None to evaluate every pair)
+        :param window:      Consecutive points sharing the swept box of a moving obstacle
+        """
+        self.r = np.ascontiguousarray(r, dtype=float).reshape(-1, 2)
+        self._inv_r = 1 / self.r
+        n = len(self.r)
+        self.weights = np.ascontiguousarray(np.broadcast_to(weights, (n,)), dtype=float)
+        self.lam = np.ascontiguousarray(np.broadcast_to(lam, (n,)), dtype=float)
+        # A common integer exponent takes the repeated squaring path of ``barrier``
+        if n and np.all(self.lam == self.lam[0]) and self.lam[0] == int(self.lam[0]):
+            self._lam = int(self.lam[0])
+        else:
+            self._lam = None
+
+        if isinstance(centers, np.ndarray):
+            centers = centers.reshape(-1, 2)
+        self.motion = MotionGroup(centers)
+        if len(self.motion) != n:
+            raise ValueError(f"Expected {n} obstacle centres, got {len(self.motion)}")
+        # Fixed centres are broadcast instead of evaluated on every time array
+        self._static = self.motion.positions(0.0) if self.motion.static else None
+
+        self.tol = tol
+        self.window = window
+        if tol is not None:
+            self.cutoff = cutoff(self.r, self.weights, self.lam, tol)
+            # Half-widths of the bounding box of the ellipse q <= cutoff
+            self._reach = np.sqrt(self.cutoff[:, None] * self.r)
+            self._swept = None
+
+    def __len__(self) -> int:
+        return len(self.r)
+
+    def center_positions(self, t):
+        """Obstacle centres at time ``t`` (a scalar or an array), cached per time array
+
+        Returns: cx, cy, each of shape (n, *t.shape) (broadcastable to it for fixed centres)
+        """
+        t = np.asarray(t, dtype=float)
+        if self._static is not None:
+            shape = (len(self),) + (1,) * t.ndim
+            return self._static[0].reshape(shape), self._static[1].reshape(shape)
+        return self.motion.positions(t)
+
+    def _terms(self, t, x, y):
+        """Shared intermediates, broadcast against ``x`` and ``y`` along a leading obstacle axis
+
+        Returns: shape of the per-obstacle parameters, (x - cx) / r_x, (y - cy) / r_y, q
+        """
+        x, y = np.broadcast_arrays(
+            np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        )
+        cx, cy = self.center_positions(t)
+        # A scalar time is broadcast against every point
+        extra = (1,) * (x.ndim - cx.ndim + 1)
+        cx, cy = cx.reshape(cx.shape + extra), cy.reshape(cy.shape + extra)
+
+        # In place where possible, since temporaries of shape (n, *x.shape) dominate
+        shape = (len(self),) + (1,) * x.ndim
+        inv_rx = self._inv_r[:, 0].reshape(shape)
+        inv_ry = self._inv_r[:, 1].reshape(shape)
+        dx, dy = np.subtract(x, cx), np.subtract(y, cy)
+        q = dx * dx
+        q *= inv_rx
+        dx *= inv_rx
+        dy_q = dy * dy
+        dy_q *= inv_ry
+        q += dy_q
+        dy *= inv_ry
+        return shape, dx, dy, q
+
+    def _exponent(self, shape):
+        return self._lam if self._lam is not None else self.lam.reshape(shape)
+
+    def _pairs(self, cx, cy, x, y, key=None):
+        """Obstacle-point pairs inside the swept boxes, a superset of the pairs with ``q <= cutoff``
+
+        :param cx, cy:  Centres of shape (n, 1) (shared by every point) or (n, m)
+        :param x, y:    Flat points, shape (m,)
+        :param key:     Cached centre array the boxes may be reused for
+
+        Returns: obstacle index, point index of each pair
+        """
+        n, m = len(self), len(x)
+        if cx.shape[1] == 1:
+            starts = np.zeros(1, dtype=int)
+            box = cx, cx, cy, cy
+        elif self._swept is not None and key is not None and self._swept[0] is key:
+            # Same (cached) centres as the previous call
+            starts, box = self._swept[1:]
+        else:
+            starts = np.arange(0, m, self.window)
+            box = (
+                np.minimum.reduceat(cx, starts, axis=1),
+                np.maximum.reduceat(cx, starts, axis=1),
+                np.minimum.reduceat(cy, starts, axis=1),
+                np.maximum.reduceat(cy, starts, axis=1),
+            )
+            self._swept = key, starts, box
+        n_windows = len(starts)
+        reach_x, reach_y = self._reach[:, :1], self._reach[:, 1:]
+        x_lo, x_hi = box[0] - reach_x, box[1] + reach_x
+        y_lo, y_hi = (box[2] - reach_y).ravel(), (box[3] + reach_y).ravel()
+
+        # Sort the points by window, then by x: window w holds the keys
+        # [w, w + 1/2], so one searchsorted finds every box's x range
+        x_min = x.min()
+        scale = 0.5 / max(x.max() - x_min, 1e-300)
+        window = np.repeat(np.arange(n_windows), np.diff(np.append(starts, m)))
+        keys = window + (x - x_min) * scale
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+
+        offset = np.arange(n_windows)
+        pad = 1e-9
+        lo = offset + np.clip((x_lo - x_min) * scale - pad, 0, 0.5)
+        hi = offset + np.clip((x_hi - x_min) * scale + pad, 0, 0.5)
+        lo = np.searchsorted(keys, lo.ravel(), "left")
+        counts = np.searchsorted(keys, hi.ravel(), "right") - lo
+
+        # Expand the (obstacle, window) ranges into pairs and filter them by y
+        boxes = np.repeat(np.arange(n * n_windows), counts)
+        first = np.repeat(lo - np.cumsum(counts) + counts, counts)
+        point = order[np.arange(len(boxes)) + first]
+        inside = (y[point] >= y_lo[boxes]) & (y[point] <= y_hi[boxes])
+        return boxes[inside] // n_windows, point[inside]
+
+    def _evaluate_culled(self, t, x, y, gradient=True):
+        """``evaluate`` (or ``cost``) over the pairs found by ``_pairs`` only"""
+        x, y = np.broadcast_arrays(
+            np.asarray(x, dtype=float), np.asarray(y, dtype=float)
+        )
+        shape, m = x.shape, x.size
+        # One centre per point, or a single one shared by every point (for a
+        # scalar time or fixed centres)
+        centers = self.center_positions(t)
+        cx, cy = (c.reshape(len(self), -1) for c in centers)
+
+        x, y = x.ravel(), y.ravel()
+        obstacle, point = self._pairs(cx, cy, x, y, key=centers[0])
+        column = point if cx.shape[1] > 1 else 0
+        dx = x[point] - cx[obstacle, column]
+        dy = y[point] - cy[obstacle, column]
+        dx *= self._inv_r[obstacle, 0]
+        dy *= self._inv_r[obstacle, 1]
+        q = dx * dx * self.r[obstacle, 0] + dy * dy * self.r[obstacle, 1]
+
+        lam = self._lam if self._lam is not None else self.lam[obstacle]
+        weights = self.weights[obstacle]
+        if not gradient:
+            value = barrier(q, lam, gradient=False)
+            return np.bincount(point, weights * value, m).reshape(shape)
+
+        value, slope = barrier(q, lam)
+        slope *= 2 * weights
+        return (
+            np.bincount(point, weights * value, m).reshape(shape),
+            np.bincount(point, slope * dx, m).reshape(shape),
+            np.bincount(point, slope * dy, m).reshape(shape),
+        )
+
+    def cost(self, t, x, y):
+        """Total cost of all obstacles at the points ``(x, y)``, shape of ``x``"""
+        if self.tol is not None:
+            return self._evaluate_culled(t, x, y, gradient=False)
+        shape, _, _, q = self._terms(t, x, y)
+        value = barrier(q, self._exponent(shape), gradient=False)
+        value *= self.weights.reshape(shape)
+        return value.sum(axis=0)
+
+    def evaluate(self, t, x, y):
+        """Total cost and its x and y derivatives at the points ``(x, y)``, in one fused pass
+
+        Returns: cost, d cost / dx, d cost / dy, each of the shape of ``x``
+        """
+        if self.tol is not None:
+            return self._evaluate_culled(t, x, y)
+        shape, dx, dy, q = self._terms(t, x, y)
+        weights = self.weights.reshape(shape)
+        value, slope = barrier(q, self._exponent(shape))
+
+        # Chain rule through q: dq/dx = 2 (x - cx) / r_x, dq/dy = 2 (y - cy) / r_y
+        value *= weights
+        slope *= 2 * weights
+        dx *= slope
+        dy *= slope
+        return value.sum(axis=0), dx.sum(axis=0), dy.sum(axis=0)
+
+    def gradient(self, t, x, y):
+        """x and y derivatives of the total cost at the points ``(x, y)``"""
+        return self.evaluate(t, x, y)[1:]
+
+
+def obstacle_guess(
+    start: Tuple[float, float] = (6.0, 0.0),
+    goal: Tuple[float, float] = (0.0, 0.0),
+    t_steps: int = 200,
+    tf_guess: float = 6.0,
+    clearance: float = 1.75,
+):
+    """Straight path from ``start`` to ``goal`` bowed by ``clearance`` at mid-course, at constant velocity
+
+    The defaults reproduce the guess of ``multi_obstacle.avoid_many_moving_obstacle``.
+
+    Returns: s, y (shape (8, t_steps)), tf
+    """
+    (x0, y0), (x1, y1) = start, goal
+    s = np.linspace(0, 1, t_steps)
+    y = np.zeros((8, t_steps))
+    y[0] = x0 + (x1 - x0) * s
+    y[1] = y0 + (y1 - y0) * s + clearance * (1 - np.abs(2 * s - 1))
+    y[2] = (x1 - x0) / tf_guess
+    y[3] = (y1 - y0) / tf_guess
+    return s, y, tf_guess
+
+
+def _moving_obstacle_system(
+    obstacles: ObstacleSet,
+    start: Tuple[float, float],
+    goal: Tuple[float, float],
+    W2: float,
+    physical_time: bool,
+):
+    """ODE and boundary conditions of the fastest path through ``obstacles`` from rest to rest
+
+    States are ``x, y, xp, yp`` and their costates ``p1..p4`` on the mesh
+    ``s = t / tf``, with ``tf`` the unknown parameter; the controls are
+    ``u = (p3, p4) / (2 W2)``.
+    """
+    k = 1 / (2 * W2)
+
+    # Rows are written in place into one array
+    def ode(s, y, p):
+        tf = p[0]
+        out = np.empty_like(y)
+        np.multiply(y[2], tf, out=out[0])
+        np.multiply(y[3], tf, out=out[1])
+        np.multiply(y[6], tf * k, out=out[2])
+        np.multiply(y[7], tf * k, out=out[3])
+        out[4], out[5] = obstacles.gradient(s * tf if physical_time else s, y[0], y[1])
+        out[4:6] *= tf
+        np.multiply(y[4], -tf, out=out[6])
+        np.multiply(y[5], -tf, out=out[7])
+        return out
+
+    # Fixed ends at rest, and the Hamiltonian vanishes at the free final time
+    def bc(ya, yb, p):
+        utf = yb[6:] * k
+        return np.array(
+            [
+                ya[0] - start[0],
+                ya[1] - start[1],
+                ya[2],
+                ya[3],
+                yb[0] - goal[0],
+                yb[1] - goal[1],
+                yb[2],
+                yb[3],
+                yb[2:4] @ yb[4:6]
+                + yb[6:] @ utf
+                - (1 + obstacles.cost(p[0], yb[0], yb[1]) + W2 * (utf**2).sum()),
+            ]
+        )
+
+    return ode, bc
+
+
+def solve_moving_obstacles(
+    obstacles: ObstacleSet,
+    start: Tuple[float, float] = (6.0, 0.0),
+    goal: Tuple[float, float] = (0.0, 0.0),
+    W2: float = 10.0,
+    t_steps: int = 200,
+    tf_guess: float = 6.0,
+    guess=None,
+    max_nodes: int = 30000,
+    physical_time: bool = False,
+) -> Solution:
+    """
+    Fastest path from rest at ``start`` to rest at ``goal`` past moving obstacles, without rendering
+
+    Minimizes ``tf + int(obstacles.cost + W2 |u|**2) dt`` for the double
+    integrator ``x'' = u`` (no gravity).  Nothing is plotted or written, so
+    solves can run in batches on headless workers; render the result with
+    ``plotting.animate_moving_obstacles``.
+
+    As in the original ``multi_obstacle.avoid_many_moving_obstacle``, the
+    dynamics see the obstacles at the normalized time ``s = t / tf`` in
+    [0, 1] (while the final-time condition uses ``tf``);
+    ``physical_time=True`` evaluates them at ``t = s tf`` instead, a harder
+    problem that needs a closer guess as the number of obstacles grows.
+
+    :param obstacles:       Obstacle costs (weights ``W1`` included)
+    :param start:           Initial position
+    :param goal:            Final position
+    :param W2:              Weight of the control effort
+    :param t_steps:         Mesh points of the default guess (``obstacle_guess``)
+    :param tf_guess:        Final time of the default guess
+    :param guess:           Optional ``(mesh, y, tf)`` warm start replacing the default guess
+    :param max_nodes:       Largest mesh ``solve_bvp`` may refine to
+    :param physical_time:   Evaluate the obstacles at ``s tf`` instead of ``s`` in the dynamics
+
+    Returns: Solution (with ``alpha = W2`` and ``G = 0``, so ``ux``, ``uy`` are the controls)
+    """
+    ode, bc = _moving_obstacle_system(obstacles, start, goal, W2, physical_time)
+    if guess is None:
+        guess = obstacle_guess(start, goal, t_steps, tf_guess)
+    s, y0, tf_guess = guess
+
+    n_rhs = 0
+
+    def counted_ode(s, y, p):
+        nonlocal n_rhs
+        n_rhs += 1
+        return ode(s, y, p)
+
+    start_time = time.perf_counter()
+    sol = instrument.solve_bvp(
+        counted_ode,
+        bc,
+        s,
+        y0,
+        p=np.array([tf_guess]),
+        max_nodes=max_nodes,
+        model="multi_obstacle",
+        params=dict(
+            n_obstacles=len(obstacles),
+            start=start,
+            goal=goal,
+            W2=W2,
+            physical_time=physical_time,
+        ),
+    )
+    wall_time = time.perf_counter() - start_time
+    return Solution.from_bvp(sol, W2, 0.0, n_rhs, wall_time)
+
+
+# The scalar helpers and the animated driver live in the root-level
+# multi_obstacle.py, which itself uses ObstacleSet, so they are imported on
+# first access (raising ImportError if multi_obstacle.py is not importable)
+_LEGACY = (
+    "moving_obstacle",
+    "moving_obstacle_terms",
+    "moving_obstacle_dx",
+    "moving_obstacle_dy",
+    "avoid_many_moving_obstacle",
+)
+
+if TYPE_CHECKING:
     from multi_obstacle import (
+        avoid_many_moving_obstacle,
         moving_obstacle,
         moving_obstacle_dx,
         moving_obstacle_dy,
-        avoid_many_moving_obstacle,
+        moving_obstacle_terms,
     )
-except Exception:  # pragma: no cover - allow import even if optional deps missing
-    moving_obstacle = None
-    moving_obstacle_dx = None
-    moving_obstacle_dy = None
-    avoid_many_moving_obstacle = None
+
+
+def __getattr__(name):
+    if name in _LEGACY:
+        import multi_obstacle
+
+        value = globals()[name] = getattr(multi_obstacle, name)
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = [
+    "ObstacleSet",
+    "barrier",
+    "cutoff",
+    "obstacle_guess",
+    "solve_moving_obstacles",
     "moving_obstacle",
+    "moving_obstacle_terms",
     "moving_obstacle_dx",
     "moving_obstacle_dy",
     "avoid_many_moving_obstacle",
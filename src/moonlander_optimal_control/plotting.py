@@ -1,96 +1,222 @@
-from typing import Iterable, Optional, Tuple
+from abc import ABC, abstractmethod
+from functools import partial
+from typing import Iterable, List, Optional, Tuple
 
 import numpy as np
-import matplotlib.pyplot as plt
 
+from .render import Scene, map_chunks
+from .result import FIELDS
+
+
+class FigureTemplate(ABC):
+    """
+    Figure laid out once and refilled with the data of one solution after another
+
+    The axes, labels and empty lines are created by ``layout``; ``update``
+    only sets line data and rescales the axes, so exporting many solutions
+    reuses one figure instead of rebuilding its subplots.  Pass a ``Figure``
+    (e.g. ``plt.figure()``) to draw on it, otherwise the template creates an
+    Agg-backed one without pyplot, which is never registered with (or leaked
+    by) the pyplot figure manager.  ``fields`` names the ``Solution``
+    attributes ``update`` takes, in order.
+    """
+
+    figsize = (6.4, 4.8)
+    fields: Tuple[str, ...] = ()
+    style = "dark_background"
+
+    def __init__(self, fig=None):
+        from matplotlib import style
+
+        with style.context(self.style):
+            if fig is None:
+                from matplotlib.backends.backend_agg import FigureCanvasAgg
+                from matplotlib.figure import Figure
+
+                fig = Figure(figsize=self.figsize)
+                FigureCanvasAgg(fig)
+            self.fig = fig
+            self.layout(fig)
+        self._tight = False
+
+    @abstractmethod
+    def layout(self, fig):
+        """Create the axes and (empty) artists on ``fig``"""
+
+    @abstractmethod
+    def update(self, *values):
+        """Fill the template with ``values`` (the arrays named by ``fields``)"""
+
+    def _rescale(self, axes):
+        for ax in axes:
+            ax.relim()
+            ax.autoscale_view()
+        # The layout is fitted to the first solution's tick labels only
+        if not self._tight:
+            self.fig.tight_layout()
+            self._tight = True
+
+    def plot(self, solution):
+        """Fill the template with the fields of a ``Solution`` (or a ``t, x, ..., tf`` tuple)"""
+        values = dict(zip(FIELDS, solution))
+        self.update(*(values[name] for name in self.fields))
+        return self.fig
+
+    def savefig(self, path, **kwargs):
+        from matplotlib import style
+
+        with style.context(self.style):
+            self.fig.savefig(path, **kwargs)
 
-def plot_summary(t, x, y, xp, yp, ux, uy, tf):
-    plt.style.use("dark_background")
-    print("Final Time:", tf)
-    print("Final Position:", (np.round(x[-1], 3), np.round(y[-1], 3)))
 
-    plt.figure(figsize=(12, 18))
-
-    plt.subplot(421)
-    plt.plot(t, x)
-    plt.title("x Position")
-    plt.xlabel("Time (seconds)")
-    plt.ylabel("Position (meters)")
-
-    plt.subplot(422)
-    plt.plot(t, y)
-    plt.title("y Position")
-    plt.xlabel("Time (seconds)")
-    plt.ylabel("Position (meters)")
-
-    plt.subplot(423)
-    plt.plot(t, xp)
-    plt.title("Velocity $V_x$")
-    plt.xlabel("Time (seconds)")
-    plt.ylabel(r"Velocity ($\\frac{m}{s}$)")
-
-    plt.subplot(424)
-    plt.plot(t, yp)
-    plt.title("Velocity $V_y$")
-    plt.xlabel("Time (seconds)")
-    plt.ylabel(r"Velocity ($\\frac{m}{s}$)")
-
-    plt.subplot(425)
-    plt.plot(t, ux)
-    plt.title("Control $U_x$")
-    plt.xlabel("Time (seconds)")
-    plt.ylabel(r"Acceleration ($\\frac{m}{s^2}$)")
-
-    plt.subplot(426)
-    plt.plot(t, uy)
-    plt.title("Control $U_y$")
-    plt.xlabel("Time (seconds)")
-    plt.ylabel(r"Acceleration ($\\frac{m}{s^2}$)")
-
-    plt.subplot(427)
-    plt.plot(t, np.arctan2(-ux, uy))
-    plt.title(r"Lander Angle ($\\theta$)")
-    plt.yticks(
-        [-np.pi / 2, -np.pi / 4, 0, np.pi / 4, np.pi / 2],
-        [
-            r"$-\\frac{\\pi}{2}$",
-            r"$-\\frac{\\pi}{4}$",
-            "0",
-            r"$\\frac{\\pi}{4}$",
-            r"$\\frac{\\pi}{2}$",
-        ],
+class SummaryFigure(FigureTemplate):
+    """Positions, velocities, controls, lander angle and thrust against time, in a 4 x 2 grid"""
+
+    figsize = (12, 18)
+    fields = ("t", "x", "y", "xp", "yp", "ux", "uy")
+
+    # title, y label of each panel
+    PANELS = (
+        ("x Position", "Position (meters)"),
+        ("y Position", "Position (meters)"),
+        ("Velocity $V_x$", r"Velocity ($\frac{m}{s}$)"),
+        ("Velocity $V_y$", r"Velocity ($\frac{m}{s}$)"),
+        ("Control $U_x$", r"Acceleration ($\frac{m}{s^2}$)"),
+        ("Control $U_y$", r"Acceleration ($\frac{m}{s^2}$)"),
+        (r"Lander Angle ($\theta$)", "Angle (radians)"),
+        (r"Thrust Magnitude ($\tau$)", r"Magnitude ($\frac{m}{s^2}$)"),
     )
-    plt.xlabel("Time (seconds)")
-    plt.ylabel("Angle (radians)")
 
-    plt.subplot(428)
-    plt.plot(t, (ux**2 + uy**2) ** 0.5)
-    plt.title(r"Thrust Magnitude ($\\tau$)")
-    plt.xlabel("Time (seconds)")
-    plt.ylabel(r"Magnitude ($\\frac{m}{s^2}$)")
+    def layout(self, fig):
+        self.axes = [fig.add_subplot(4, 2, i + 1) for i in range(len(self.PANELS))]
+        self.lines = []
+        for ax, (title, ylabel) in zip(self.axes, self.PANELS):
+            (line,) = ax.plot([], [])
+            self.lines.append(line)
+            ax.set_title(title)
+            ax.set_xlabel("Time (seconds)")
+            ax.set_ylabel(ylabel)
+        self.axes[6].set_yticks(
+            [-np.pi / 2, -np.pi / 4, 0, np.pi / 4, np.pi / 2],
+            [
+                r"$-\frac{\pi}{2}$",
+                r"$-\frac{\pi}{4}$",
+                "0",
+                r"$\frac{\pi}{4}$",
+                r"$\frac{\pi}{2}$",
+            ],
+        )
 
-    plt.tight_layout()
+    def update(self, t, x, y, xp, yp, ux, uy):
+        values = (x, y, xp, yp, ux, uy, np.arctan2(-ux, uy), np.hypot(ux, uy))
+        for line, value in zip(self.lines, values):
+            line.set_data(t, value)
+        self._rescale(self.axes)
+        return self.fig
 
 
-def plot_controls(t, ux, uy):
+class ControlsFigure(FigureTemplate):
+    """Lander angle and acceleration magnitude against time"""
+
+    fields = ("t", "ux", "uy")
+
+    def layout(self, fig):
+        self.axes = [fig.add_subplot(2, 1, 1), fig.add_subplot(2, 1, 2)]
+        self.lines = [ax.plot([], [])[0] for ax in self.axes]
+        angle, magnitude = self.axes
+        angle.set_title(r"Lander Angle ($\theta$)")
+        angle.set_yticks(
+            [0, np.pi / 8, np.pi / 4, 3 * np.pi / 8],
+            ["0", r"$\frac{\pi}{8}$", r"$\frac{\pi}{4}$", r"$\frac{3\pi}{8}$"],
+        )
+        angle.set_ylabel("Angle (radians)")
+        magnitude.set_title(r"Acceleration Magnitude ($\tau$)")
+        magnitude.set_ylabel(r"Magnitude ($m/s^2$)")
+        for ax in self.axes:
+            ax.set_xlabel("Time (seconds)")
+
+    def update(self, t, ux, uy):
+        self.lines[0].set_data(t, np.arctan2(-ux, uy))
+        self.lines[1].set_data(t, np.hypot(ux, uy))
+        self._rescale(self.axes)
+        return self.fig
+
+
+class TrajectoryFigure(FigureTemplate):
+    """Lander path in the plane, over optional obstacles and initial guess"""
+
+    fields = ("x", "y")
+
+    def __init__(
+        self,
+        fig=None,
+        obstacles: Optional[Iterable] = None,
+        xlim: Optional[Tuple[float, float]] = None,
+        guess: Optional[Tuple] = None,
+    ):
+        """
+        :param fig:         Figure to draw on (an Agg figure is created if None)
+        :param obstacles:   Objects with an ``obstacle(X, Y)`` cost, contoured once
+        :param xlim:        Horizontal limits (fitted to each path if None)
+        :param guess:       Initial guess ``(x, y)`` drawn under the path
+        """
+        self.obstacles, self.xlim, self.guess = obstacles, xlim, guess
+        super().__init__(fig)
+
+    def layout(self, fig):
+        self.ax = ax = fig.gca()
+        if self.obstacles is not None:
+            X, Y = np.meshgrid(
+                np.linspace(-10.0, 10.0, 150), np.linspace(-10.0, 10.0, 150)
+            )
+            for obstacle in self.obstacles:
+                ax.contour(X, Y, obstacle.obstacle(X, Y), linewidths=5, cmap="Greys")
+        if self.guess is not None:
+            ax.plot(*self.guess, label="Initial Guess")
+        (self.line,) = ax.plot([], [], color="#8dd3c7", label="Optimal Trajectory")
+        if self.guess is not None:
+            ax.legend()
+        ax.set_title("Lander Trajectory")
+        if self.xlim is not None:
+            ax.set_xlim(*self.xlim)
+        ax.set_xlabel("Horizontal Position (meters)")
+        ax.set_ylabel("Vertical Position (meters)")
+
+    def update(self, x, y):
+        self.line.set_data(x, y)
+        self.ax.relim()
+        self.ax.autoscale_view(scalex=self.xlim is None, scaley=False)
+        self.ax.set_ylim(0, np.max(y) + 0.5)
+        if not self._tight:
+            self.fig.tight_layout()
+            self._tight = True
+        return self.fig
+
+
+# kind of figure: template (see ``render_many``)
+FIGURES = {
+    "summary": SummaryFigure,
+    "controls": ControlsFigure,
+    "trajectory": TrajectoryFigure,
+}
+
+
+def plot_summary(t, x, y, xp, yp, ux, uy, tf):
+    import matplotlib.pyplot as plt
+
     plt.style.use("dark_background")
-    plt.subplot(211)
-    plt.plot(t, np.arctan2(-ux, uy))
-    plt.title(r"Lander Angle ($\\theta$)")
-    plt.yticks(
-        [0, np.pi / 8, np.pi / 4, 3 * np.pi / 8],
-        ["0", r"$\\frac{\\pi}{8}$", r"$\\frac{\\pi}{4}$", r"$\\frac{3\\pi}{8}$"],
-    )  # noqa: E501
-    plt.xlabel("Time (seconds)")
-    plt.ylabel("Angle (radians)")
+    print("Final Time:", tf)
+    print("Final Position:", (np.round(x[-1], 3), np.round(y[-1], 3)))
 
-    plt.subplot(212)
-    plt.plot(t, (ux**2 + uy**2) ** 0.5)
-    plt.title(r"Acceleration Magnitude ($\\tau$)")
-    plt.xlabel("Time (seconds)")
-    plt.ylabel(r"Magnitude ($m/s^2$)")
+    fig = plt.figure(figsize=SummaryFigure.figsize)
+    SummaryFigure(fig).update(t, x, y, xp, yp, ux, uy)
 
-    plt.tight_layout()
+
+def plot_controls(t, ux, uy):
+    import matplotlib.pyplot as plt
+
+    plt.style.use("dark_background")
+    ControlsFigure(plt.gcf()).update(t, ux, uy)
 
 
 def plot_trajectory(
@@ -101,36 +227,171 @@ def plot_trajectory(
     guess: Optional[Tuple] = None,
     save_file: Optional[str] = None,
 ):
+    import matplotlib.pyplot as plt
+
     plt.style.use("dark_background")
+    TrajectoryFigure(plt.gcf(), obstacles, xlim, guess).update(x, y)
 
-    if obstacles is not None:
-        for obstacle in obstacles:
-            x_vals = np.linspace(-10.0, 10.0, 150)
-            y_vals = np.linspace(-10.0, 10.0, 150)
-            X, Y = np.meshgrid(x_vals, y_vals)
-            Z = obstacle.obstacle(X, Y)
-            plt.contour(X, Y, Z, linewidths=5, cmap="Greys")
+    if save_file is not None:
+        plt.savefig(save_file, dpi=300)
 
-    if guess is not None:
-        guess_x, guess_y = guess
-        plt.plot(guess_x, guess_y, label="Initial Guess")
+    plt.show()
 
-    plt.plot(x, y, color="#8dd3c7", label="Optimal Trajectory")
 
-    if guess is not None:
-        plt.legend()
+def _save_chunk(template, jobs, savefig_kw):
+    for values, path in jobs:
+        template.update(*values)
+        template.savefig(path, **savefig_kw)
+    return [path for _, path in jobs]
 
-    plt.title("Lander Trajectory")
 
-    if xlim is not None:
-        plt.xlim(*xlim)
-    plt.ylim(0, np.max(y) + 0.5)
-    plt.xlabel("Horizontal Position (meters)")
-    plt.ylabel("Vertical Position (meters)")
+def render_many(
+    solutions: Iterable,
+    paths,
+    kind: str = "summary",
+    processes: Optional[int] = None,
+    chunk_size: int = 16,
+    options: Optional[dict] = None,
+    **savefig_kw,
+) -> List[str]:
+    """Export one figure per solution across a process pool
 
-    plt.tight_layout()
+    Each worker builds the ``kind`` template (see ``FIGURES``) once and
+    refills it for every chunk of ``chunk_size`` solutions it is given (see
+    ``render.map_chunks``).
 
-    if save_file is not None:
-        plt.savefig(save_file, dpi=300)
+    :param solutions:   ``Solution`` objects (or ``t, x, y, xp, yp, ux, uy, tf`` tuples)
+    :param paths:       Output file of each solution, or a format string with an
+                        ``{index}`` field (e.g. ``"out/summary_{index:04d}.png"``)
+    :param kind:        ``"summary"``, ``"controls"`` or ``"trajectory"``
+    :param processes:   Number of worker processes (see ``render.map_chunks``)
+    :param options:     Keyword arguments of the template (e.g. ``xlim`` for trajectories)
+    :param savefig_kw:  Keyword arguments of ``Figure.savefig`` (e.g. ``dpi``)
+    :return:            Paths written, in input order
+    """
+    if kind not in FIGURES:
+        raise ValueError(f"Unknown kind {kind!r}, expected one of {list(FIGURES)}")
+    options = options or {}
+    fields = FIGURES[kind].fields
 
-    plt.show()
+    def jobs():
+        for index, solution in enumerate(solutions):
+            values = dict(zip(FIELDS, solution))
+            path = paths.format(index=index) if isinstance(paths, str) else paths[index]
+            yield tuple(np.asarray(values[name]) for name in fields), str(path)
+
+    chunks = map_chunks(
+        partial(_save_chunk, savefig_kw=savefig_kw),
+        jobs(),
+        partial(FIGURES[kind], **options),
+        chunk_size,
+        processes,
+    )
+    return [path for written in chunks for path in written]
+
+
+class MovingObstacleScene(Scene):
+    """
+    Frames of ``animate_moving_obstacles``: obstacle outlines, the path flown so far and the position
+
+    Everything is precomputed up front: the obstacle centres at every frame
+    time, and the trajectory on a mesh ``path_points`` times finer than the
+    frames.  Obstacles have a fixed shape, so their outlines (the ellipses
+    where the barrier ``1 / (q**lam + 1)`` equals each of ``levels``) are one
+    collection whose offsets move each frame; the path line is a growing
+    prefix of the precomputed trajectory.  Only those three artists are
+    blitted over a static background, so the cost of a frame does not
+    depend on the number of obstacles or the length of the trajectory.
+    """
+
+    def __init__(
+        self,
+        solution,
+        obstacles,
+        fps: int = 20,
+        xlim: Tuple[float, float] = (0.0, 7.0),
+        ylim: Tuple[float, float] = (-3.0, 3.0),
+        path_points: int = 10,
+        levels: Iterable[float] = (0.1, 0.5, 0.9),
+    ):
+        n_frames = fps * int(np.ceil(solution.tf))
+        self.times = np.linspace(0, solution.tf, n_frames)
+        self.xlim, self.ylim = xlim, ylim
+
+        # Path points between consecutive frames, and positions at the frames
+        self.step = max(1, path_points)
+        t = np.linspace(0, solution.tf, (n_frames - 1) * self.step + 1)
+        self.path = np.ascontiguousarray(solution(t)[:2])
+
+        # Outline semi-axes sqrt(q r) at each level, and the centres per frame
+        levels = np.asarray(levels, dtype=float)
+        q = (1 / levels[:, None] - 1) ** (1 / obstacles.lam)
+        self.widths = 2 * np.sqrt(q[..., None] * obstacles.r)
+        self.levels = levels
+        cx, cy = obstacles.center_positions(self.times)
+        shape = (len(obstacles), n_frames)
+        self.centers = np.stack(
+            [np.broadcast_to(cx, shape).T, np.broadcast_to(cy, shape).T], axis=-1
+        )
+
+    def __len__(self):
+        return len(self.times)
+
+    def setup(self, fig):
+        from matplotlib import colormaps
+        from matplotlib.collections import EllipseCollection
+
+        ax = fig.add_subplot()
+        ax.set_xlim(*self.xlim)
+        ax.set_ylim(*self.ylim)
+
+        n_levels = len(self.levels)
+        colors = colormaps["viridis"](np.linspace(0, 1, n_levels))
+        self.outlines = EllipseCollection(
+            self.widths[..., 0].ravel(),
+            self.widths[..., 1].ravel(),
+            np.zeros(self.widths[..., 0].size),
+            units="xy",
+            offsets=np.tile(self.centers[0], (n_levels, 1)),
+            offset_transform=ax.transData,
+            facecolors="none",
+            edgecolors=np.repeat(colors, self.widths.shape[1], axis=0),
+        )
+        ax.add_collection(self.outlines)
+        (self.line,) = ax.plot([], [], c="blue")
+        (self.dot,) = ax.plot([], [], "o", c="blue")
+        return [self.outlines, self.line, self.dot]
+
+    def update(self, frame):
+        self.outlines.set_offsets(np.tile(self.centers[frame], (len(self.levels), 1)))
+        end = frame * self.step
+        self.line.set_data(self.path[0, : end + 1], self.path[1, : end + 1])
+        self.dot.set_data(self.path[:, end, None])
+
+
+def animate_moving_obstacles(
+    solution,
+    obstacles,
+    anim_file: str,
+    xlim: Tuple[float, float] = (0.0, 7.0),
+    ylim: Tuple[float, float] = (-3.0, 3.0),
+    fps: int = 20,
+    path_points: int = 10,
+    levels: Iterable[float] = (0.1, 0.5, 0.9),
+    dpi: float = 100.0,
+    processes: Optional[int] = None,
+):
+    """Animate a ``solve_moving_obstacles`` solution among its obstacles into ``anim_file``
+
+    Each frame shows the outline of every obstacle at the frame time (its
+    barrier at ``levels``), the path flown so far (``path_points`` points
+    per frame) and the current position.  Frames are blitted (see
+    ``MovingObstacleScene``), rendered across ``processes`` worker processes
+    and streamed to ffmpeg (see ``render.export_animation``).
+    """
+    from .render import export_animation
+
+    scene = MovingObstacleScene(
+        solution, obstacles, fps, xlim, ylim, path_points, levels
+    )
+    export_animation(scene, anim_file, fps=fps, dpi=dpi, processes=processes)
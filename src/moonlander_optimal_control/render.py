@@ -0,0 +1,279 @@
+# Animation export: frames are drawn with Agg (no pyplot) in worker processes
+# and streamed, in order, into the stdin of one ffmpeg process.  The ordered,
+# bounded process pool (``map_chunks``) also serves ``plotting.render_many``
+import copy
+import os
+import pickle
+import subprocess
+import tempfile
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from functools import partial
+from typing import Callable, Iterable, Iterator, Optional, Sequence
+
+
+class Scene(ABC):
+    """
+    Picklable description of an animation, rendered by ``export_animation``
+
+    Subclasses hold the precomputed data of every frame; ``setup`` builds the
+    artists on a fresh figure (once per process) and ``update`` moves them to
+    a frame.  Frames are drawn independently, so any process can render any
+    frame range.
+
+    When ``setup`` returns the artists that change between frames, the rest
+    of the figure is drawn once and each frame is blitted: the saved
+    background is restored and only those artists are drawn over it.
+    """
+
+    figsize = (6.4, 4.8)
+
+    @abstractmethod
+    def __len__(self) -> int:
+        """Number of frames"""
+
+    @abstractmethod
+    def setup(self, fig):
+        """Create the axes and artists of the animation on ``fig``
+
+        Returns: the artists ``update`` changes (for blitting), or None to redraw everything
+        """
+
+    @abstractmethod
+    def update(self, frame: int):
+        """Set the artists to frame ``frame``"""
+
+
+class _Renderer:
+    """A scene set up on its own Agg canvas, rendering frames to raw RGBA bytes"""
+
+    def __init__(self, scene: Scene, dpi: float):
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        # Artists are attached to a copy, so the scene itself stays picklable
+        self.scene = copy.copy(scene)
+        self.figure = Figure(figsize=scene.figsize, dpi=dpi)
+        self.canvas = FigureCanvasAgg(self.figure)
+        self.artists = self.scene.setup(self.figure)
+        self.background = None
+        if self.artists:
+            for artist in self.artists:
+                artist.set_animated(True)
+            self.canvas.draw()
+            self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+
+    @property
+    def size(self):
+        """Frame width and height in pixels"""
+        return self.canvas.get_width_height()
+
+    def render(self, frame: int) -> bytes:
+        self.scene.update(frame)
+        if self.background is None:
+            self.canvas.draw()
+        else:
+            self.canvas.restore_region(self.background)
+            for artist in self.artists:
+                self.figure.draw_artist(artist)
+        return bytes(self.canvas.buffer_rgba())
+
+
+def _render_frames(renderer: _Renderer, frames: Sequence[int]):
+    return [renderer.render(frame) for frame in frames]
+
+
+# The state of a ``map_chunks`` worker process, built once by ``_init_worker``
+_state = None
+
+
+def _init_worker(setup):
+    global _state
+    _state = setup()
+
+
+def _run_chunk(work, chunk):
+    return work(_state, chunk)
+
+
+def _chunks(items: Iterable, size: int) -> Iterator[list]:
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def map_chunks(
+    work: Callable,
+    items: Iterable,
+    setup: Callable,
+    chunk_size: int = 1,
+    processes: Optional[int] = None,
+    max_in_flight: Optional[int] = None,
+    state=None,
+) -> Iterator:
+    """Apply ``work(state, chunk)`` to consecutive chunks of ``items``, yielding the results in order
+
+    Each worker process builds its ``state = setup()`` (e.g. a figure) once
+    and keeps it for every chunk it is given.  At most ``max_in_flight``
+    chunks (two per process by default) are submitted but not yet consumed.
+    When running serially, ``state`` (or a fresh ``setup()``) is used in this
+    process and released with the generator.
+
+    The ``processes`` argument of the rendering and sweep functions follows
+    the same convention: ``None`` for one worker per CPU, ``1`` to run
+    serially in this process.
+
+    :param work:            Picklable function of the state and a list of items
+    :param setup:           Picklable function building the state of a process
+    :param processes:       Number of worker processes (serial if unpicklable)
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    if processes > 1 and not _picklable((work, setup)):
+        processes = 1
+    if max_in_flight is None:
+        max_in_flight = 2 * processes
+
+    if processes == 1:
+        if state is None:
+            state = setup()
+        for chunk in _chunks(items, chunk_size):
+            yield work(state, chunk)
+        return
+
+    with ProcessPoolExecutor(
+        max_workers=processes, initializer=_init_worker, initargs=(setup,)
+    ) as pool:
+        pending = deque()
+        for chunk in _chunks(items, chunk_size):
+            pending.append(pool.submit(_run_chunk, work, chunk))
+            if len(pending) >= max_in_flight:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def _ffmpeg(out_file, size, fps, codec, extra_args, stderr):
+    """ffmpeg process encoding raw RGBA frames of ``size`` read from its stdin"""
+    from matplotlib import rcParams
+
+    width, height = size
+    return subprocess.Popen(
+        [
+            rcParams["animation.ffmpeg_path"],
+            "-y",
+            "-loglevel",
+            "error",
+            "-f",
+            "rawvideo",
+            "-pix_fmt",
+            "rgba",
+            "-s",
+            f"{width}x{height}",
+            "-r",
+            str(fps),
+            "-i",
+            "-",
+            # yuv420p needs even dimensions
+            "-vf",
+            "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+            "-vcodec",
+            codec,
+            "-pix_fmt",
+            "yuv420p",
+            *extra_args,
+            str(out_file),
+        ],
+        stdin=subprocess.PIPE,
+        stderr=stderr,
+    )
+
+
+def _picklable(obj) -> bool:
+    try:
+        pickle.dumps(obj)
+    except Exception:
+        return False
+    return True
+
+
+def export_animation(
+    scene: Scene,
+    out_file,
+    fps: float = 20.0,
+    dpi: float = 100.0,
+    processes: Optional[int] = None,
+    chunk_size: int = 4,
+    max_in_flight: Optional[int] = None,
+    codec: str = "libx264",
+    extra_args: Sequence[str] = (),
+):
+    """Render every frame of ``scene`` and encode them into the video ``out_file``
+
+    Chunks of ``chunk_size`` frames are rendered with ``map_chunks``, each
+    worker with its own figure, and written to ffmpeg in frame order.
+
+    :param scene:           Frames to render
+    :param out_file:        Video file written by ffmpeg
+    :param fps:             Frames per second of the video
+    :param dpi:             Resolution of the frames (pixels per inch of ``scene.figsize``)
+    :param processes:       Number of worker processes (see ``map_chunks``)
+    :param chunk_size:      Frames rendered per task
+    :param max_in_flight:   Largest number of chunks submitted but not yet written
+    :param codec:           ffmpeg video codec
+    :param extra_args:      Additional ffmpeg output arguments
+    :raises RuntimeError: if ffmpeg fails (with its error output)
+
+    If rendering a frame raises, ffmpeg is stopped, the partial ``out_file``
+    is removed and the exception propagates.
+    """
+    # The frame size comes from a renderer in this process, which also draws
+    # the frames when rendering serially
+    renderer = _Renderer(scene, dpi)
+    # ffmpeg's messages go to a file rather than a pipe, which could fill up
+    # and block it while frames are written
+    with tempfile.TemporaryFile() as log:
+        encoder = _ffmpeg(out_file, renderer.size, fps, codec, extra_args, log)
+        broken = False
+        try:
+            try:
+                frames = map_chunks(
+                    _render_frames,
+                    range(len(scene)),
+                    partial(_Renderer, scene, dpi),
+                    chunk_size,
+                    processes,
+                    max_in_flight,
+                    state=renderer,
+                )
+                with closing(frames):
+                    for chunk in frames:
+                        encoder.stdin.writelines(chunk)
+            except BrokenPipeError:
+                # ffmpeg exited early; its status and messages are reported below
+                broken = True
+            try:
+                encoder.stdin.close()
+            except BrokenPipeError:
+                broken = True
+        except BaseException:
+            encoder.kill()
+            encoder.wait()
+            if os.path.exists(out_file):
+                os.remove(out_file)
+            raise
+        returncode = encoder.wait()
+        log.seek(0)
+        message = log.read().decode(errors="replace").strip()
+
+    if returncode != 0 or broken:
+        raise RuntimeError(
+            f"ffmpeg exited with status {returncode} writing {out_file}: {message}"
+        )
@@ -0,0 +1,207 @@
+from typing import Dict, Optional
+
+import numpy as np
+from scipy.interpolate import CubicHermiteSpline
+
+# Positional fields, in the order of the tuple the solvers used to return
+FIELDS = ("t", "x", "y", "xp", "yp", "ux", "uy", "tf")
+
+# Arrays needed to rebuild a solution (e.g. from a cache entry)
+STORED = (
+    "s",
+    "states",
+    "rates",
+    "tf",
+    "alpha",
+    "G",
+    "status",
+    "niter",
+    "n_rhs",
+    "wall_time",
+)
+
+
+class Solution:
+    """
+    Result of a lunar lander solve
+
+    Unpacks like the tuple ``t, x, y, xp, yp, ux, uy, tf`` the solvers used
+    to return, but keeps the full state/costate array instead of copying rows
+    out of it: ``x``, ``y``, ``xp``, ``yp`` and ``costates`` are views into
+    ``states``, while ``t``, ``ux`` and ``uy`` are derived on access.  The
+    dense interpolant is only built when the solution is resampled.
+    """
+
+    __slots__ = (
+        "G",
+        "_interpolant",
+        "alpha",
+        "n_rhs",
+        "niter",
+        "rates",
+        "s",
+        "states",
+        "status",
+        "tf",
+        "wall_time",
+    )
+
+    def __init__(
+        self,
+        s: np.ndarray,
+        states: np.ndarray,
+        tf: float,
+        alpha: float,
+        G: float,
+        rates: Optional[np.ndarray] = None,
+        status: int = 0,
+        niter: int = 0,
+        n_rhs: int = 0,
+        wall_time: float = 0.0,
+        interpolant=None,
+    ):
+        """
+        :param s (ndarray):         Normalized mesh ``t / tf`` in [0, 1]
+        :param states (ndarray):    State/costate values on the mesh, shape (8, m)
+        :param tf (float):          Final time
+        :param alpha (float):       Control weight, so that the controls are ``p / (2 alpha)``
+        :param G (float):           Gravity
+        :param rates (ndarray):     d(states)/ds on the mesh, used to build the interpolant
+        :param status (int):        ``solve_bvp`` status (0 on success)
+        :param niter (int):         Number of ``solve_bvp`` iterations
+        :param n_rhs (int):         Number of right hand side evaluations
+        :param wall_time (float):   Seconds spent solving
+        :param interpolant:         Dense output in ``s`` (e.g. ``sol.sol``), built lazily if None
+        """
+        self.s = s
+        self.states = states
+        self.rates = rates
+        self.tf = float(tf)
+        self.alpha = alpha
+        self.G = G
+        self.status = int(status)
+        self.niter = int(niter)
+        self.n_rhs = int(n_rhs)
+        self.wall_time = float(wall_time)
+        self._interpolant = interpolant
+
+    @classmethod
+    def from_bvp(cls, sol, alpha, G, n_rhs=0, wall_time=0.0):
+        """Wrap a ``solve_bvp`` result without copying its arrays"""
+        return cls(
+            sol.x,
+            sol.y,
+            sol.p[0],
+            alpha,
+            G,
+            rates=sol.yp,
+            status=sol.status,
+            niter=sol.niter,
+            n_rhs=n_rhs,
+            wall_time=wall_time,
+            interpolant=sol.sol,
+        )
+
+    def to_arrays(self) -> Dict[str, np.ndarray]:
+        """Arrays for ``from_arrays`` (the interpolant is rebuilt, not stored)"""
+        arrays = {name: getattr(self, name) for name in STORED}
+        if arrays["rates"] is None:
+            del arrays["rates"]
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays: Dict[str, np.ndarray]) -> "Solution":
+        scalars = {
+            name: np.asarray(arrays[name])[()]
+            for name in ("tf", "alpha", "G", "status", "niter", "n_rhs", "wall_time")
+        }
+        return cls(arrays["s"], arrays["states"], rates=arrays.get("rates"), **scalars)
+
+    @property
+    def success(self) -> bool:
+        return self.status == 0
+
+    @property
+    def n_nodes(self) -> int:
+        return self.s.size
+
+    @property
+    def t(self) -> np.ndarray:
+        return self.s * self.tf
+
+    @property
+    def x(self) -> np.ndarray:
+        return self.states[0]
+
+    @property
+    def y(self) -> np.ndarray:
+        return self.states[1]
+
+    @property
+    def xp(self) -> np.ndarray:
+        return self.states[2]
+
+    @property
+    def yp(self) -> np.ndarray:
+        return self.states[3]
+
+    @property
+    def costates(self) -> np.ndarray:
+        return self.states[4:]
+
+    @property
+    def ux(self) -> np.ndarray:
+        return self.states[6] / (2 * self.alpha)
+
+    @property
+    def uy(self) -> np.ndarray:
+        return self.states[7] / (2 * self.alpha) - self.G
+
+    def __call__(self, t) -> np.ndarray:
+        """Evaluate the state/costate at times ``t`` (in ``[0, tf]``) from the dense output"""
+        if self._interpolant is None:
+            if self.rates is not None:
+                self._interpolant = CubicHermiteSpline(
+                    self.s, self.states, self.rates, axis=1
+                )
+            else:
+                self._interpolant = CubicHermiteSpline(
+                    self.s,
+                    self.states,
+                    np.gradient(self.states, self.s, axis=1),
+                    axis=1,
+                )
+        return self._interpolant(np.asarray(t) / self.tf)
+
+    def resample(self, t_steps: int) -> "Solution":
+        """Evaluate the dense output on a uniform mesh of ``t_steps`` points"""
+        s = np.linspace(0, 1, t_steps)
+        return Solution(
+            s,
+            self(s * self.tf),
+            self.tf,
+            self.alpha,
+            self.G,
+            status=self.status,
+            niter=self.niter,
+            n_rhs=self.n_rhs,
+            wall_time=self.wall_time,
+            interpolant=self._interpolant,
+        )
+
+    def __iter__(self):
+        return (getattr(self, name) for name in FIELDS)
+
+    def __len__(self) -> int:
+        return len(FIELDS)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return tuple(self)[index]
+        return getattr(self, FIELDS[index])
+
+    def __repr__(self) -> str:
+        return (
+            f"Solution(tf={self.tf:.6g}, status={self.status}, niter={self.niter}, "
+            f"n_nodes={self.n_nodes}, n_rhs={self.n_rhs}, wall_time={self.wall_time:.3g})"
+        )
@@ -0,0 +1,289 @@
+# Rescue of failed solves: with ``robust`` set, a solver result that fails
+# ``certify`` is replaced by the first certified solution of a portfolio of
+# alternative starts raced in worker processes, within the solver's
+# ``budget`` seconds (see ``solve_robust``)
+import inspect
+import multiprocessing
+import os
+import queue
+import time
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .continuation import _DEFAULTS, iter_continuation
+from .guess import initial_guess
+from .result import Solution
+from .solver import MODELS, _solve_system, _unpack
+
+# Arguments of the solvers that are not model parameters, in ``_attempt`` order
+_CALL = ("pos", "vx0", "t_steps", "tf_guess", "y0_guess", "jacobian", "guess")
+
+
+def certify(solution: Solution, bc, bc_tol: float = 1e-6) -> bool:
+    """Whether a solution can be trusted: converged, finite, ``tf > 0`` and the boundary conditions hold"""
+    if not solution.success or not solution.tf > 0:
+        return False
+    if not np.all(np.isfinite(solution.states)):
+        return False
+
+    residual = bc(
+        solution.states[:, 0], solution.states[:, -1], np.array([solution.tf])
+    )
+    return bool(np.max(np.abs(residual)) <= bc_tol)
+
+
+def default_portfolio(
+    tf_guess: float = 20.0, y0_guess: float = 1.0, t_steps: int = 200
+) -> List[dict]:
+    """Alternative starts tried after a failed solve.
+
+    Each entry overrides the ``guess`` method, ``tf_guess``, ``y0_guess`` or
+    ``t_steps`` of the original call, or asks for a continuation start
+    (``"continuation": True``), which seeds the unconstrained analytic solution
+    and walks the penalty weights up to their requested values.
+    """
+    return [
+        {"guess": "ballistic"},
+        {"guess": "straight"},
+        {"guess": "straight", "tf_guess": tf_guess / 4},
+        {"guess": "straight", "tf_guess": tf_guess / 2},
+        {"guess": "straight", "tf_guess": 2 * tf_guess},
+        {"guess": "straight", "y0_guess": 0.0},
+        {"guess": "straight", "y0_guess": -y0_guess},
+        {"guess": "straight", "y0_guess": 5 * y0_guess},
+        {"continuation": True},
+        {"t_steps": 4 * t_steps},
+    ]
+
+
+def _continuation_path(model, params):
+    """Path from the penalty-free problem to the requested one"""
+    start = {"nu": 0.0}
+    target = {"nu": params.get("nu", 0.0)}
+    if model == "final_angle" and params.get("final_angle_on", True):
+        # A large rho makes the final-angle term negligible
+        rho = params.get("rho", 0.01)
+        start["rho"] = max(1.0, 10 * rho)
+        target["rho"] = rho
+    return [start, target]
+
+
+def _attempt(
+    model,
+    pos,
+    vx0,
+    t_steps,
+    tf_guess,
+    y0_guess,
+    jacobian,
+    guess,
+    params,
+    bc_tol,
+    strategy,
+):
+    """Run one strategy of the portfolio.
+
+    Returns: (certified, solution arrays), or (False, None) if the attempt raised
+    """
+    strategy = dict(strategy)
+    use_continuation = strategy.pop("continuation", False)
+    t_steps = strategy.pop("t_steps", t_steps)
+    tf_guess = strategy.pop("tf_guess", tf_guess)
+    y0_guess = strategy.pop("y0_guess", y0_guess)
+    guess = strategy.pop("guess", guess)
+    params = {**params, **strategy}
+
+    weights = {**_DEFAULTS, **params}
+    system = MODELS[model](pos, vx0, **params)
+
+    try:
+        if use_continuation:
+            path = _continuation_path(model, params)
+            fixed = {k: v for k, v in params.items() if k not in path[0]}
+            for _, sol in iter_continuation(
+                pos,
+                vx0,
+                path,
+                model,
+                t_steps=t_steps,
+                tf_guess=tf_guess,
+                y0_guess=y0_guess,
+                jacobian=jacobian,
+                **fixed,
+            ):
+                pass
+        else:
+            start = initial_guess(
+                pos, vx0, t_steps, tf_guess, y0_guess, guess, model, **params
+            )
+            sol = _solve_system(
+                system, pos, vx0, t_steps, tf_guess, y0_guess, jacobian, guess=start
+            )
+    except Exception:
+        return False, None
+
+    solution = _unpack(sol, weights["alpha"], weights["G"])
+    return certify(solution, system[1], bc_tol), solution.to_arrays()
+
+
+def _worker(results, index, args):
+    results.put((index, _attempt(*args)))
+
+
+def _run_portfolio(args, strategies, budget, processes):
+    """Race the strategies in worker processes; the first certified result wins.
+
+    At most ``processes`` attempts run at once.  Attempts still running when a
+    winner is found or the budget runs out are terminated.
+
+    Returns: (index, arrays) of the winner or None, and the outcome of every strategy
+    """
+    deadline = time.monotonic() + budget
+    outcomes = ["not started"] * len(strategies)
+
+    context = multiprocessing.get_context()
+    results = context.Queue()
+    pending = list(range(len(strategies)))
+    running = {}
+    winner = None
+
+    try:
+        while (pending or running) and winner is None:
+            while pending and len(running) < processes:
+                i = pending.pop(0)
+                running[i] = context.Process(
+                    target=_worker,
+                    args=(results, i, (*args, strategies[i])),
+                    daemon=True,
+                )
+                running[i].start()
+                outcomes[i] = "running"
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                i, (certified, arrays) = results.get(timeout=remaining)
+            except queue.Empty:
+                break
+
+            running.pop(i).join()
+            outcomes[i] = "certified" if certified else "failed"
+            if certified:
+                winner = (i, arrays)
+    finally:
+        # Cancel every attempt still in flight
+        for i, process in running.items():
+            process.terminate()
+            process.join()
+            if outcomes[i] == "running":
+                outcomes[i] = "cancelled"
+        results.close()
+        results.join_thread()
+
+    return winner, outcomes
+
+
+def rescue(
+    model: str,
+    solution: Solution,
+    call: dict,
+    budget: float = 60.0,
+    processes: Optional[int] = None,
+    strategies: Optional[List[dict]] = None,
+    bc_tol: float = 1e-6,
+) -> Solution:
+    """Return ``solution`` if it is certified, otherwise race a portfolio of alternative starts.
+
+    :param model:       ``"baseline"`` or ``"final_angle"``
+    :param solution:    Result of the plain solve
+    :param call:        Keyword arguments of that solve (``pos``, ``vx0``, ``t_steps``, ...)
+    :param budget:      Wall-clock seconds left for the portfolio
+    :raises RuntimeError: if no certified solution is found within the budget
+    """
+    params = dict(call)
+    for name in ("analytic", "robust", "budget", "cache"):
+        params.pop(name, None)
+    args = tuple(params.pop(name) for name in _CALL)
+    pos, vx0, t_steps, tf_guess, y0_guess, _, _ = args
+
+    if certify(solution, MODELS[model](pos, vx0, **params)[1], bc_tol):
+        return solution
+
+    if strategies is None:
+        strategies = default_portfolio(tf_guess, y0_guess, t_steps)
+    winner, outcomes = _run_portfolio(
+        (model, *args, params, bc_tol),
+        strategies,
+        budget,
+        processes or os.cpu_count() or 1,
+    )
+
+    if winner is None:
+        report = ", ".join(
+            f"{strategy}: {outcome}" for strategy, outcome in zip(strategies, outcomes)
+        )
+        raise RuntimeError(
+            f"No certified {model} solution for pos={pos}, vx0={vx0} (plain solve: "
+            f"status {solution.status}, tf={solution.tf:.6g}; {report})"
+        )
+
+    return Solution.from_arrays(winner[1])
+
+
+def solve_robust(
+    pos: Tuple[float, float],
+    vx0: float,
+    model: str = "baseline",
+    budget: float = 60.0,
+    processes: Optional[int] = None,
+    strategies: Optional[List[dict]] = None,
+    bc_tol: float = 1e-6,
+    **kwargs,
+) -> Solution:
+    """Solve a lunar lander BVP, racing alternative starts if the plain solve fails.
+
+    The plain solve (``solve_baseline`` or ``solve_with_final_angle`` with
+    ``kwargs``) runs first and is checked with ``certify``.  If it fails, the
+    ``strategies`` (by default ``default_portfolio``) are launched concurrently
+    in worker processes; the first certified solution wins and the remaining
+    workers are terminated.  The whole call, including the plain solve, is
+    limited to ``budget`` seconds of wall-clock time.
+
+    :param model:       ``"baseline"`` or ``"final_angle"``
+    :param budget:      Wall-clock budget for the whole call, in seconds
+    :param processes:   Number of concurrent attempts (None for one per CPU)
+    :param strategies:  Overrides for each attempt, see ``default_portfolio``
+    :param bc_tol:      Largest boundary condition residual of a certified solution
+    :param kwargs:      Solver keyword arguments (``t_steps``, ``alpha``, ``nu``, ...)
+    :raises RuntimeError: if no certified solution is found within the budget
+
+    Returns: ``result.Solution``
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown model {model!r}, expected one of {list(MODELS)}")
+    from . import solver
+
+    plain = {
+        "baseline": solver.solve_baseline,
+        "final_angle": solver.solve_with_final_angle,
+    }[model]
+    start = time.monotonic()
+    solution = plain(pos, vx0, **kwargs)
+
+    call = {
+        name: parameter.default
+        for name, parameter in inspect.signature(plain).parameters.items()
+        if parameter.default is not inspect.Parameter.empty
+    }
+    call.update(kwargs, pos=pos, vx0=vx0)
+    return rescue(
+        model,
+        solution,
+        call,
+        budget - (time.monotonic() - start),
+        processes,
+        strategies,
+        bc_tol,
+    )
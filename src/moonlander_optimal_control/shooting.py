@@ -0,0 +1,235 @@
+import time
+from concurrent.futures import Executor
+from typing import Optional, Tuple
+
+import numpy as np
+from scipy.integrate import solve_ivp
+from scipy.sparse import lil_matrix
+from scipy.sparse.linalg import spsolve
+
+from .guess import initial_guess
+from .result import Solution
+from .solver import MODELS
+
+N_VARS = 8
+
+
+def _integrate_segment(model, pos, vx0, params, span, z, tf, s_eval, rtol, atol):
+    """Integrate one segment together with its sensitivities to the start state and ``tf``.
+
+    The system is rebuilt from the model name so the call can run in a process
+    pool (the ``ode`` closures cannot be pickled).
+
+    Returns: end state, d(end)/d(start) (8x8), d(end)/d(tf) (8,) and the states at
+             ``s_eval`` (None if not requested), or None if the integration failed
+    """
+    ode, _, fun_jac, _ = MODELS[model](pos, vx0, **params)
+    p = np.array([tf])
+
+    def rhs(s, w):
+        y = w[:N_VARS, None]
+        df_dy, df_dp = fun_jac(s, y, p)
+        jac = df_dy[:, :, 0]
+        stm = w[N_VARS : N_VARS + N_VARS**2].reshape(N_VARS, N_VARS)
+        dtf = w[N_VARS + N_VARS**2 :]
+        return np.concatenate(
+            [ode(s, y, p)[:, 0], (jac @ stm).ravel(), jac @ dtf + df_dp[:, 0, 0]]
+        )
+
+    w0 = np.concatenate([z, np.eye(N_VARS).ravel(), np.zeros(N_VARS)])
+    sol = solve_ivp(
+        rhs, span, w0, rtol=rtol, atol=atol, dense_output=s_eval is not None
+    )
+    if sol.status < 0 or not np.all(np.isfinite(sol.y[:, -1])):
+        return None
+
+    w = sol.y[:, -1]
+    return (
+        w[:N_VARS],
+        w[N_VARS : N_VARS + N_VARS**2].reshape(N_VARS, N_VARS),
+        w[N_VARS + N_VARS**2 :],
+        None if s_eval is None else sol.sol(s_eval)[:N_VARS],
+    )
+
+
+def _shoot(model, pos, vx0, params, knots, starts, tf, executor, rtol, atol, s_eval):
+    """Integrate every segment (in ``executor`` if given).
+
+    Returns: list of ``_integrate_segment`` results, or None if any segment failed
+    """
+    n_segments = len(starts)
+    if s_eval is None:
+        pieces = [None] * n_segments
+    else:
+        # Each output point belongs to the segment containing it
+        owner = np.clip(
+            np.searchsorted(knots, s_eval, side="right") - 1, 0, n_segments - 1
+        )
+        pieces = [s_eval[owner == k] for k in range(n_segments)]
+
+    args = [
+        (
+            model,
+            pos,
+            vx0,
+            params,
+            (knots[k], knots[k + 1]),
+            starts[k],
+            tf,
+            pieces[k],
+            rtol,
+            atol,
+        )
+        for k in range(n_segments)
+    ]
+    if executor is None:
+        results = [_integrate_segment(*arg) for arg in args]
+    else:
+        results = list(executor.map(_integrate_segment, *zip(*args)))
+
+    return None if any(result is None for result in results) else results
+
+
+def _residual(bc, starts, tf, results):
+    """Continuity defects between segments followed by the boundary conditions"""
+    ends = np.array([result[0] for result in results])
+    continuity = (ends[:-1] - starts[1:]).ravel()
+    return np.concatenate([continuity, bc(starts[0], ends[-1], np.array([tf]))])
+
+
+def _jacobian(bc_jac, starts, tf, results):
+    """Sparse (block bidiagonal) Jacobian of ``_residual`` w.r.t. the segment starts and ``tf``"""
+    n_segments = len(starts)
+    size = N_VARS * n_segments + 1
+    jac = lil_matrix((size, size))
+    identity = np.eye(N_VARS)
+
+    for k, (_, stm, dtf, _) in enumerate(results[:-1]):
+        rows = slice(N_VARS * k, N_VARS * (k + 1))
+        jac[rows, N_VARS * k : N_VARS * (k + 1)] = stm
+        jac[rows, N_VARS * (k + 1) : N_VARS * (k + 2)] = -identity
+        jac[rows, size - 1] = dtf[:, None]
+
+    end, stm, dtf, _ = results[-1]
+    dbc_dya, dbc_dyb, dbc_dp = bc_jac(starts[0], end, np.array([tf]))
+    rows = slice(N_VARS * (n_segments - 1), size)
+    jac[rows, :N_VARS] = dbc_dya
+    jac[rows, N_VARS * (n_segments - 1) : size - 1] += dbc_dyb @ stm
+    jac[rows, size - 1] = (dbc_dyb @ dtf)[:, None] + dbc_dp
+
+    return jac.tocsc()
+
+
+def solve_shooting(
+    pos: Tuple[float, float],
+    vx0: float,
+    t_steps: int = 200,
+    tf_guess: float = 20.0,
+    y0_guess: float = 1.0,
+    alpha: float = 10.0,
+    beta: float = 25.0,
+    gamma: float = 3.0,
+    nu: float = 0.0,
+    G: float = 2.0,
+    model: str = "baseline",
+    segments: int = 8,
+    executor: Optional[Executor] = None,
+    guess="auto",
+    tol: float = 1e-8,
+    max_iter: int = 50,
+    rtol: float = 1e-10,
+    atol: float = 1e-10,
+    **model_params,
+):
+    """Solve a lunar lander BVP by multiple shooting.
+
+    ``[0, 1]`` is split into ``segments`` pieces that are integrated
+    independently with ``solve_ivp`` (together with their sensitivities), and
+    the continuity and boundary conditions are solved for the segment start
+    states and ``tf`` with a damped Newton method on the sparse block
+    bidiagonal Jacobian.  Pass a ``concurrent.futures`` executor to integrate
+    the segments in a thread or process pool.
+
+    :param model:           ``"baseline"`` or ``"final_angle"`` (extra model arguments
+                            such as ``rho`` go in ``model_params``)
+    :param guess:           ``(mesh, y, tf)`` warm start, or a ``guess.initial_guess``
+                            method; shooting is far more sensitive to the start
+                            guess than collocation, since a poor costate guess
+                            makes the segment integrations diverge
+    :param tol:             Bound on the largest continuity/boundary residual
+    :raises RuntimeError: if the segments cannot be integrated from the guess
+
+    Returns: Solution (unpacks as t, x, y, xp, yp, ux, uy, tf) with status 0 if
+    the residual met ``tol``, 1 if ``max_iter`` was reached and 2 if the line
+    search could not reduce the residual
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown model {model!r}, expected one of {list(MODELS)}")
+    params = dict(alpha=alpha, beta=beta, gamma=gamma, nu=nu, G=G, **model_params)
+    ode, bc, _, bc_jac = MODELS[model](pos, vx0, **params)
+    start_time = time.perf_counter()
+
+    if guess is None or isinstance(guess, str):
+        guess = initial_guess(
+            pos, vx0, t_steps, tf_guess, y0_guess, guess or "auto", model, **params
+        )
+    mesh, y_guess, tf = guess
+
+    knots = np.linspace(0, 1, segments + 1)
+    starts = np.array([np.interp(knots[:-1], mesh, row) for row in y_guess]).T
+
+    def shoot(starts, tf, s_eval=None):
+        return _shoot(
+            model, pos, vx0, params, knots, starts, tf, executor, rtol, atol, s_eval
+        )
+
+    results = shoot(starts, tf)
+    if results is None:
+        raise RuntimeError("Integration failed from the initial guess")
+    res = _residual(bc, starts, tf, results)
+
+    status, niter = 1, 0
+    for niter in range(max_iter + 1):
+        if np.max(np.abs(res)) < tol:
+            status = 0
+            break
+        if niter == max_iter:
+            break
+
+        step = spsolve(_jacobian(bc_jac, starts, tf, results), -res)
+
+        # Backtrack until the residual decreases and every segment integrates
+        damping = 1.0
+        while damping > 1e-4:
+            trial_starts = starts + damping * step[:-1].reshape(segments, N_VARS)
+            trial_tf = tf + damping * step[-1]
+            trial = shoot(trial_starts, trial_tf)
+            if trial is not None:
+                trial_res = _residual(bc, trial_starts, trial_tf, trial)
+                if np.linalg.norm(trial_res) < np.linalg.norm(res):
+                    break
+            damping /= 2
+        else:
+            status = 2
+            break
+
+        starts, tf, results, res = trial_starts, trial_tf, trial, trial_res
+
+    s = np.linspace(0, 1, t_steps)
+    results = shoot(starts, tf, s)
+    if results is None:
+        raise RuntimeError("Integration failed from the final iterate")
+    states = np.concatenate([result[3] for result in results], axis=1)
+    rates = np.array(ode(s, states, np.array([tf])))
+
+    return Solution(
+        s,
+        states,
+        tf,
+        alpha,
+        G,
+        rates=rates,
+        status=status,
+        niter=niter,
+        wall_time=time.perf_counter() - start_time,
+    )
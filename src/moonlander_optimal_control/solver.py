@@ -1,41 +1,53 @@
+import time
 from typing import Tuple
 
 import numpy as np
-from scipy.integrate import solve_bvp
 
+from .analytic import closed_form_trajectory, find_final_time
+from .cache import cached_call
+from .guess import initial_guess, straight_guess
+from . import instrument
+from .result import Solution
 
-def solve_baseline(
+
+def _fill_linear_rhs(out, y, tf, k, G):
+    """Write ``tf`` times the costate-driven rows of both models into ``out`` (rows 4, 5 zeroed)"""
+    np.multiply(y[2], tf, out=out[0])
+    np.multiply(y[3], tf, out=out[1])
+    np.multiply(y[6], tf * k, out=out[2])
+    np.multiply(y[7], tf * k, out=out[3])
+    out[3] -= tf * G
+    out[4] = 0
+    out[5] = 0
+    np.multiply(y[4], -tf, out=out[6])
+    np.multiply(y[5], -tf, out=out[7])
+
+
+def _baseline_system(
     pos: Tuple[float, float],
     vx0: float,
-    t_steps: int = 200,
-    tf_guess: float = 20.0,
-    y0_guess: float = 1.0,
     alpha: float = 10.0,
     beta: float = 25.0,
     gamma: float = 3.0,
     nu: float = 0.0,
     G: float = 2.0,
 ):
-    """Solve the baseline lunar lander BVP.
+    """Build the baseline state/costate ODE, boundary conditions and their Jacobians.
 
-    Returns: t, x, y, xp, yp, ux, uy, tf
+    Returns: ode, bc, fun_jac, bc_jac (in the form expected by ``solve_bvp``)
     """
     x_init, y_init = pos
+    k = 1 / (2 * alpha)
 
     def ode(t, y, p):
         tf = p[0]
-        return tf * np.array(
-            [
-                y[2],
-                y[3],
-                y[6] / (2 * alpha),
-                y[7] / (2 * alpha) - G,
-                np.zeros_like(y[0]),
-                nu * (1 - np.heaviside(y[1], 0)),
-                -y[4],
-                -y[5],
-            ]
-        )
+        out = np.empty_like(y)
+        _fill_linear_rhs(out, y, tf, k, G)
+        if nu:
+            # nu * (1 - heaviside(y, 0)) is nu wherever y <= 0
+            np.less_equal(y[1], 0, out=out[5])
+            out[5] *= tf * nu
+        return out
 
     def bc(ya, yb, p):
         uxf = yb[6] / (2 * alpha)
@@ -60,35 +72,21 @@ def solve_baseline(
             ]
         )
 
-    tf_0 = tf_guess
-    t_eval = np.linspace(0, 1, t_steps)
-    y0 = y0_guess * np.ones((8, t_steps))
-    y0[0] = np.ones((1, t_steps))
-
-    y0[0] *= x_init
-    y0[1] = np.linspace(y_init, 0, t_steps)
-    y0[2] = np.linspace(vx0, 0, t_steps)
-
-    sol = solve_bvp(ode, bc, t_eval, y0, p=np.array([tf_0]), max_nodes=30000)
-    tf = sol.p[0]
+    def fun_jac(t, y, p):
+        # The ground penalty is piecewise constant in y, so it has no y derivative
+        df_dy = np.zeros((8, 8, y.shape[1]))
+        df_dy[:, :, :] = p[0] * _linear_jacobian(alpha)[:, :, None]
+        return df_dy, ode(t, y, [1.0])[:, None, :]
 
-    x = sol.y[0]
-    y = sol.y[1]
-    xp = sol.y[2]
-    yp = sol.y[3]
-    ux = sol.y[6] / (2 * alpha)
-    uy = sol.y[7] / (2 * alpha)
-    t_vals = sol.x * tf
+    def bc_jac(ya, yb, p):
+        return _boundary_jacobian(yb, alpha, beta, nu, G)
 
-    return t_vals, x, y, xp, yp, ux, uy - G, tf
+    return ode, bc, fun_jac, bc_jac
 
 
-def solve_with_final_angle(
+def _final_angle_system(
     pos: Tuple[float, float],
     vx0: float,
-    t_steps: int = 200,
-    tf_guess: float = 20.0,
-    y0_guess: float = 1.0,
     alpha: float = 10.0,
     beta: float = 25.0,
     gamma: float = 3.0,
@@ -97,29 +95,32 @@ def solve_with_final_angle(
     rho: float = 0.01,
     final_angle_on: bool = True,
 ):
-    """Solve the lunar lander BVP with an extra final-angle penalty term.
+    """Build the final-angle state/costate ODE, boundary conditions and their Jacobians.
 
-    Returns: t, x, y, xp, yp, ux, uy, tf
+    Returns: ode, bc, fun_jac, bc_jac (in the form expected by ``solve_bvp``)
     """
     x_init, y_init = pos
+    k = 1 / (2 * alpha)
 
     def ode(t, y, p):
         tf = p[0]
-        return tf * np.array(
-            [
-                y[2],
-                y[3],
-                y[6] / (2 * alpha),
-                y[7] / (2 * alpha) - G,
-                np.zeros_like(y[0]),
-                nu * (1 - np.heaviside(y[1], 0))
-                + (
-                    final_angle_on * 2 * ((y[6] / (2 * alpha)) ** 2) / (y[1] + rho) ** 3
-                ),
-                -y[4],
-                -y[5],
-            ]
-        )
+        out = np.empty_like(y)
+        _fill_linear_rhs(out, y, tf, k, G)
+        if nu:
+            np.less_equal(y[1], 0, out=out[5])
+            out[5] *= tf * nu
+        if final_angle_on:
+            # final_angle_on 2 (k y6)^2 / (y1 + rho)^3, using row 4 (zero in this
+            # model) as scratch
+            scratch = out[4]
+            np.add(y[1], rho, out=scratch)
+            np.power(scratch, -3, out=scratch)
+            scratch *= y[6]
+            scratch *= y[6]
+            scratch *= final_angle_on * 2 * k**2 * tf
+            out[5] += scratch
+            scratch[...] = 0
+        return out
 
     def bc(ya, yb, p):
         uxf = yb[6] / (2 * alpha)
@@ -145,24 +146,392 @@ def solve_with_final_angle(
             ]
         )
 
-    tf_0 = tf_guess
-    t_eval = np.linspace(0, 1, t_steps)
-    y0 = y0_guess * np.ones((8, t_steps))
-    y0[0] = np.ones((1, t_steps))
+    def fun_jac(t, y, p):
+        tf = p[0]
+        df_dy = np.zeros((8, 8, y.shape[1]))
+        df_dy[:, :, :] = tf * _linear_jacobian(alpha)[:, :, None]
+
+        # d/dy of final_angle_on * 2 * (y6 / (2 alpha))^2 / (y1 + rho)^3
+        if final_angle_on:
+            inv = 1 / (y[1] + rho)
+            scale = final_angle_on * tf / alpha**2
+            df_dy[5, 1] = scale * -1.5 * y[6] ** 2 * inv**4
+            df_dy[5, 6] = scale * y[6] * inv**3
+
+        return df_dy, ode(t, y, [1.0])[:, None, :]
+
+    def bc_jac(ya, yb, p):
+        dbc_dya, dbc_dyb, dbc_dp = _boundary_jacobian(yb, alpha, beta, nu, G)
+
+        # d/dy of -final_angle_on * (y6 / (2 alpha (y1 + rho)))^2
+        if final_angle_on:
+            inv = 1 / (yb[1] + rho)
+            scale = final_angle_on / (2 * alpha**2)
+            dbc_dyb[8, 1] += scale * yb[6] ** 2 * inv**3
+            dbc_dyb[8, 6] -= scale * yb[6] * inv**2
 
-    y0[0] *= x_init
-    y0[1] = np.linspace(y_init, 0, t_steps)
-    y0[2] = np.linspace(vx0, 0, t_steps)
+        return dbc_dya, dbc_dyb, dbc_dp
 
-    sol = solve_bvp(ode, bc, t_eval, y0, p=np.array([tf_0]), max_nodes=30000)
-    tf = sol.p[0]
+    return ode, bc, fun_jac, bc_jac
 
-    x = sol.y[0]
-    y = sol.y[1]
-    xp = sol.y[2]
-    yp = sol.y[3]
-    ux = sol.y[6] / (2 * alpha)
-    uy = sol.y[7] / (2 * alpha)
-    t_vals = sol.x * tf
 
-    return t_vals, x, y, xp, yp, ux, uy - G, tf
+# System builders of the collocation models, by model name
+MODELS = {
+    "baseline": _baseline_system,
+    "final_angle": _final_angle_system,
+}
+
+
+def _linear_jacobian(alpha):
+    """Constant part of d(ode)/dy shared by both models (per unit of tf)"""
+    jac = np.zeros((8, 8))
+    jac[0, 2] = 1
+    jac[1, 3] = 1
+    jac[2, 6] = 1 / (2 * alpha)
+    jac[3, 7] = 1 / (2 * alpha)
+    jac[6, 4] = -1
+    jac[7, 5] = -1
+    return jac
+
+
+def _boundary_jacobian(yb, alpha, beta, nu, G):
+    """Boundary condition Jacobians shared by both models.
+
+    Returns: dbc_dya, dbc_dyb, dbc_dp
+    """
+    dbc_dya = np.zeros((9, 8))
+    dbc_dya[0, 0] = 1
+    dbc_dya[1, 1] = 1
+    dbc_dya[2, 2] = 1
+    dbc_dya[3, 3] = 1
+
+    dbc_dyb = np.zeros((9, 8))
+    dbc_dyb[4, 1] = 1
+    dbc_dyb[5, 4] = 1
+    dbc_dyb[6, 2] = -2 * beta
+    dbc_dyb[6, 6] = 1
+    dbc_dyb[7, 3] = -2 * beta
+    dbc_dyb[7, 7] = 1
+
+    # Final Hamiltonian
+    dbc_dyb[8, 1] = nu * (yb[1] < 0)
+    dbc_dyb[8, 2] = yb[4]
+    dbc_dyb[8, 3] = yb[5]
+    dbc_dyb[8, 4] = yb[2]
+    dbc_dyb[8, 5] = yb[3]
+    dbc_dyb[8, 6] = yb[6] / (2 * alpha)
+    dbc_dyb[8, 7] = yb[7] / (2 * alpha) - G
+
+    return dbc_dya, dbc_dyb, np.zeros((9, 1))
+
+
+def _solve_system(
+    system,
+    pos,
+    vx0,
+    t_steps,
+    tf_guess,
+    y0_guess,
+    jacobian=True,
+    guess=None,
+    model=None,
+    params=None,
+):
+    """Run ``solve_bvp`` on a system built by ``_baseline_system``/``_final_angle_system``
+
+    ``guess`` is an optional ``(mesh, y, tf)`` warm start (e.g. a previous
+    solution's ``sol.x``, ``sol.y`` and ``sol.p[0]``) replacing the default
+    straight-line guess.  The result also records the number of right hand
+    side evaluations (``n_rhs``) and the time spent (``wall_time``).
+    ``model`` and ``params`` label the trace record emitted when
+    instrumentation is enabled (see ``instrument.enable_instrumentation``).
+    """
+    ode, bc, fun_jac, bc_jac = system
+    if guess is None:
+        guess = straight_guess(pos, vx0, t_steps, tf_guess, y0_guess)
+    t_eval, y0, tf_guess = guess
+
+    n_rhs = 0
+
+    def counted_ode(t, y, p):
+        nonlocal n_rhs
+        n_rhs += 1
+        return ode(t, y, p)
+
+    start = time.perf_counter()
+    sol = instrument.solve_bvp(
+        counted_ode,
+        bc,
+        t_eval,
+        y0,
+        p=np.array([tf_guess]),
+        max_nodes=30000,
+        fun_jac=fun_jac if jacobian else None,
+        bc_jac=bc_jac if jacobian else None,
+        model=model,
+        params=params,
+    )
+    sol.wall_time = time.perf_counter() - start
+    sol.n_rhs = n_rhs
+
+    return sol
+
+
+def _unpack(sol, alpha, G):
+    """Wrap a ``solve_bvp`` result as a ``Solution`` (unpacks as t, x, y, xp, yp, ux, uy, tf)"""
+    return Solution.from_bvp(
+        sol, alpha, G, sol.get("n_rhs", 0), sol.get("wall_time", 0.0)
+    )
+
+
+def solve_baseline(
+    pos: Tuple[float, float],
+    vx0: float,
+    t_steps: int = 200,
+    tf_guess: float = 20.0,
+    y0_guess: float = 1.0,
+    alpha: float = 10.0,
+    beta: float = 25.0,
+    gamma: float = 3.0,
+    nu: float = 0.0,
+    G: float = 2.0,
+    analytic: bool = True,
+    jacobian: bool = True,
+    guess: str = "auto",
+    robust: bool = False,
+    budget: float = 60.0,
+    cache=None,
+):
+    """Solve the baseline lunar lander BVP.
+
+    With ``nu == 0`` and ``analytic`` set the problem is solved in closed form,
+    falling back to ``solve_bvp`` (given exact Jacobians if ``jacobian`` is
+    set).  ``guess`` selects the starting guess (see ``guess``), ``robust``
+    rescues uncertified results within ``budget`` seconds (see ``robust``) and
+    ``cache`` memoizes results (see ``cache``).
+
+    Returns: ``result.Solution`` (unpacks as t, x, y, xp, yp, ux, uy, tf)
+    """
+    params = dict(
+        pos=pos,
+        vx0=vx0,
+        t_steps=t_steps,
+        tf_guess=tf_guess,
+        y0_guess=y0_guess,
+        alpha=alpha,
+        beta=beta,
+        gamma=gamma,
+        nu=nu,
+        G=G,
+        analytic=analytic,
+        jacobian=jacobian,
+        guess=guess,
+    )
+    key, solve = params, lambda: _solve_baseline(**params, cache=cache)
+    if robust:
+        key, solve = {**params, "robust": True}, _robustly(
+            "baseline", solve, params, budget
+        )
+    return cached_call("baseline", key, solve, cache, result_type=Solution)
+
+
+def _robustly(model, solve, params, budget):
+    """Wrap ``solve`` so that an uncertified result is rescued by ``robust.rescue``"""
+
+    def run():
+        from .robust import rescue
+
+        start = time.monotonic()
+        solution = solve()
+        return rescue(model, solution, params, budget - (time.monotonic() - start))
+
+    return run
+
+
+def _solve_baseline(
+    pos,
+    vx0,
+    t_steps,
+    tf_guess,
+    y0_guess,
+    alpha,
+    beta,
+    gamma,
+    nu,
+    G,
+    analytic,
+    jacobian,
+    guess="auto",
+    cache=None,
+):
+    system = _baseline_system(pos, vx0, alpha, beta, gamma, nu, G)
+    problem = dict(pos=pos, vx0=vx0, alpha=alpha, beta=beta, gamma=gamma, nu=nu, G=G)
+
+    if analytic and nu == 0:
+        start = time.perf_counter()
+        tf = find_final_time(pos, vx0, tf_guess, alpha, beta, gamma, G)
+        if tf is not None:
+            s, y = closed_form_trajectory(pos, vx0, tf, t_steps, alpha, beta, G)
+            rates = np.array(system[0](s, y, [tf]))
+            wall_time = time.perf_counter() - start
+            if instrument.enabled():
+                instrument.emit(
+                    {
+                        "model": "baseline",
+                        "solver": "closed_form",
+                        "params": problem,
+                        "status": 0,
+                        "success": True,
+                        "tf": tf,
+                        "n_rhs": 1,
+                        "wall_time": wall_time,
+                        "n_nodes": t_steps,
+                    }
+                )
+            return Solution(
+                s, y, tf, alpha, G, rates=rates, n_rhs=1, wall_time=wall_time
+            )
+
+    guess = initial_guess(
+        pos,
+        vx0,
+        t_steps,
+        tf_guess,
+        y0_guess,
+        guess,
+        "baseline",
+        cache,
+        alpha,
+        beta,
+        gamma,
+        G,
+        nu=nu,
+    )
+    sol = _solve_system(
+        system,
+        pos,
+        vx0,
+        t_steps,
+        tf_guess,
+        y0_guess,
+        jacobian,
+        guess=guess,
+        model="baseline",
+        params=problem,
+    )
+
+    return _unpack(sol, alpha, G)
+
+
+def solve_with_final_angle(
+    pos: Tuple[float, float],
+    vx0: float,
+    t_steps: int = 200,
+    tf_guess: float = 20.0,
+    y0_guess: float = 1.0,
+    alpha: float = 10.0,
+    beta: float = 25.0,
+    gamma: float = 3.0,
+    nu: float = 0.0,
+    G: float = 2.0,
+    rho: float = 0.01,
+    final_angle_on: bool = True,
+    jacobian: bool = True,
+    guess: str = "auto",
+    robust: bool = False,
+    budget: float = 60.0,
+    cache=None,
+):
+    """Solve the lunar lander BVP with an extra final-angle penalty term.
+
+    ``jacobian``, ``guess``, ``robust``, ``budget`` and ``cache`` are as for
+    ``solve_baseline``.
+
+    Returns: ``result.Solution`` (unpacks as t, x, y, xp, yp, ux, uy, tf)
+    """
+    params = dict(
+        pos=pos,
+        vx0=vx0,
+        t_steps=t_steps,
+        tf_guess=tf_guess,
+        y0_guess=y0_guess,
+        alpha=alpha,
+        beta=beta,
+        gamma=gamma,
+        nu=nu,
+        G=G,
+        rho=rho,
+        final_angle_on=final_angle_on,
+        jacobian=jacobian,
+        guess=guess,
+    )
+    key, solve = params, lambda: _solve_with_final_angle(**params, cache=cache)
+    if robust:
+        key, solve = {**params, "robust": True}, _robustly(
+            "final_angle", solve, params, budget
+        )
+    return cached_call("final_angle", key, solve, cache, result_type=Solution)
+
+
+def _solve_with_final_angle(
+    pos,
+    vx0,
+    t_steps,
+    tf_guess,
+    y0_guess,
+    alpha,
+    beta,
+    gamma,
+    nu,
+    G,
+    rho,
+    final_angle_on,
+    jacobian,
+    guess="auto",
+    cache=None,
+):
+    system = _final_angle_system(
+        pos, vx0, alpha, beta, gamma, nu, G, rho, final_angle_on
+    )
+    guess = initial_guess(
+        pos,
+        vx0,
+        t_steps,
+        tf_guess,
+        y0_guess,
+        guess,
+        "final_angle",
+        cache,
+        alpha,
+        beta,
+        gamma,
+        G,
+        nu=nu,
+        rho=rho,
+        final_angle_on=final_angle_on,
+    )
+    problem = dict(
+        pos=pos,
+        vx0=vx0,
+        alpha=alpha,
+        beta=beta,
+        gamma=gamma,
+        nu=nu,
+        G=G,
+        rho=rho,
+        final_angle_on=final_angle_on,
+    )
+    sol = _solve_system(
+        system,
+        pos,
+        vx0,
+        t_steps,
+        tf_guess,
+        y0_guess,
+        jacobian,
+        guess=guess,
+        model="final_angle",
+        params=problem,
+    )
+
+    return _unpack(sol, alpha, G)
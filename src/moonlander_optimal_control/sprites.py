@@ -0,0 +1,88 @@
+# Pre-rotated sprites for the landing animation
+from functools import lru_cache
+from importlib import resources
+
+import numpy as np
+
+
+@lru_cache(maxsize=None)
+def load_sprite(name: str = "lander.png") -> np.ndarray:
+    """RGBA image ``name`` from the package data, read once (a read-only float array)"""
+    import matplotlib.image as mpimg
+
+    with resources.files(__package__).joinpath("data", name).open("rb") as f:
+        image = mpimg.imread(f, format="png")
+    image.flags.writeable = False
+    return image
+
+
+def tilt_angle(vx, vy):
+    """Rotation in degrees aligning the lander with its velocity, ``-arctan(vx / vy)``
+
+    At rest (``vx = vy = 0``) the lander is upright.
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        angle = -np.degrees(np.arctan(np.divide(vx, vy)))
+    return np.where(np.isnan(angle), 0.0, angle)
+
+
+class SpriteCache:
+    """
+    Rotations of a sprite, rendered once per angle bin and looked up by nearest angle
+
+    Angles are rounded to the nearest multiple of ``resolution`` degrees, and
+    each bin is rotated (``scipy.ndimage.rotate`` with spline ``order``, then
+    clipped to [0, 1]) the first time it is used, or up front with
+    ``prerender``.  Frames then only index the cache, so the cost of an
+    animation grows with the number of distinct angles instead of frames.
+    """
+
+    def __init__(self, image=None, resolution: float = 1.0, order: int = 3):
+        """
+        :param image:       RGBA image (defaults to the lander of the package data)
+        :param resolution:  Angular step between the rendered rotations, in degrees
+        :param order:       Spline order of the rotations
+        """
+        if not resolution > 0:
+            raise ValueError(f"resolution must be positive, got {resolution}")
+        self.image = load_sprite() if image is None else np.asarray(image)
+        self.n_angles = max(1, int(round(360 / resolution)))
+        self.resolution = 360 / self.n_angles
+        self.order = order
+        self._rotations = {}
+
+    def __len__(self) -> int:
+        """Number of rotations rendered so far"""
+        return len(self._rotations)
+
+    def index(self, angle):
+        """Bin of the nearest rendered rotation to ``angle`` (degrees, scalar or array)"""
+        return np.rint(np.asarray(angle) / self.resolution).astype(int) % self.n_angles
+
+    def _render(self, index: int) -> np.ndarray:
+        from scipy.ndimage import rotate
+
+        rotated = rotate(
+            self.image, index * self.resolution, reshape=False, order=self.order
+        )
+        np.clip(rotated, 0, 1, out=rotated)
+        rotated.flags.writeable = False
+        return rotated
+
+    def get(self, index: int) -> np.ndarray:
+        """Rotation of bin ``index``, rendered on first use"""
+        rotated = self._rotations.get(index)
+        if rotated is None:
+            rotated = self._rotations[index] = self._render(index)
+        return rotated
+
+    def __call__(self, angle) -> np.ndarray:
+        """Sprite rotated by the nearest rendered angle to ``angle`` (degrees)"""
+        return self.get(int(self.index(angle)))
+
+    def prerender(self, angles=None):
+        """Render the bins of ``angles`` (all ``n_angles`` bins by default)"""
+        bins = range(self.n_angles) if angles is None else np.unique(self.index(angles))
+        for index in bins:
+            self.get(int(index))
+        return self
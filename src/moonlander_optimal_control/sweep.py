@@ -0,0 +1,245 @@
+import inspect
+import itertools
+import os
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from typing import Dict, Iterable, Iterator, List, Optional, Union
+
+import numpy as np
+
+from .analytic import _hamiltonian_residual, find_final_time
+from .guess import initial_guess
+from .solver import MODELS, _solve_system
+
+COLUMNS = (
+    "index",
+    "tf",
+    "status",
+    "success",
+    "niter",
+    "n_nodes",
+    "y_error",
+    "bc_residual",
+    "max_rms_residual",
+    "error",
+)
+
+# Keyword arguments of a scenario that are solver settings rather than
+# parameters of the model's system
+SETTINGS = ("t_steps", "tf_guess", "y0_guess", "guess", "analytic", "jacobian")
+
+
+def scenario_grid(**axes) -> List[dict]:
+    """Build the cartesian product of parameter values.
+
+    Example: ``scenario_grid(pos=[(5.0, 10.0)], vx0=[0.0, 1.0], nu=[0.0, 5.0])``
+
+    Returns: list of scenario dicts (keyword arguments for the solver)
+    """
+    keys = list(axes)
+    return [dict(zip(keys, values)) for values in itertools.product(*axes.values())]
+
+
+def solve_scenario(model: str = "baseline", **scenario) -> dict:
+    """Solve one scenario and summarize it as a result record.
+
+    ``scenario`` holds the solver keyword arguments (``pos`` and ``vx0`` are
+    required).  Exceptions raised by the solve are recorded with status -1
+    and their type and message in ``error`` instead of propagating, so one
+    bad scenario does not abort a sweep.
+
+    :raises ValueError: for an unknown model
+    :raises TypeError: for missing or unknown keyword arguments (checked before solving)
+
+    Returns: dict with the entries of ``COLUMNS`` (except ``index``)
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown model {model!r}, expected one of {list(MODELS)}")
+    _check_arguments(model, scenario)
+
+    params = dict(scenario)
+    pos = params.pop("pos")
+    vx0 = params.pop("vx0")
+    t_steps = params.pop("t_steps", 200)
+    tf_guess = params.pop("tf_guess", 20.0)
+    y0_guess = params.pop("y0_guess", 1.0)
+    analytic = params.pop("analytic", True)
+    jacobian = params.pop("jacobian", True)
+    guess = params.pop("guess", "auto")
+
+    try:
+        if model == "baseline" and analytic and params.get("nu", 0.0) == 0:
+            record = _solve_closed_form(pos, vx0, tf_guess, t_steps, **params)
+            if record is not None:
+                return record
+
+        system = MODELS[model](pos, vx0, **params)
+        guess = initial_guess(
+            pos, vx0, t_steps, tf_guess, y0_guess, guess, model, **params
+        )
+        sol = _solve_system(
+            system, pos, vx0, t_steps, tf_guess, y0_guess, jacobian, guess=guess
+        )
+    except Exception as e:
+        return _failed_record(f"{type(e).__name__}: {e}")
+
+    return {
+        "tf": sol.p[0],
+        "status": sol.status,
+        "success": sol.success,
+        "niter": sol.niter,
+        "n_nodes": sol.x.size,
+        "y_error": abs(sol.y[1, -1]),
+        "bc_residual": np.max(np.abs(system[1](sol.y[:, 0], sol.y[:, -1], sol.p))),
+        "max_rms_residual": np.max(sol.rms_residuals),
+        "error": "",
+    }
+
+
+def _check_arguments(model, scenario):
+    """Raise ``TypeError`` for keyword arguments ``solve_scenario`` would not use"""
+    missing = [name for name in ("pos", "vx0") if name not in scenario]
+    if missing:
+        raise TypeError(f"Missing scenario arguments: {missing}")
+    accepted = set(inspect.signature(MODELS[model]).parameters) | set(SETTINGS)
+    unknown = sorted(set(scenario) - accepted)
+    if unknown:
+        raise TypeError(
+            f"Unknown arguments for model {model!r}: {unknown}, "
+            f"expected some of {sorted(accepted - {'pos', 'vx0'})}"
+        )
+
+
+def _solve_closed_form(
+    pos, vx0, tf_guess, t_steps, alpha=10.0, beta=25.0, gamma=3.0, nu=0.0, G=2.0
+):
+    """Result record for the analytic fast path, or None if it does not apply"""
+    tf = find_final_time(pos, vx0, tf_guess, alpha, beta, gamma, G)
+    if tf is None:
+        return None
+
+    # The closed form satisfies every condition except the Hamiltonian exactly
+    residual = abs(_hamiltonian_residual(tf, pos[1], vx0, alpha, beta, gamma, G))
+    return {
+        "tf": tf,
+        "status": 0,
+        "success": True,
+        "niter": 0,
+        "n_nodes": t_steps,
+        "y_error": 0.0,
+        "bc_residual": residual,
+        "max_rms_residual": 0.0,
+        "error": "",
+    }
+
+
+def _failed_record(error=""):
+    return {
+        "tf": np.nan,
+        "status": -1,
+        "success": False,
+        "niter": 0,
+        "n_nodes": 0,
+        "y_error": np.nan,
+        "bc_residual": np.nan,
+        "max_rms_residual": np.nan,
+        "error": error,
+    }
+
+
+def _solve_indexed(index, model, scenario):
+    record = solve_scenario(model, **scenario)
+    record["index"] = index
+    return record
+
+
+def iter_sweep(
+    scenarios: Union[Iterable[dict], Dict[str, Iterable]],
+    model: str = "baseline",
+    processes: Optional[int] = None,
+    **fixed,
+) -> Iterator[dict]:
+    """Solve many scenarios across a process pool, yielding records as they finish.
+
+    :param scenarios:   List of scenario dicts, or a dict of parameter lists that is
+                        expanded with ``scenario_grid``
+    :param model:       ``"baseline"`` or ``"final_angle"``
+    :param processes:   Number of worker processes (see ``render.map_chunks``)
+    :param fixed:       Keyword arguments shared by every scenario
+    :return:            Records in completion order; ``record["index"]`` is the
+                        position of the scenario in the input
+    """
+    if model not in MODELS:
+        raise ValueError(f"Unknown model {model!r}, expected one of {list(MODELS)}")
+
+    if isinstance(scenarios, dict):
+        scenarios = scenario_grid(**scenarios)
+    jobs = [(i, model, {**fixed, **scenario}) for i, scenario in enumerate(scenarios)]
+    # Argument errors are raised here rather than recorded per scenario
+    for _, _, scenario in jobs:
+        _check_arguments(model, scenario)
+
+    if processes == 1:
+        for job in jobs:
+            yield _solve_indexed(*job)
+        return
+
+    if processes is None:
+        processes = os.cpu_count() or 1
+    # At most two jobs per process are submitted but not yet yielded
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        pending = set()
+        jobs = iter(jobs)
+        try:
+            while True:
+                for job in jobs:
+                    pending.add(pool.submit(_solve_indexed, *job))
+                    if len(pending) >= 2 * processes:
+                        break
+                if not pending:
+                    return
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def sweep(
+    scenarios: Union[Iterable[dict], Dict[str, Iterable]],
+    model: str = "baseline",
+    processes: Optional[int] = None,
+    callback=None,
+    **fixed,
+) -> Dict[str, np.ndarray]:
+    """Solve many scenarios across a process pool and collect a columnar table.
+
+    Takes the same arguments as ``iter_sweep``.  If ``callback`` is given it is
+    called with each record as soon as that scenario finishes.
+
+    Returns: dict of column name to array, one row per scenario in input order.
+             The scenario parameters are included as columns (``pos`` is split
+             into ``x0`` and ``y0``).
+    """
+    if isinstance(scenarios, dict):
+        scenarios = scenario_grid(**scenarios)
+    scenarios = [{**fixed, **scenario} for scenario in scenarios]
+
+    records = []
+    for record in iter_sweep(scenarios, model, processes):
+        if callback is not None:
+            callback(record)
+        records.append(record)
+    records.sort(key=lambda record: record["index"])
+
+    table = {name: np.array([record[name] for record in records]) for name in COLUMNS}
+
+    for key in sorted(set().union(*scenarios) if scenarios else ()):
+        values = [scenario.get(key) for scenario in scenarios]
+        if key == "pos":
+            table["x0"] = np.array([value[0] for value in values], dtype=float)
+            table["y0"] = np.array([value[1] for value in values], dtype=float)
+        else:
+            table[key] = np.array(values)
+
+    return table
@@ -0,0 +1,69 @@
+import numpy as np
+from scipy.integrate import solve_bvp
+
+from moonlander_optimal_control.analytic import solve_baseline_analytic
+from moonlander_optimal_control.solver import solve_baseline
+
+
+def test_analytic_matches_collocation():
+    pos, vx0 = (5.0, 10.0), 1.0
+    alpha, beta, gamma, G = 10.0, 25.0, 3.0, 2.0
+    t, x, y, xp, yp, ux, uy, tf = solve_baseline_analytic(pos, vx0, t_steps=50)
+
+    assert tf > 0
+    assert np.isclose(x[0], pos[0]) and np.isclose(y[0], pos[1])
+    assert np.isclose(xp[0], vx0) and np.isclose(yp[0], 0.0)
+    assert abs(y[-1]) < 1e-10
+
+    def ode(s, z, p):
+        return p[0] * np.array(
+            [
+                z[2],
+                z[3],
+                z[6] / (2 * alpha),
+                z[7] / (2 * alpha) - G,
+                np.zeros_like(z[0]),
+                np.zeros_like(z[0]),
+                -z[4],
+                -z[5],
+            ]
+        )
+
+    def bc(za, zb, p):
+        uxf = zb[6] / (2 * alpha)
+        uyf = zb[7] / (2 * alpha)
+        return np.array(
+            [
+                za[0] - pos[0],
+                za[1] - pos[1],
+                za[2] - vx0,
+                za[3],
+                zb[1],
+                zb[4],
+                zb[6] - 2 * beta * zb[2],
+                zb[7] - 2 * beta * zb[3],
+                zb[4] * zb[2]
+                + zb[5] * zb[3]
+                + zb[6] * uxf
+                + zb[7] * (uyf - G)
+                - alpha * (uxf**2 + uyf**2)
+                - gamma,
+            ]
+        )
+
+    # Seed collocation with the closed form; it must already be a solution
+    guess = np.zeros((8, len(t)))
+    guess[0], guess[1], guess[2], guess[3] = x, y, xp, yp
+    guess[6] = 2 * alpha * ux
+    guess[7] = 2 * alpha * (uy + G)
+    guess[5] = -np.gradient(guess[7], t / tf) / tf
+
+    sol = solve_bvp(ode, bc, t / tf, guess, p=np.array([tf]))
+    assert sol.status == 0
+    assert np.isclose(sol.p[0], tf, rtol=1e-6)
+
+
+def test_solve_baseline_fast_path():
+    fast = solve_baseline((5.0, 10.0), 1.0, t_steps=50)
+    assert len(fast[0]) == 50
+    assert np.isclose(fast[-1], solve_baseline_analytic((5.0, 10.0), 1.0)[-1])
@@ -0,0 +1,55 @@
+import numpy as np
+
+from moonlander_optimal_control.analytic import closed_form_trajectory, find_final_time
+from moonlander_optimal_control.batch import solve_batch
+from moonlander_optimal_control.solver import _final_angle_system, _solve_system
+
+POS = np.array([[5.0, 10.0], [3.0, 8.0], [0.0, 12.0]])
+VX0 = np.array([1.0, 0.5, -1.0])
+
+
+def _analytic_guesses(t_steps, **weights):
+    tfs, guesses = [], []
+    for pos, vx0 in zip(POS, VX0):
+        tf = find_final_time(tuple(pos), vx0, **weights)
+        _, y = closed_form_trajectory(tuple(pos), vx0, tf, t_steps, **weights)
+        tfs.append(tf)
+        guesses.append(y)
+    return np.array(tfs), np.array(guesses)
+
+
+def test_batch_reproduces_closed_form():
+    tfs, guesses = _analytic_guesses(30)
+    perturbed = guesses + 0.05 * np.sin(np.linspace(0, 3, 30))
+
+    solution, info = solve_batch(
+        POS, VX0, t_steps=30, tf_guess=tfs * 1.05, guess=perturbed
+    )
+    assert info["success"].all()
+    assert np.allclose(solution[-1], tfs, rtol=1e-8)
+    assert solution[2].shape == (3, 30)
+
+
+def test_batch_final_angle_matches_solve_bvp():
+    weights = dict(alpha=1.0, beta=400.0)
+    tfs, guesses = _analytic_guesses(50, **weights)
+
+    solution, info = solve_batch(
+        POS,
+        VX0,
+        "final_angle",
+        t_steps=50,
+        tf_guess=tfs,
+        guess=guesses,
+        rho=1.0,
+        **weights
+    )
+    assert info["success"].all()
+
+    s = np.linspace(0, 1, 50)
+    for i, (pos, vx0) in enumerate(zip(POS, VX0)):
+        system = _final_angle_system(tuple(pos), vx0, rho=1.0, **weights)
+        sol = _solve_system(
+            system, None, None, 50, None, None, guess=(s, guesses[i], tfs[i])
+        )
+        assert np.isclose(solution[-1][i], sol.p[0], rtol=1e-3)
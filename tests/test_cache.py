@@ -0,0 +1,84 @@
+import numpy as np
+
+from moonlander_optimal_control import LunarLander
+from moonlander_optimal_control.cache import SolutionCache
+from moonlander_optimal_control.solver import solve_baseline
+
+
+def test_memory_and_disk_levels(tmp_path):
+    cache = SolutionCache(tmp_path)
+    key = cache.key("baseline", pos=(5, 10), vx0=1.0)
+    assert key == cache.key("baseline", vx0=1, pos=[5.0, 10.0])
+    assert cache.get(key) is None
+
+    cache.put(key, {"t": np.arange(3.0), "tf": np.asarray(2.0)})
+    assert cache.get(key)["tf"] == 2.0
+    assert cache.stats["hits"] == 1 and cache.stats["misses"] == 1
+
+    # A fresh cache on the same directory finds the entry on disk
+    reopened = SolutionCache(tmp_path)
+    assert np.array_equal(reopened.get(key)["t"], np.arange(3.0))
+    assert reopened.stats["disk_hits"] == 1
+
+
+def test_eviction_by_bytes_and_invalidation(tmp_path):
+    cache = SolutionCache(tmp_path, max_bytes=2 * 800)
+    for i in range(3):
+        cache.put(str(i), {"y": np.zeros(100)})
+    assert cache.stats["entries"] == 2 and cache.stats["evictions"] == 1
+
+    cache.invalidate(version="next")
+    assert cache.stats["entries"] == 0
+    assert cache.get("2") is None
+    assert [p.name for p in tmp_path.iterdir()] == ["vnext"]
+
+
+def test_solvers_share_cache():
+    cache = SolutionCache()
+    first = solve_baseline((5.0, 10.0), 1.0, t_steps=20, cache=cache)
+    second = solve_baseline((5.0, 10.0), 1.0, t_steps=20, cache=cache)
+    assert np.array_equal(first[1], second[1]) and first[-1] == second[-1]
+    assert cache.stats["hits"] == 1
+
+    lander = LunarLander((5.0, 10.0), 1.0, t_steps=20)
+    state, _, _ = lander.find_path(max_nodes=200, cache=cache)
+    state_again, _, _ = lander.find_path(max_nodes=200, cache=cache)
+    assert state.equals(state_again)
+    assert cache.stats["hits"] == 2
+
+
+def test_failed_solves_are_not_stored():
+    from moonlander_optimal_control.cache import cached_call
+    from moonlander_optimal_control.result import Solution
+
+    cache = SolutionCache()
+    sol = solve_baseline((5.0, 10.0), 1.0, t_steps=20, cache=False)
+    failed = Solution.from_arrays({**sol.to_arrays(), "status": np.asarray(1)})
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return failed
+
+    for _ in range(2):
+        cached_call("baseline", {"x": 1}, compute, cache, result_type=Solution)
+    assert len(calls) == 2 and cache.stats["entries"] == 0
+
+    cached_call("baseline", {"x": 1}, lambda: sol, cache, result_type=Solution)
+    assert cache.stats["entries"] == 1
+
+
+def test_disk_index_survives_restarts_and_eviction(tmp_path):
+    cache = SolutionCache(tmp_path)
+    solve_baseline((5.0, 10.0), 1.0, t_steps=20, analytic=False, cache=cache)
+    size = next((tmp_path / f"v{cache.version}").glob("*.npz")).stat().st_size
+
+    # A fresh cache on the same directory can use the entry as a neighbour
+    reopened = SolutionCache(tmp_path, max_bytes=1, max_disk_bytes=size + size // 2)
+    [(key, params)] = reopened.solved("baseline")
+    assert params["pos"] == [5.0, 10.0] and params["vx0"] == 1.0
+
+    # Evicting the file drops it from the index
+    solve_baseline((5.0, 11.0), 1.0, t_steps=20, analytic=False, cache=reopened)
+    assert [p["pos"] for _, p in reopened.solved("baseline")] == [(5.0, 11.0)]
+    assert len(list((tmp_path / f"v{cache.version}").iterdir())) == 2
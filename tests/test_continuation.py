@@ -0,0 +1,14 @@
+import numpy as np
+
+from moonlander_optimal_control.analytic import solve_baseline_analytic
+from moonlander_optimal_control.continuation import continuation, parameter_path
+
+
+def test_continuation_matches_direct_solves():
+    betas = [25.0, 100.0, 400.0]
+    results = continuation((5.0, 10.0), 1.0, parameter_path("beta", betas))
+
+    assert len(results) == len(betas)
+    for beta, result in zip(betas, results):
+        expected = solve_baseline_analytic((5.0, 10.0), 1.0, beta=beta)
+        assert np.isclose(result[-1], expected[-1], rtol=1e-4)
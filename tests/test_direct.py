@@ -0,0 +1,63 @@
+import numpy as np
+import pytest
+
+from moonlander_optimal_control.direct import _Transcription, solve_direct
+from moonlander_optimal_control.solver import solve_baseline
+
+
+def test_direct_derivatives_match_finite_differences():
+    problem = _Transcription((0.0, 10.0), 1.0, 6, 10.0, 25.0, 3.0, 5.0, 2.0)
+    rng = np.random.default_rng(0)
+    z = problem.initial_guess(20.0) + 0.1 * rng.random(problem.size)
+    lam = rng.random(4 * (problem.n - 1))
+    eps = 1e-7
+
+    def fd(fun):
+        base = fun(z)
+        cols = []
+        for i in range(problem.size):
+            dz = z.copy()
+            dz[i] += eps
+            cols.append((fun(dz) - base) / eps)
+        return np.array(cols).T
+
+    assert np.allclose(fd(problem.objective), problem.gradient(z), atol=1e-4)
+    assert np.allclose(
+        fd(problem.defects), problem.defects_jacobian(z).toarray(), atol=1e-5
+    )
+    assert np.allclose(fd(problem.gradient), problem.hessian(z).toarray(), atol=1e-4)
+    assert np.allclose(
+        fd(lambda q: lam @ problem.defects_jacobian(q).toarray()),
+        problem.defects_hessian(z, lam).toarray(),
+        atol=1e-5,
+    )
+
+
+@pytest.mark.parametrize(
+    "method, kw",
+    [
+        ("newton", dict(pos=(0.0, 10.0), vx0=1.0)),
+        ("newton", dict(pos=(5.0, 10.0), vx0=1.0, alpha=1.0, beta=400.0)),
+        # A cost whose stationary point is a minimum, for the minimizers too
+        ("trust-constr", dict(pos=(0.0, 10.0), vx0=1.0, beta=-25.0)),
+        ("SLSQP", dict(pos=(0.0, 10.0), vx0=1.0, beta=-25.0, t_steps=40)),
+    ],
+)
+def test_direct_matches_solve_baseline(method, kw):
+    direct = solve_direct(**kw, method=method)
+    indirect = solve_baseline(**kw).resample(direct.n_nodes)
+    t, x, y, xp, yp, ux, uy, tf = direct
+
+    assert direct.success
+    assert np.isclose(y[0], kw["pos"][1]) and abs(y[-1]) < 1e-8
+    assert np.isclose(xp[0], kw["vx0"]) and np.isclose(yp[0], 0.0)
+    assert abs(tf - indirect.tf) < 1e-2
+    assert np.allclose(y, indirect.y, atol=1e-2)
+    assert np.allclose(ux, indirect.ux, atol=1e-2)
+
+
+def test_direct_reports_optimizer_failure():
+    sol = solve_direct((0.0, 10.0), 1.0, t_steps=20, method="SLSQP", max_iter=2)
+
+    assert not sol.success and sol.status != 0
+    assert sol.niter <= 2
@@ -0,0 +1,72 @@
+import numpy as np
+
+from moonlander_optimal_control import SolutionCache
+from moonlander_optimal_control.guess import (
+    ballistic_guess,
+    initial_guess,
+    neighbour_guess,
+)
+from moonlander_optimal_control.solver import solve_baseline, solve_with_final_angle
+
+
+def test_ballistic_guess_is_consistent():
+    pos, vx0, alpha, G = (5.0, 10.0), 1.0, 10.0, 2.0
+    s, y, tf = ballistic_guess(pos, vx0, 400, alpha=alpha, G=G)
+    t = s * tf
+
+    assert np.allclose(y[:4, 0], [5.0, 10.0, 1.0, 0.0])
+    assert np.allclose(y[[1, 2, 3], -1], 0.0)
+    # Velocities and accelerations match the states and the controls p / (2 alpha)
+    inner = slice(1, -1)
+    assert np.allclose(np.gradient(y[0], t)[inner], y[2, inner])
+    assert np.allclose(np.gradient(y[1], t)[inner], y[3, inner], atol=1e-3)
+    assert np.allclose(np.gradient(y[2], t)[inner], y[6, inner] / (2 * alpha))
+    assert np.allclose(np.gradient(y[3], t)[inner], y[7, inner] / (2 * alpha) - G)
+    assert np.allclose(np.gradient(y[7], t), -y[5])
+
+
+def test_neighbour_guess_from_cache():
+    cache = SolutionCache()
+    params = dict(alpha=1.0, beta=400.0, analytic=False, cache=cache)
+    solve_baseline((5.0, 10.0), 1.0, **params)
+
+    assert neighbour_guess("final_angle", dict(pos=(5.0, 10.0), vx0=1.0), cache) is None
+    problem = dict(pos=(5.0, 10.5), vx0=1.0, alpha=1.0, beta=400.0, gamma=3.0)
+    s, y, tf = neighbour_guess("baseline", {**problem, "nu": 0.0, "G": 2.0}, cache)
+    assert np.allclose(y[:3, 0], [5.0, 10.5, 1.0]) and tf > 0
+
+    # Too far away in alpha
+    far = {**problem, "alpha": 10.0, "nu": 0.0, "G": 2.0}
+    assert neighbour_guess("baseline", far, cache) is None
+
+
+def test_surrogates_converge_without_refinement():
+    pos, vx0 = (5.0, 10.0), 1.0
+    params = dict(alpha=1.0, beta=400.0, rho=0.5, cache=False)
+
+    straight = solve_with_final_angle(pos, vx0, guess="straight", **params)
+    assert not (straight.success and straight.tf > 0)
+
+    for method in ("auto", "analytic", "ballistic"):
+        sol = solve_with_final_angle(pos, vx0, guess=method, **params)
+        assert sol.success and sol.tf > 0
+        assert sol.n_nodes == 200 and sol.niter <= 2
+
+    s, y, tf = initial_guess(pos, vx0, 50, method="auto", cache=False)
+    assert y.shape == (8, 50) and tf > 0
+
+
+def test_auto_guess_with_ground_penalty_and_lander_neighbours():
+    from moonlander_optimal_control.guess import straight_guess
+    from moonlander_optimal_control.lunar_lander import LunarLander
+
+    pos, vx0 = (0.0, 20.0), 3.0
+    s, y, tf = initial_guess(pos, vx0, 50, method="auto", cache=False, nu=5.0)
+    s_ref, y_ref, tf_ref = straight_guess(pos, vx0, 50)
+    assert np.array_equal(y, y_ref) and tf == tf_ref
+
+    cache = SolutionCache()
+    LunarLander((5.0, 10.0), 1.0, t_steps=50).find_path(cache=cache)
+    lander = LunarLander((5.0, 10.5), 1.0, t_steps=50)
+    s, y, tf = lander._initial_guess(20.0, "neighbour", cache)
+    assert np.allclose(y[:3, 0], [5.0, 10.5, 1.0])
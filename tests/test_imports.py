@@ -12,3 +12,40 @@ def test_solver_wrapper_signature():
     pkg = importlib.import_module("moonlander_optimal_control")
     # Ensure it’s callable; do not run the actual solver here (could be slow on CI)
     assert callable(pkg.solve_baseline)
+
+
+def test_import_is_lazy():
+    import subprocess
+    import sys
+
+    from conftest import SRC
+
+    code = (
+        f"import sys; sys.path.insert(0, {str(SRC)!r}); "
+        "import moonlander_optimal_control as pkg; "
+        "print(*[m for m in ('matplotlib', 'pandas', 'scipy.ndimage') if m in sys.modules]); "
+        "pkg.LunarLander; print('matplotlib' in sys.modules)"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert out.stdout.split("\n")[:2] == ["", "False"]
+
+
+def test_solver_backends_are_lazy():
+    import subprocess
+    import sys
+
+    from conftest import SRC
+
+    backends = ("batch", "direct", "shooting")
+    code = (
+        f"import sys; sys.path.insert(0, {str(SRC)!r}); "
+        "import moonlander_optimal_control as pkg; "
+        f"print(*[b for b in {backends!r} if pkg.__name__ + '.' + b in sys.modules]); "
+        "print(callable(pkg.solve_direct), pkg.__name__ + '.direct' in sys.modules)"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert out.stdout.split("\n")[:2] == ["", "True True"]
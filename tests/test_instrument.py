@@ -0,0 +1,53 @@
+import json
+
+import pytest
+
+from moonlander_optimal_control import (
+    JsonLinesSink,
+    disable_instrumentation,
+    enable_instrumentation,
+    solve_baseline,
+)
+from moonlander_optimal_control.lunar_lander import LunarLander
+
+
+@pytest.fixture(autouse=True)
+def _disable():
+    yield
+    disable_instrumentation()
+
+
+def test_trace_record_of_a_solve():
+    sink = enable_instrumentation()
+    sol = solve_baseline(
+        (5.0, 10.0), 1.0, alpha=1.0, beta=400.0, analytic=False, cache=False
+    )
+
+    (record,) = sink.records
+    assert record["model"] == "baseline" and record["solver"] == "solve_bvp"
+    assert record["params"]["pos"] == [5.0, 10.0]
+    assert record["status"] == sol.status and record["tf"] == sol.tf
+    assert record["n_rhs"] == sol.n_rhs and record["n_bc"] > 0
+    assert record["n_jac"] > 0 and record["mesh_history"][0] == 200
+    assert record["mesh_history"][-1] == sol.n_nodes
+    assert record["rhs_time"] + record["linalg_time"] <= record["wall_time"]
+    assert record["bc_residual"] < 1e-6
+
+    disable_instrumentation()
+    solve_baseline((5.0, 10.0), 1.0, cache=False)
+    assert len(sink) == 1
+
+
+def test_sinks(tmp_path):
+    path = tmp_path / "trace.jsonl"
+    seen = []
+    enable_instrumentation(JsonLinesSink(path), seen.append)
+
+    solve_baseline((5.0, 10.0), 1.0, cache=False)
+    LunarLander([5, 10], 1.0, t_steps=50).find_path(cache=False)
+
+    records = [json.loads(line) for line in path.read_text().splitlines()]
+    assert records == seen
+    assert [r["model"] for r in records] == ["baseline", "lunar_lander"]
+    assert records[0]["solver"] == "closed_form"
+    assert records[1]["success"] and records[1]["n_rhs"] > 0
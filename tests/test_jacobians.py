@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+
+from moonlander_optimal_control.solver import _baseline_system, _final_angle_system
+
+
+def _fd_jacobian(fun, x, eps=1e-7):
+    """Forward-difference Jacobian of a vector function of a 1-D argument"""
+    f0 = fun(x)
+    jac = np.zeros((f0.size, x.size))
+    for j in range(x.size):
+        step = np.zeros_like(x)
+        step[j] = eps * max(1.0, abs(x[j]))
+        jac[:, j] = (fun(x + step) - f0) / step[j]
+    return jac
+
+
+@pytest.mark.parametrize(
+    "system",
+    [
+        _baseline_system((5.0, 10.0), 1.0, nu=3.0),
+        _final_angle_system((5.0, 10.0), 1.0, nu=3.0, rho=0.5),
+        _final_angle_system((5.0, 10.0), 1.0, rho=0.5, final_angle_on=0.3),
+    ],
+    ids=["baseline", "final_angle", "final_angle_weighted"],
+)
+def test_jacobians_match_finite_differences(system):
+    ode, bc, fun_jac, bc_jac = system
+    rng = np.random.default_rng(0)
+
+    y = rng.uniform(0.5, 2.0, (8, 5))
+    y[1] *= np.array([-1, 1, 1, -1, 1])  # nodes on both sides of the ground
+    y[1] = np.where(y[1] < 0, y[1] * 0.05, y[1])  # keep y + rho > 0
+    t = np.linspace(0, 1, 5)
+    p = np.array([7.0])
+
+    df_dy, df_dp = fun_jac(t, y, p)
+    for i in range(y.shape[1]):
+        fd = _fd_jacobian(lambda v: ode(t[i : i + 1], v[:, None], p)[:, 0], y[:, i])
+        assert np.allclose(df_dy[:, :, i], fd, rtol=1e-5, atol=1e-5)
+        fd_p = _fd_jacobian(lambda q: ode(t[i : i + 1], y[:, i : i + 1], q)[:, 0], p)
+        assert np.allclose(df_dp[:, :, i], fd_p, rtol=1e-5, atol=1e-5)
+
+    ya, yb = y[:, 0], y[:, -1]
+    dbc_dya, dbc_dyb, dbc_dp = bc_jac(ya, yb, p)
+    assert np.allclose(dbc_dya, _fd_jacobian(lambda v: bc(v, yb, p), ya), atol=1e-5)
+    assert np.allclose(dbc_dyb, _fd_jacobian(lambda v: bc(ya, v, p), yb), atol=1e-5)
+    assert np.allclose(dbc_dp, _fd_jacobian(lambda q: bc(ya, yb, q), p), atol=1e-5)
+
+
+def test_final_angle_weight_scales_ode_and_boundary_terms():
+    rng = np.random.default_rng(1)
+    y = rng.uniform(0.5, 2.0, (8, 5))
+    p = np.array([7.0])
+    terms = []
+    for weight in (0.0, 0.3, 1.0):
+        ode, bc, _, _ = _final_angle_system((5.0, 10.0), 1.0, final_angle_on=weight)
+        terms.append((ode(0.0, y, p)[5], bc(y[:, 0], y[:, -1], p)[8]))
+
+    (ode0, bc0), (ode_w, bc_w), (ode1, bc1) = terms
+    assert np.allclose(ode_w - ode0, 0.3 * (ode1 - ode0))
+    assert np.isclose(bc_w - bc0, 0.3 * (bc1 - bc0))
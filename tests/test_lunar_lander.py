@@ -0,0 +1,31 @@
+import numpy as np
+
+from moonlander_optimal_control.lunar_lander import LanderPath, LunarLander
+
+
+def test_find_path_builds_frames_lazily():
+    lander = LunarLander((5.0, 10.0), 1.0, t_steps=20)
+    path = lander.find_path(max_nodes=200, cache=False)
+
+    assert isinstance(path, LanderPath) and path._frames == {}
+    assert np.allclose(path.ux, path.costates[2] / 20.0)
+    assert np.shares_memory(path.states, path.costates.base)
+
+    controls = lander.controls
+    assert list(path._frames) == ["controls"]
+    assert controls is path.controls
+    assert list(controls.columns) == ["ux", "uy", "tau", "theta"]
+    assert controls.index.name == "t" and np.allclose(controls.index, path.t)
+
+    state, costate, _ = path
+    assert np.array_equal(state["y"].to_numpy(), path.states[1])
+    assert np.array_equal(costate["p4"].to_numpy(), path.costates[3])
+
+
+def test_find_path_indexes_like_a_tuple():
+    lander = LunarLander((5.0, 10.0), 1.0, t_steps=20)
+    path = lander.find_path(max_nodes=200, cache=False)
+
+    assert len(path) == 3
+    assert path[0] is path.state_sol and path[-1] is path.controls
+    assert path[1:] == (path.costate_sol, path.controls)
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+
+from moonlander_optimal_control.motion import (
+    Linear,
+    Motion,
+    MotionGroup,
+    Periodic,
+    Static,
+    Waypoints,
+    as_motion,
+)
+from moonlander_optimal_control.obstacles import ObstacleSet
+
+
+def test_primitives():
+    t = np.linspace(0, 12, 61)
+
+    np.testing.assert_allclose(
+        Static((1, 2)).positions(t), [np.ones(61), 2 * np.ones(61)]
+    )
+    np.testing.assert_allclose(
+        Linear((1, 2), (0.5, -1), t0=2).positions(t), [1 + 0.5 * (t - 2), 2 - (t - 2)]
+    )
+
+    # The notebook's t % 5 - 2.5, and the three waveforms at their extremes
+    np.testing.assert_allclose(
+        Periodic((3, 0), (0, 2.5), 5).positions(t)[1], t % 5 - 2.5, atol=1e-12
+    )
+    quarter = np.array([0.0, 1.0, 2.0, 3.0])
+    for waveform, expected in [
+        ("sawtooth", [-1, -0.5, 0, 0.5]),
+        ("triangle", [-1, 0, 1, 0]),
+        ("sine", [0, 1, 0, -1]),
+    ]:
+        y = Periodic((0, 0), (0, 1), 4, waveform=waveform).positions(quarter)[1]
+        np.testing.assert_allclose(y, expected, atol=1e-12)
+
+    path = Waypoints([0, 2, 4], [(0, 0), (2, 1), (2, 3)])
+    np.testing.assert_allclose(
+        path.positions([-1.0, 1.0, 3.0, 9.0]), [[0, 1, 2, 2], [0, 0.5, 2, 3]]
+    )
+
+    # A motion stands in for a (cx(t), cy(t)) pair
+    cx, cy = Linear((1, 2), (1, 0))
+    assert cx(2.0) == 3.0 and cy(2.0) == 2.0
+
+    with pytest.raises(ValueError, match="waveform"):
+        Periodic((0, 0), (0, 1), 4, waveform="square")
+
+    class Incomplete(Motion):
+        pass
+
+    with pytest.raises(TypeError, match="evaluate"):
+        Incomplete()
+
+
+def test_group_evaluates_and_caches():
+    motions = [
+        Periodic((1, 0), (0, 3), 6),
+        Static((2, 2)),
+        (lambda t: 4.0, lambda t: -t),
+        Periodic((5, 0), (0, -3), 6, phase=3, waveform="triangle"),
+        Waypoints([0, 1], [(0, 0), (1, 1)]),
+        Linear((0, 0), (1, 1)),
+    ]
+    group = MotionGroup(motions)
+    t = np.linspace(0, 1, 50)
+    cx, cy = group.positions(t)
+    assert cx.shape == (6, 50)
+    for i, motion in enumerate(motions):
+        expected = as_motion(motion).positions(t)
+        np.testing.assert_allclose(cx[i], expected[0])
+        np.testing.assert_allclose(cy[i], expected[1])
+
+    # A mesh with the same values hits the cache, a different one does not
+    assert group.positions(t.copy())[0] is cx
+    assert group.positions(t * 2)[0] is not cx
+    assert not cx.flags.writeable
+
+
+def test_obstacle_set_with_motions():
+    r = np.tile([0.025, 0.25], (3, 1))
+    motions = [
+        Periodic((x, 0.0), (0.0, 3.0 * (-1) ** i), 6.0, 3.0 * (i % 2))
+        for i, x in enumerate([1.0, 3.0, 5.0])
+    ]
+    callables = [
+        (lambda t, x=x: x, lambda t, i=i: (-1) ** i * ((t + 3 * (i % 2)) % 6 - 3))
+        for i, x in enumerate([1.0, 3.0, 5.0])
+    ]
+    s = np.linspace(0, 1, 40)
+    x, y = np.linspace(6, 0, 40), np.sin(np.pi * s)
+    for a, b in zip(
+        ObstacleSet(r, motions, 500.0).evaluate(s, x, y),
+        ObstacleSet(r, callables, 500.0).evaluate(s, x, y),
+    ):
+        np.testing.assert_allclose(a, b, rtol=1e-10, atol=1e-12)
@@ -0,0 +1,165 @@
+import numpy as np
+import pytest
+
+from moonlander_optimal_control.motion import Periodic
+from moonlander_optimal_control.obstacles import (
+    ObstacleSet,
+    barrier,
+    solve_moving_obstacles,
+)
+
+
+def _reference(t, x, y, W, r, c, lam=20):
+    """Sum of the per-obstacle formulas of multi_obstacle.py"""
+    cost, dx, dy = 0.0, 0.0, 0.0
+    for ri, ci in zip(r, c):
+        q = (x - ci[0](t)) ** 2 / ri[0] + (y - ci[1](t)) ** 2 / ri[1]
+        cost = cost + W / (q**lam + 1)
+        dx = dx - 2 * lam * W * (x - ci[0](t)) * q ** (lam - 1) / (
+            ri[0] * (q**lam + 1) ** 2
+        )
+        dy = dy - 2 * lam * W * (y - ci[1](t)) * q ** (lam - 1) / (
+            ri[1] * (q**lam + 1) ** 2
+        )
+    return cost, dx, dy
+
+
+def test_matches_per_obstacle_sums():
+    r = [(0.5, 1.0), (1.0, 0.25), (0.75, 0.75)]
+    c = [
+        (lambda t: 1.0, lambda t: t % 5 - 2.5),
+        (lambda t: 2 + 0 * t, lambda t: -t),
+        (lambda t: 3 - t, lambda t: 0.5),
+    ]
+    obstacles = ObstacleSet(r, c, weights=500.0)
+
+    s = np.linspace(0, 1, 50)
+    x, y = np.linspace(0, 4, 50), np.sin(3 * s)
+    for got, expected in zip(
+        obstacles.evaluate(s, x, y), _reference(s, x, y, 500.0, r, c)
+    ):
+        assert got.shape == x.shape
+        np.testing.assert_allclose(got, expected, rtol=1e-10, atol=1e-12)
+    np.testing.assert_allclose(
+        obstacles.cost(s, x, y), _reference(s, x, y, 500.0, r, c)[0]
+    )
+
+    # A scalar time against a grid of points, and a single point
+    X, Y = np.meshgrid(np.linspace(0, 4, 7), np.linspace(-1, 1, 5))
+    np.testing.assert_allclose(
+        obstacles.cost(0.3, X, Y), _reference(0.3, X, Y, 500.0, r, c)[0]
+    )
+    assert np.ndim(obstacles.cost(0.3, 1.0, 0.0)) == 0
+
+
+def test_fixed_centres_and_per_obstacle_parameters():
+    centres = np.array([[0.0, 0.0], [2.0, 1.0]])
+    obstacles = ObstacleSet([(1, 1), (0.5, 2)], centres, weights=[1.0, 3.0], lam=[2, 4])
+    moving = [(lambda t, cx=cx: cx, lambda t, cy=cy: cy) for cx, cy in centres]
+    assert len(obstacles) == 2
+
+    x, y = np.linspace(-1, 3, 20), np.linspace(2, -1, 20)
+    cost, dx, dy = obstacles.evaluate(0.0, x, y)
+    expected = [
+        _reference(0.0, x, y, W, [ri], [ci], lam)
+        for W, ri, ci, lam in zip([1.0, 3.0], [(1, 1), (0.5, 2)], moving, [2, 4])
+    ]
+    np.testing.assert_allclose(cost, expected[0][0] + expected[1][0])
+    np.testing.assert_allclose(dx, expected[0][1] + expected[1][1])
+    np.testing.assert_allclose(dy, expected[0][2] + expected[1][2])
+
+    # The gradient matches finite differences
+    h = 1e-6
+    fd = (obstacles.cost(0.0, x + h, y) - obstacles.cost(0.0, x - h, y)) / (2 * h)
+    np.testing.assert_allclose(dx, fd, rtol=1e-5, atol=1e-8)
+
+
+def test_barrier_is_finite_and_exact():
+    q = np.concatenate([[0.0, 1.0], np.logspace(-3, 1.5, 200)])
+    value, slope = barrier(q, 20)
+    np.testing.assert_allclose(value, 1 / (q**20 + 1), rtol=1e-12)
+    np.testing.assert_allclose(
+        slope, -20 * q**19 / (q**20 + 1) ** 2, rtol=1e-12, atol=1e-300
+    )
+
+    # Non-integer and per-element exponents take the pow path
+    for lam in (20.0, np.full_like(q, 20.0)):
+        np.testing.assert_allclose(barrier(q, lam)[0], value, rtol=1e-12)
+
+    # Far from the obstacle q**20 overflows, the barrier underflows to 0
+    with np.errstate(over="raise", invalid="raise", divide="raise"):
+        value, slope = barrier(np.array([1e8, 1e20, 1e300]), 20)
+    assert np.all(np.isfinite(value)) and np.all(np.isfinite(slope))
+    assert np.all(value >= 0) and np.all(slope <= 0)
+
+
+def test_far_points_have_finite_gradients():
+    obstacles = ObstacleSet([(0.025, 0.25)], [(1.0, 0.0)], weights=500.0)
+    x = np.array([1.0, 1.1, 1e3, 1e8, -1e12])
+    cost, dx, dy = obstacles.evaluate(0.0, x, np.zeros_like(x))
+    assert np.all(np.isfinite(cost)) and np.all(np.isfinite(dx))
+    assert cost[0] == 500.0 and dx[0] == 0.0
+
+
+def test_culling_error_bound():
+    rng = np.random.default_rng(1)
+    n = 200
+    centres = np.c_[rng.uniform(0, 6, n), rng.uniform(0, 3, n)]
+    moving = [
+        (lambda t, c=c: c[0] + 0.3 * t, lambda t, c=c: c[1]) if i % 2 else c
+        for i, c in enumerate(centres)
+    ]
+    r = rng.uniform(0.005, 0.05, (n, 2))
+    tol = 1e-9
+    dense = ObstacleSet(r, moving, 500.0)
+    culled = ObstacleSet(r, moving, 500.0, tol=tol, window=16)
+    assert np.all(culled.cutoff >= 1)
+
+    s = np.linspace(0, 1, 300)
+    x, y = 6 * s, 1.5 + np.sin(3 * np.pi * s)
+    for got, expected in zip(culled.evaluate(s, x, y), dense.evaluate(s, x, y)):
+        assert np.max(np.abs(got - expected)) <= n * tol
+    # Repeated calls on the same mesh reuse the swept boxes
+    np.testing.assert_array_equal(culled.cost(s, x, y), culled.evaluate(s, x, y)[0])
+
+    # Only pairs near the path are evaluated
+    cx, cy = (c.reshape(n, -1) for c in culled.center_positions(s))
+    obstacle, _ = culled._pairs(cx, cy, x, y)
+    assert len(obstacle) < 0.1 * n * len(s)
+
+    # A scalar time against a grid
+    X, Y = np.meshgrid(np.linspace(0, 6, 30), np.linspace(0, 3, 20))
+    assert np.max(np.abs(culled.cost(0.5, X, Y) - dense.cost(0.5, X, Y))) <= n * tol
+
+
+def test_headless_moving_obstacle_solve():
+    obstacles = ObstacleSet(
+        [(0.025, 0.25)], [Periodic((3.0, 0.0), (0.0, 3.0), 6.0)], 500.0, tol=1e-10
+    )
+    sol = solve_moving_obstacles(obstacles)
+    assert sol.success and sol.tf > 0 and sol.n_rhs > 0
+    np.testing.assert_allclose(sol.states[:4, 0], [6, 0, 0, 0], atol=1e-6)
+    np.testing.assert_allclose(sol.states[:4, -1], [0, 0, 0, 0], atol=1e-6)
+    # The controls are p3 / (2 W2) and p4 / (2 W2), no gravity
+    np.testing.assert_allclose(sol.uy, sol.costates[3] / 20)
+
+    # Shifting the start and the goal shifts the path
+    shifted = ObstacleSet(
+        [(0.025, 0.25)], [Periodic((3.0, 1.0), (0.0, 3.0), 6.0)], 500.0, tol=1e-10
+    )
+    moved = solve_moving_obstacles(shifted, start=(6.0, 1.0), goal=(0.0, 1.0))
+    assert moved.success
+    np.testing.assert_allclose(moved.tf, sol.tf, rtol=1e-4)
+    np.testing.assert_allclose(moved.y, sol.y + 1, atol=1e-4)
+
+
+def test_legacy_helpers_load_on_access(monkeypatch):
+    from conftest import ROOT
+
+    from moonlander_optimal_control import obstacles
+
+    monkeypatch.syspath_prepend(str(ROOT))
+    assert callable(obstacles.moving_obstacle_terms)
+    assert set(obstacles._LEGACY) <= set(obstacles.__all__)
+    with pytest.raises(AttributeError):
+        obstacles.no_such_helper
@@ -0,0 +1,117 @@
+import numpy as np
+import pytest
+
+from moonlander_optimal_control import solve_baseline
+from moonlander_optimal_control.plotting import (
+    ControlsFigure,
+    FigureTemplate,
+    SummaryFigure,
+    TrajectoryFigure,
+    render_many,
+)
+
+
+@pytest.fixture(scope="module")
+def solutions():
+    return [
+        solve_baseline((5.0, y0), 1.0, cache=False, alpha=1.0, beta=400.0)
+        for y0 in (8.0, 10.0, 12.0)
+    ]
+
+
+def test_templates_reuse_one_figure(solutions):
+    pytest.importorskip("matplotlib")
+    summary = SummaryFigure()
+    axes = list(summary.fig.axes)
+    for sol in solutions:
+        fig = summary.plot(sol)
+        assert fig is summary.fig and fig.axes == axes
+        np.testing.assert_array_equal(summary.lines[1].get_ydata(), sol.y)
+        # Axes follow the data of the current solution
+        assert axes[1].get_ylim()[1] >= sol.y.max()
+
+    sol = solutions[-1]
+    controls = ControlsFigure().plot(sol)
+    np.testing.assert_allclose(
+        controls.axes[1].lines[0].get_ydata(), np.hypot(sol.ux, sol.uy)
+    )
+    trajectory = TrajectoryFigure(xlim=(0, 10))
+    trajectory.update(sol.x, sol.y)
+    assert trajectory.ax.get_xlim() == (0, 10)
+    assert trajectory.ax.get_ylim() == (0, sol.y.max() + 0.5)
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_render_many(solutions, tmp_path, processes):
+    pytest.importorskip("matplotlib")
+    paths = render_many(
+        solutions,
+        str(tmp_path / "summary_{index}.png"),
+        processes=processes,
+        chunk_size=2,
+        dpi=20,
+    )
+    assert paths == [str(tmp_path / f"summary_{i}.png") for i in range(3)]
+    assert all((tmp_path / f"summary_{i}.png").stat().st_size > 0 for i in range(3))
+
+    paths = render_many(
+        solutions[:2],
+        [tmp_path / "a.png", tmp_path / "b.png"],
+        kind="trajectory",
+        processes=processes,
+        options=dict(xlim=(0, 10)),
+        dpi=20,
+    )
+    assert paths == [str(tmp_path / "a.png"), str(tmp_path / "b.png")]
+
+    with pytest.raises(ValueError, match="kind"):
+        render_many(solutions, "{index}.png", kind="poster")
+
+
+def test_serial_render_many_releases_its_template(solutions, tmp_path):
+    pytest.importorskip("matplotlib")
+    import gc
+
+    class Rock:
+        # Local classes cannot be pickled, so the pool falls back to this process
+        def obstacle(self, X, Y):
+            return (X - 2) ** 2 + (Y - 5) ** 2
+
+    def live_templates():
+        gc.collect()
+        return sum(isinstance(obj, FigureTemplate) for obj in gc.get_objects())
+
+    before = live_templates()
+    for i, xlim in enumerate([(0, 10), (0, 12), (0, 14)]):
+        render_many(
+            solutions,
+            str(tmp_path / f"{i}_{{index}}.png"),
+            kind="trajectory",
+            processes=2,
+            options=dict(obstacles=[Rock()], xlim=xlim),
+            dpi=20,
+        )
+    assert live_templates() == before
+    assert len(list(tmp_path.glob("*.png"))) == 9
+
+    with pytest.raises(TypeError, match="layout"):
+        type("Incomplete", (FigureTemplate,), {"update": print})()
+
+
+def test_templates_do_not_use_pyplot(tmp_path):
+    import subprocess
+    import sys
+
+    from conftest import SRC
+
+    code = (
+        f"import sys; sys.path.insert(0, {str(SRC)!r}); "
+        "from moonlander_optimal_control import solve_baseline; "
+        "from moonlander_optimal_control.plotting import SummaryFigure; "
+        f"SummaryFigure().plot(solve_baseline((5.0, 10.0), 1.0)).savefig({str(tmp_path / 's.png')!r}); "
+        "print('matplotlib.pyplot' in sys.modules)"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip() == "False"
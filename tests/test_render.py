@@ -0,0 +1,119 @@
+import subprocess
+
+import numpy as np
+import pytest
+
+from moonlander_optimal_control.render import Scene, export_animation
+
+
+class DotScene(Scene):
+    figsize = (2, 1.5)
+
+    def __init__(self, n):
+        self.x = np.linspace(0, 1, n)
+
+    def __len__(self):
+        return len(self.x)
+
+    def setup(self, fig):
+        ax = fig.add_subplot()
+        ax.set_xlim(0, 1)
+        (self.dot,) = ax.plot([], [], "o")
+
+    def update(self, frame):
+        self.dot.set_data([self.x[frame]], [0.5])
+
+
+def _decode(path):
+    """Decoded frames of a video, as one byte string of 8-bit grey pixels"""
+    from matplotlib import rcParams
+
+    return subprocess.run(
+        [rcParams["animation.ffmpeg_path"], "-loglevel", "error", "-i", str(path)]
+        + ["-f", "rawvideo", "-pix_fmt", "gray", "-"],
+        capture_output=True,
+        check=True,
+    ).stdout
+
+
+def test_parallel_export_matches_serial(tmp_path):
+    pytest.importorskip("matplotlib")
+    scene = DotScene(11)
+    export_animation(scene, tmp_path / "serial.mp4", dpi=50, processes=1)
+    # Chunks of 3 frames over 2 workers, at most 2 chunks in flight
+    export_animation(
+        scene, tmp_path / "parallel.mp4", dpi=50, processes=2, chunk_size=3
+    )
+    assert not hasattr(scene, "dot")
+
+    serial = _decode(tmp_path / "serial.mp4")
+    # 100x75 pixels, padded to even dimensions
+    assert len(serial) == 11 * 100 * 76
+    assert _decode(tmp_path / "parallel.mp4") == serial
+
+    # Frames differ, and unpicklable scenes fall back to this process
+    frames = np.frombuffer(serial, np.uint8).reshape(11, -1)
+    assert not np.array_equal(frames[0], frames[-1])
+    scene.unpicklable = lambda: None
+    export_animation(scene, tmp_path / "fallback.mp4", dpi=50, processes=2)
+    assert _decode(tmp_path / "fallback.mp4") == serial
+
+
+def test_blitted_obstacle_frames_match_full_redraw():
+    pytest.importorskip("matplotlib")
+    from moonlander_optimal_control.motion import Periodic, Static
+    from moonlander_optimal_control.obstacles import (
+        ObstacleSet,
+        solve_moving_obstacles,
+    )
+    from moonlander_optimal_control.plotting import MovingObstacleScene
+    from moonlander_optimal_control.render import _Renderer
+
+    obstacles = ObstacleSet(
+        [(0.025, 0.25), (0.05, 0.1)],
+        [Periodic((3.0, 0.0), (0.0, 3.0), 6.0), Static((1.5, -1.0))],
+        500.0,
+    )
+    scene = MovingObstacleScene(solve_moving_obstacles(obstacles), obstacles, fps=2)
+    blitted = _Renderer(scene, dpi=40)
+    assert blitted.background is not None
+
+    full = _Renderer(scene, dpi=40)
+    for artist in full.artists:
+        artist.set_animated(False)
+    full.background = None
+    # Blitted artists are drawn over the spines, so pixels on them may differ
+    for frame in (0, 7, len(scene) - 1):
+        a, b = (np.frombuffer(r.render(frame), np.uint8) for r in (blitted, full))
+        assert np.count_nonzero(a != b) < 1e-3 * a.size
+
+    # The dot ends at the goal, after the whole path
+    assert np.allclose(full.scene.dot.get_xydata(), [[0.0, 0.0]], atol=1e-6)
+    assert len(full.scene.line.get_xdata()) == scene.path.shape[1]
+
+
+class FailingScene(DotScene):
+    def update(self, frame):
+        if frame == 5:
+            raise ValueError("bad frame")
+        super().update(frame)
+
+
+@pytest.mark.parametrize("processes", [1, 2])
+def test_export_errors(tmp_path, processes):
+    pytest.importorskip("matplotlib")
+    out_file = tmp_path / "out.mp4"
+    with pytest.raises(RuntimeError, match="nosuchcodec"):
+        export_animation(
+            DotScene(50), out_file, dpi=50, processes=processes, codec="nosuchcodec"
+        )
+
+    # A frame that fails to render leaves no truncated video behind
+    with pytest.raises(ValueError, match="bad frame"):
+        export_animation(
+            FailingScene(11), out_file, dpi=50, processes=processes, chunk_size=2
+        )
+    assert not out_file.exists()
+
+    with pytest.raises(TypeError, match="update"):
+        type("Incomplete", (Scene,), {"__len__": lambda self: 0, "setup": print})()
@@ -0,0 +1,41 @@
+import numpy as np
+
+from moonlander_optimal_control.analytic import closed_form_solution
+from moonlander_optimal_control.cache import SolutionCache
+from moonlander_optimal_control.result import Solution
+from moonlander_optimal_control.solver import solve_baseline
+
+
+def test_solution_unpacks_with_views_and_metadata():
+    sol = solve_baseline((5.0, 10.0), 1.0, t_steps=50, cache=False)
+    t, x, y, xp, yp, ux, uy, tf = sol
+
+    assert isinstance(sol, Solution) and len(sol) == 8
+    assert sol[-1] == tf and sol[2] is not None
+    for row in (x, y, xp, yp, sol.costates):
+        assert np.shares_memory(row, sol.states)
+
+    expected = closed_form_solution((5.0, 10.0), 1.0, tf, 50)
+    for value, reference in zip(sol, expected):
+        assert np.allclose(value, reference)
+
+    assert sol.success and sol.n_nodes == 50 and sol.wall_time > 0
+
+
+def test_dense_output_and_cache_roundtrip():
+    params = dict(
+        pos=(0.0, 10.0), vx0=1.0, alpha=1.0, beta=400.0, tf_guess=5.0, analytic=False
+    )
+    cache = SolutionCache()
+    sol = solve_baseline(t_steps=40, cache=cache, **params)
+    assert sol.success and sol.niter > 0 and sol.n_rhs > 0
+
+    # The interpolant reproduces the mesh values and resamples without a new solve
+    assert np.allclose(sol(sol.t), sol.states, atol=1e-8)
+    fine = sol.resample(500)
+    assert fine.n_nodes == 500 and np.isclose(fine.y[-1], sol.y[-1])
+
+    cached = solve_baseline(t_steps=40, cache=cache, **params)
+    assert isinstance(cached, Solution) and cache.stats["hits"] == 1
+    assert cached.niter == sol.niter and cached.tf == sol.tf
+    assert np.allclose(cached(0.5 * sol.tf), sol(0.5 * sol.tf))
@@ -0,0 +1,60 @@
+import time
+
+import pytest
+
+from moonlander_optimal_control.robust import certify, solve_robust
+from moonlander_optimal_control.solver import _baseline_system, solve_baseline
+
+
+def test_certify():
+    pos, vx0 = (5.0, 10.0), 1.0
+    bc = _baseline_system(pos, vx0)[1]
+    assert certify(solve_baseline(pos, vx0, cache=False), bc)
+
+    # Converges, but to a negative final time from the straight-line guess
+    params = dict(alpha=1.0, beta=400.0)
+    bc = _baseline_system(pos, vx0, **params)[1]
+    sol = solve_baseline(
+        pos, vx0, tf_guess=5.0, analytic=False, guess="straight", cache=False, **params
+    )
+    assert sol.success and sol.tf < 0
+    assert not certify(sol, bc)
+
+    rescued = solve_baseline(
+        pos,
+        vx0,
+        tf_guess=5.0,
+        analytic=False,
+        guess="straight",
+        robust=True,
+        cache=False,
+        **params
+    )
+    assert rescued.tf > 0 and certify(rescued, bc)
+
+
+def test_rescues_final_angle():
+    pos, vx0 = (5.0, 10.0), 1.0
+    sol = solve_robust(
+        pos, vx0, model="final_angle", rho=0.5, processes=2, budget=60, cache=False
+    )
+    assert sol.success and sol.tf > 0
+    assert abs(sol.y[-1]) < 1e-6
+
+
+def test_budget():
+    start = time.monotonic()
+    with pytest.raises(RuntimeError, match="cancelled"):
+        solve_robust(
+            (5.0, 10.0),
+            1.0,
+            alpha=1.0,
+            beta=400.0,
+            tf_guess=5.0,
+            analytic=False,
+            guess="straight",
+            strategies=[{"t_steps": 5000, "y0_guess": 5.0}],
+            budget=0.5,
+            cache=False,
+        )
+    assert time.monotonic() - start < 5
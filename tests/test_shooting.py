@@ -0,0 +1,48 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from moonlander_optimal_control.analytic import solve_baseline_analytic
+from moonlander_optimal_control.guess import initial_guess
+from moonlander_optimal_control.shooting import solve_shooting
+from moonlander_optimal_control.solver import _final_angle_system, _solve_system
+
+
+def test_shooting_matches_closed_form():
+    pos, vx0 = (0.0, 10.0), 1.0
+    t, x, y, xp, yp, ux, uy, tf = solve_shooting(pos, vx0, t_steps=50, segments=4)
+    t_ref, x_ref, y_ref, *_, tf_ref = solve_baseline_analytic(pos, vx0, t_steps=50)
+
+    assert np.isclose(tf, tf_ref)
+    assert np.allclose(y, y_ref, atol=1e-6)
+    assert np.allclose(x, x_ref, atol=1e-6)
+
+
+def test_shooting_final_angle_in_pool():
+    pos, vx0 = (0.0, 10.0), 1.0
+    params = dict(alpha=1.0, beta=400.0, rho=0.5)
+    serial = solve_shooting(pos, vx0, t_steps=50, model="final_angle", **params)
+    with ThreadPoolExecutor(2) as executor:
+        pooled = solve_shooting(
+            pos, vx0, t_steps=50, model="final_angle", executor=executor, **params
+        )
+
+    assert np.allclose(serial[2], pooled[2]) and serial[-1] == pooled[-1]
+    assert abs(serial[2][-1]) < 1e-8
+
+    # Collocation only converges here from the same analytic seed
+    guess = initial_guess(pos, vx0, 50, method="analytic", alpha=1.0, beta=400.0)
+    system = _final_angle_system(pos, vx0, **params)
+    sol = _solve_system(system, pos, vx0, 50, 20.0, 1.0, guess=guess)
+    assert sol.success and abs(serial[-1] - sol.p[0]) < 1e-3
+
+
+def test_shooting_reports_unconverged_solve():
+    pos, vx0 = (0.0, 10.0), 1.0
+    sol = solve_shooting(
+        pos, vx0, t_steps=50, segments=4, guess="ballistic", max_iter=1
+    )
+    assert sol.status == 1 and sol.niter == 1
+
+    sol = solve_shooting(pos, vx0, t_steps=50, segments=4, guess="ballistic")
+    assert sol.success and 1 < sol.niter < 50
@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+from scipy.ndimage import rotate
+
+from moonlander_optimal_control.sprites import SpriteCache, load_sprite, tilt_angle
+
+
+def test_sprite_loads_once_from_package_data():
+    image = load_sprite()
+    assert image.ndim == 3 and image.shape[2] == 4
+    assert load_sprite() is image and not image.flags.writeable
+
+
+def test_nearest_angle_lookup():
+    image = np.random.default_rng(0).uniform(size=(9, 9, 4))
+    sprites = SpriteCache(image, resolution=5.0)
+    assert sprites.n_angles == 72
+
+    # Angles within half a step share one rendered rotation
+    first = sprites(12.0)
+    assert sprites(12.4) is first and sprites(10.1) is first and len(sprites) == 1
+    np.testing.assert_allclose(
+        first, np.clip(rotate(image, 10.0, reshape=False), 0, 1), atol=1e-12
+    )
+    assert sprites(-350.0) is first
+    assert sprites(7.4) is not first
+
+    sprites.prerender([0.0, 1.0, 44.0])
+    assert len(sprites) == 4
+    assert len(SpriteCache(image, resolution=90).prerender()) == 4
+
+    with pytest.raises(ValueError, match="resolution"):
+        SpriteCache(image, resolution=0)
+
+
+def test_tilt_angle():
+    np.testing.assert_allclose(
+        tilt_angle([1.0, -1.0, 0.0, 0.0, 1.0], [-1.0, -1.0, -2.0, 0.0, 0.0]),
+        [45.0, -45.0, 0.0, 0.0, -90.0],
+    )
@@ -0,0 +1,60 @@
+import numpy as np
+import pytest
+
+from moonlander_optimal_control.sweep import (
+    iter_sweep,
+    scenario_grid,
+    solve_scenario,
+    sweep,
+)
+
+
+def test_scenario_grid():
+    grid = scenario_grid(vx0=[0.0, 1.0], nu=[0.0, 1.0, 2.0])
+    assert len(grid) == 6
+    assert grid[0] == {"vx0": 0.0, "nu": 0.0}
+
+
+def test_sweep_columns_in_input_order():
+    grid = {"vx0": [1.0, 0.5, 0.0], "gamma": [3.0, 5.0]}
+    table = sweep(grid, processes=1, pos=(5.0, 10.0), t_steps=50)
+
+    assert np.array_equal(table["index"], np.arange(6))
+    assert np.array_equal(table["vx0"], [1.0, 1.0, 0.5, 0.5, 0.0, 0.0])
+    assert np.all(table["x0"] == 5.0)
+    assert np.all(table["status"] == 0) and np.all(table["tf"] > 0)
+
+
+def test_iter_sweep_process_pool():
+    scenarios = [{"pos": (5.0, 10.0), "vx0": v} for v in (0.0, 1.0)]
+    records = list(iter_sweep(scenarios, processes=2))
+    assert sorted(record["index"] for record in records) == [0, 1]
+
+    # Closing the generator early cancels the jobs not yet started
+    records = iter_sweep(scenarios * 4, processes=2)
+    assert next(records)["index"] in range(8)
+    records.close()
+
+
+def test_argument_errors_raise_and_solve_errors_are_recorded():
+    with pytest.raises(TypeError, match="alpah"):
+        solve_scenario("baseline", pos=(5.0, 10.0), vx0=1.0, alpah=1.0)
+    with pytest.raises(TypeError, match="alpah"):
+        sweep([{"alpah": 1.0}], processes=1, pos=(5.0, 10.0), vx0=1.0)
+    with pytest.raises(TypeError, match="vx0"):
+        solve_scenario("baseline", pos=(5.0, 10.0))
+
+    record = solve_scenario(
+        "baseline", pos=(5.0, 10.0), vx0=1.0, t_steps=1, analytic=False
+    )
+    assert record["status"] == -1 and record["error"].startswith("ValueError")
+    assert solve_scenario("baseline", pos=(5.0, 10.0), vx0=1.0)["error"] == ""
+
+
+def test_sweep_seeds_solves_like_the_solvers():
+    scenario = dict(pos=(0.0, 10.0), vx0=1.0, alpha=1.0, beta=400.0, rho=0.5)
+    record = solve_scenario("final_angle", **scenario)
+    assert record["success"] and record["n_nodes"] == 200
+
+    record = solve_scenario("final_angle", guess="straight", **scenario)
+    assert not record["success"]
@@ -47,21 +47,24 @@ def lunar_lander(
 
     x_init, y_init = pos_init
 
+    k = 1 / (2 * alpha)
+
     # Define the ODE's associated with state and costate evolution
+    # (each row is written in place instead of stacking eight temporaries)
     def ode(t, y, p):
         tf = p[0]
-        return tf * np.array(
-            [
-                y[2],
-                y[3],
-                y[6] / (2 * alpha),
-                y[7] / (2 * alpha) - G,
-                np.zeros_like(y[0]),
-                nu * (1 - np.heaviside(y[1], 0)),
-                -y[4],
-                -y[5],
-            ]
-        )
+        out = np.empty_like(y)
+        np.multiply(y[2], tf, out=out[0])
+        np.multiply(y[3], tf, out=out[1])
+        np.multiply(y[6], tf * k, out=out[2])
+        np.multiply(y[7], tf * k, out=out[3])
+        out[3] -= tf * G
+        out[4] = 0
+        np.less_equal(y[1], 0, out=out[5])
+        out[5] *= tf * nu
+        np.multiply(y[4], -tf, out=out[6])
+        np.multiply(y[5], -tf, out=out[7])
+        return out
 
     # Define the boundary conditions
     # BC's 1-5 come from known initial and final conditions
@@ -305,22 +308,32 @@ def lunar_lander_final_angle(
 
     x_init, y_init = pos_init
 
+    k = 1 / (2 * alpha)
+
     # Define the ODE's associated with state and costate evolution
+    # (each row is written in place instead of stacking eight temporaries)
     def ode(t, y, p):
         tf = p[0]
-        return tf * np.array(
-            [
-                y[2],
-                y[3],
-                y[6] / (2 * alpha),
-                y[7] / (2 * alpha) - G,
-                np.zeros_like(y[0]),
-                nu * (1 - np.heaviside(y[1], 0))
-                + final_angle_on * 2 * ((y[6] / (2 * alpha)) ** 2 / (y[1] + rho) ** 3),
-                -y[4],
-                -y[5],
-            ]
-        )
+        out = np.empty_like(y)
+        np.multiply(y[2], tf, out=out[0])
+        np.multiply(y[3], tf, out=out[1])
+        np.multiply(y[6], tf * k, out=out[2])
+        np.multiply(y[7], tf * k, out=out[3])
+        out[3] -= tf * G
+        np.less_equal(y[1], 0, out=out[5])
+        out[5] *= tf * nu
+        if final_angle_on:
+            # Row 4 is zero in this model, so it holds 2 (k y6)^2 / (y1 + rho)^3 first
+            np.add(y[1], rho, out=out[4])
+            np.power(out[4], -3, out=out[4])
+            out[4] *= y[6]
+            out[4] *= y[6]
+            out[4] *= 2 * k**2 * tf
+            out[5] += out[4]
+        out[4] = 0
+        np.multiply(y[4], -tf, out=out[6])
+        np.multiply(y[5], -tf, out=out[7])
+        return out
 
     # Define the boundary conditions
     # BC's 1-5 come from known initial and final conditions
@@ -420,22 +433,29 @@ def lunar_lander_final_angle_v2(
 
     x_init, y_init = pos_init
 
+    k = 1 / (2 * alpha)
+
     # Define the ODE's associated with state and costate evolution
+    # (each row is written in place instead of stacking eight temporaries)
     def ode(t, y, p):
         tf = p[0]
-        return tf * np.array(
-            [
-                y[2],
-                y[3],
-                y[6] / (2 * alpha),
-                np.maximum(0, y[7]) / (2 * alpha) - G,
-                np.zeros_like(y[0]),
-                nu * (1 - np.heaviside(y[1], 0))
-                + final_angle_on * zeta * np.heaviside(-y[1] + eps, 0),
-                -y[4],
-                -y[5],
-            ]
-        )
+        out = np.empty_like(y)
+        np.multiply(y[2], tf, out=out[0])
+        np.multiply(y[3], tf, out=out[1])
+        np.multiply(y[6], tf * k, out=out[2])
+        np.maximum(y[7], 0, out=out[3])
+        out[3] *= tf * k
+        out[3] -= tf * G
+        np.less_equal(y[1], 0, out=out[5])
+        out[5] *= tf * nu
+        if final_angle_on:
+            # heaviside(eps - y1, 0) is one where y1 < eps; row 4 is scratch here
+            np.less(y[1], eps, out=out[4])
+            out[5] += (tf * zeta) * out[4]
+        out[4] = 0
+        np.multiply(y[4], -tf, out=out[6])
+        np.multiply(y[5], -tf, out=out[7])
+        return out
 
     # Define the boundary conditions
     # BC's 1-5 come from known initial and final conditions